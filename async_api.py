@@ -0,0 +1,168 @@
+"""
+Interface asyncio pour les services asynchrones.
+
+Les simulations s'exécutent dans un executor (thread par défaut) pour ne pas
+bloquer la boucle d'événements. stream_simulation avance le noyau horaire par
+tranches et publie l'état intermédiaire (heure, température, humidité) dans un
+itérateur asynchrone ; abandonner l'itération ou annuler la tâche arrête le
+calcul à la fin de la tranche en cours (fermer explicitement l'itérateur avec
+aclose() ou contextlib.aclosing pour un arrêt immédiat).
+
+    async for record in stream_simulation(data, chunk_hours=24):
+        if "results" in record:
+            results = record["results"]
+        else:
+            print(record["hour"], record["T"], record["moisture"])
+"""
+import asyncio
+import threading
+
+from modelvic import SimulationModel
+from batch import _run_one
+
+
+class SimulationCancelled(Exception):
+    """La simulation a été interrompue avant la fin"""
+
+
+def _run_chunked(data, params, backend, chunk_hours, emit, cancelled):
+    """
+    Exécute une simulation par tranches de chunk_hours heures (dans l'executor)
+
+    Args:
+        emit: Fonction appelée avec l'état à la fin de chaque tranche
+        cancelled: threading.Event demandant l'arrêt du calcul
+
+    Returns:
+        Dictionnaire de résultats (format de run_simulation)
+    """
+    setup = SimulationModel.prepare(data, params)
+    results = None
+    # Tranches exprimées en pas du noyau (plusieurs heures par pas en schéma implicite)
+    chunks = setup.iter_results(backend, chunk_size=max(1, chunk_hours // setup.time_step))
+    for chunk in chunks:
+        if results is None:
+            results = chunk
+        else:
+            for name, values in chunk.items():
+                results[name].extend(values)
+        hour = chunk["Times"][-1]
+        emit({
+            "hour": hour,
+            "progress": hour / setup.HRT,
+            "T": chunk["Temperatures"][-1],
+            "moisture": chunk["MoistureFraction"][-1],
+            "solids": chunk["Solids"][-1],
+        })
+        if cancelled.is_set():
+            chunks.close()
+            raise SimulationCancelled("Simulation annulée à l'heure {}".format(hour))
+
+    results["process_volume"] = setup.process_volume
+    return results
+
+
+async def stream_simulation(data, params=None, backend="auto", chunk_hours=24, executor=None):
+    """
+    Exécute une simulation en publiant sa progression
+
+    Args:
+        data: Dictionnaire de paramètres (format de run_simulation)
+        params: Constantes du modèle (ModelParameters)
+        backend: Noyau de calcul ("auto", "python" ou "numba")
+        chunk_hours: Nombre d'heures simulées entre deux publications
+        executor: Executor à threads à utiliser (défaut : celui de la boucle)
+
+    Yields:
+        Dictionnaires {'hour', 'progress', 'T', 'moisture', 'solids'} au fil du
+        calcul, puis {'hour', 'progress', 'results'} avec les résultats complets
+
+    Raises:
+        SimulationCancelled: si le calcul a été interrompu
+    """
+    chunk_hours = int(chunk_hours)
+    if chunk_hours < 1:
+        raise ValueError("chunk_hours doit être un entier positif")
+
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    cancelled = threading.Event()
+
+    def emit(record):
+        loop.call_soon_threadsafe(queue.put_nowait, record)
+
+    def finished(future):
+        # L'exception éventuelle reste levée par « await task » ; la consulter ici
+        # évite l'avertissement lorsque l'itération a été abandonnée
+        if not future.cancelled():
+            future.exception()
+        queue.put_nowait(None)
+
+    task = loop.run_in_executor(executor, _run_chunked, data, params, backend, chunk_hours, emit, cancelled)
+    task.add_done_callback(finished)
+
+    try:
+        while True:
+            record = await queue.get()
+            if record is None:
+                break
+            yield record
+        results = await task
+        yield {"hour": results["Times"][-1], "progress": 1.0, "results": results}
+    finally:
+        # Itération abandonnée ou tâche annulée : arrêt du calcul à la fin de la tranche
+        cancelled.set()
+
+
+async def run_simulation_async(data, params=None, backend="auto", progress=None,
+                               chunk_hours=24, executor=None):
+    """
+    Exécute une simulation sans bloquer la boucle d'événements
+
+    Args:
+        data: Dictionnaire de paramètres (format de run_simulation)
+        params: Constantes du modèle (ModelParameters)
+        backend: Noyau de calcul ("auto", "python" ou "numba")
+        progress: Fonction (ou coroutine) optionnelle appelée avec chaque état intermédiaire
+        chunk_hours: Nombre d'heures simulées entre deux appels de progress
+        executor: Executor à threads à utiliser (défaut : celui de la boucle)
+
+    Returns:
+        Dictionnaire de résultats (format de run_simulation)
+    """
+    async for record in stream_simulation(data, params, backend, chunk_hours, executor):
+        if "results" in record:
+            return record["results"]
+        if progress is not None:
+            outcome = progress(record)
+            if asyncio.iscoroutine(outcome):
+                await outcome
+
+
+async def run_batch_async(datas, executor=None, params=None):
+    """
+    Exécute plusieurs simulations et les publie dans l'ordre où elles se terminent
+
+    Args:
+        datas: Liste de dictionnaires de paramètres
+        executor: Executor à utiliser (ProcessPoolExecutor pour un calcul parallèle ;
+                  défaut : celui de la boucle)
+        params: Constantes du modèle (ModelParameters)
+
+    Yields:
+        Couples (indice dans datas, résultats)
+
+    Les simulations non commencées sont annulées si l'itération est abandonnée.
+    """
+    loop = asyncio.get_running_loop()
+    futures = [loop.run_in_executor(executor, _run_one, data, params) for data in datas]
+
+    async def indexed(i, future):
+        return i, await future
+
+    try:
+        for completed in asyncio.as_completed([indexed(i, future) for i, future in enumerate(futures)]):
+            yield await completed
+    finally:
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,199 @@
+"""
+Exécution groupée de simulations (balayages de paramètres, analyses multi-critères).
+
+Les simulations sont indépendantes les unes des autres : elles sont réparties
+sur un pool de processus afin d'utiliser tous les coeurs disponibles. Un
+WorkerPool conserve ses processus d'un lot à l'autre : les imports et la
+compilation du noyau ne sont payés qu'au premier lot.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from modelvic import SimulationModel
+from shared_results import share_result, SharedResultHandle
+
+
+def _run_one(data, params=None, storage=None, shared=False, outputs=None):
+    """Exécute une simulation (fonction de niveau module pour être sérialisable)"""
+    result = SimulationModel.run_simulation(data, params, outputs=outputs, storage=storage)
+    if shared:
+        return share_result(result)
+    return result
+
+
+# Simulation minimale exécutée au démarrage de chaque processus du pool
+_WARMUP_DATA = {
+    "NS": 1, "CCS": [[53.19/12, 7.48/1, 35.46/16, 3.88/14]], "FR": [100], "FS": [40], "FVS": [90],
+    "FBVS": [80], "FfBVS": [70], "fKT20": [0.05], "sKT20": [0.005], "Cp": [0.9], "T": [20],
+    "HRT": 2, "air_flow": 1.0,
+}
+
+
+def _warm_worker():
+    """Initialisation d'un processus du pool : imports et compilation du noyau"""
+    SimulationModel.run_simulation(_WARMUP_DATA)
+
+
+def _release_handle(future):
+    """Libère le bloc partagé renvoyé par une simulation dont le résultat est abandonné"""
+    if not future.cancelled() and future.exception() is None:
+        handle = future.result()
+        if isinstance(handle, SharedResultHandle):
+            handle.release()
+
+
+def _release_batch(results, futures):
+    """Libère les blocs partagés d'un lot interrompu (reçus, terminés ou en cours)"""
+    for result in results:
+        if result is not None:
+            result.release()
+    for future, i in futures.items():
+        if results[i] is None and not future.cancel():
+            future.add_done_callback(_release_handle)
+
+
+def make_variants(base_data, variations):
+    """
+    Construit une liste de jeux de données à partir d'un jeu de référence
+
+    Args:
+        base_data: Dictionnaire de paramètres de référence
+        variations: Liste de dictionnaires de paramètres à remplacer
+
+    Returns:
+        Liste de dictionnaires de paramètres complets
+    """
+    return [dict(base_data, **variation) for variation in variations]
+
+
+def run_batch(datas, workers=None, executor=None, progress=None, params=None, storage=None,
+              shared=False, outputs=None):
+    """
+    Exécute plusieurs simulations, en parallèle si possible
+
+    Args:
+        datas: Liste de dictionnaires de paramètres (format de run_simulation)
+        workers: Nombre de processus (défaut : nombre de coeurs, 1 = exécution séquentielle)
+        executor: Executor existant à réutiliser (prioritaire sur workers)
+        progress: Fonction optionnelle appelée avec (nombre terminé, total)
+        params: Constantes du modèle (ModelParameters) communes à toutes les simulations
+        storage: None pour des dictionnaires de listes, ou mode de stockage des
+                 SimulationResult renvoyés ("float32", "compact"... voir results.py) :
+                 mémoire réduite pour les grands ensembles, transfert plus rapide
+                 depuis les processus
+        shared: True pour recevoir les séries des processus par mémoire partagée
+                (SimulationResult à libérer par release(), voir shared_results.py) ;
+                stockage "float64" si storage n'est pas indiqué
+        outputs: None pour toutes les séries, ou liste des sorties à renvoyer
+                 (voir SimulationModel.run_simulation) : seules celles-ci
+                 reviennent des processus
+
+    Returns:
+        Liste des résultats, dans le même ordre que datas
+    """
+    datas = list(datas)
+    total = len(datas)
+    results = [None] * total
+    if shared and storage is None:
+        storage = "float64"
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    # Exécution séquentielle : un seul processus demandé ou un seul calcul
+    if executor is None and (workers <= 1 or total <= 1):
+        for i, data in enumerate(datas):
+            results[i] = _run_one(data, params, storage, outputs=outputs)
+            if progress is not None:
+                progress(i + 1, total)
+        return results
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=min(workers, total))
+
+    futures = {}
+    try:
+        for i, data in enumerate(datas):
+            futures[executor.submit(_run_one, data, params, storage, shared, outputs)] = i
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            if isinstance(result, SharedResultHandle):
+                result = result.attach()
+            results[futures[future]] = result
+            if progress is not None:
+                progress(done, total)
+    except BaseException:
+        if shared:
+            _release_batch(results, futures)
+        raise
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    return results
+
+
+class WorkerPool:
+    """
+    Pool de processus persistant, partagé entre les lots successifs
+
+    Les processus sont démarrés au premier lot puis conservés jusqu'à shutdown() :
+    numpy, le modèle et le noyau compilé ne sont chargés qu'une fois par processus,
+    les lots suivants démarrent sans délai.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = None
+
+    @property
+    def started(self):
+        """Vrai si les processus ont été démarrés"""
+        return self._executor is not None
+
+    @property
+    def executor(self):
+        """ProcessPoolExecutor du pool, créé au premier accès"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker)
+        return self._executor
+
+    def run_batch(self, datas, progress=None, params=None, storage=None, shared=False, outputs=None):
+        """
+        Exécute plusieurs simulations sur le pool (voir run_batch)
+
+        Un pool rendu inutilisable par l'arrêt brutal d'un processus est remplacé
+        au lot suivant.
+        """
+        try:
+            return run_batch(datas, executor=self.executor, progress=progress, params=params,
+                             storage=storage, shared=shared, outputs=outputs)
+        except BrokenProcessPool:
+            self.shutdown(wait=False)
+            raise
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Soumet une fonction au pool (voir Executor.submit)
+
+        Un pool rendu inutilisable par l'arrêt brutal d'un processus est remplacé
+        à la soumission suivante ; les calculs qui y étaient en cours échouent
+        (BrokenProcessPool).
+        """
+        try:
+            return self.executor.submit(fn, *args, **kwargs)
+        except BrokenProcessPool:
+            self.shutdown(wait=False)
+            return self.executor.submit(fn, *args, **kwargs)
+
+    def run_simulation(self, data, params=None, storage=None, shared=False):
+        """Exécute une simulation dans un processus du pool"""
+        return self.run_batch([data], params=params, storage=storage, shared=shared)[0]
+
+    def shutdown(self, wait=True):
+        """Arrête les processus (les simulations en attente sont annulées)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
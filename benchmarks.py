@@ -0,0 +1,293 @@
+"""
+Banc de mesure des performances du moteur de simulation et des traitements de
+l'interface (sans affichage).
+
+    python benchmarks.py --output bench.json
+    python benchmarks.py --baseline bench.json --output bench_new.json
+
+Mesure run_simulation selon le nombre de substrats (NS), la durée (HRT) et le
+noyau de calcul, les lots de simulations (batch.run_batch) et, lorsque les
+dépendances de l'interface sont installées, calculate_cn_ratio,
+calculate_gas_emissions et l'export Excel. Les mesures sont enregistrées en
+JSON ; avec --baseline, chaque cas est comparé à une mesure de référence et le
+script se termine en erreur si un cas est plus lent que le seuil de régression.
+"""
+import argparse
+import datetime
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import types
+from unittest import mock
+
+import numpy as np
+
+from modelvic import SimulationModel
+from batch import run_batch
+from kernel import jit_available
+
+
+# Substrats de référence (cas de démonstration de modelvic), répétés pour les grands NS
+REFERENCE_SUBSTRATES = [
+    {"CCS": [53.19/12, 7.48/1, 35.46/16, 3.88/14], "FR": 5000, "FS": 40, "FVS": 90, "FBVS": 80,
+     "FfBVS": 70, "fKT20": 0.05, "sKT20": 0.005, "Cp": 0.9, "T": 20},
+    {"CCS": [40.0/12, 6.0/1, 40.0/16, 1.0/14], "FR": 2000, "FS": 80, "FVS": 80, "FBVS": 60,
+     "FfBVS": 50, "fKT20": 0.03, "sKT20": 0.003, "Cp": 1.34, "T": 20},
+]
+
+FULL_GRID = {"NS": (2, 10, 25, 50), "HRT": (100, 1000, 10000), "batch": (1, 8, 32)}
+QUICK_GRID = {"NS": (2, 10), "HRT": (100, 1000), "batch": (1, 8)}
+
+
+def make_data(NS=2, HRT=1080, **overrides):
+    """
+    Jeu de paramètres synthétique de NS substrats (format de run_simulation)
+
+    Args:
+        NS: Nombre de substrats
+        HRT: Durée de simulation (heures)
+        overrides: Paramètres à remplacer
+
+    Returns:
+        Dictionnaire de paramètres
+    """
+    substrates = [REFERENCE_SUBSTRATES[i % len(REFERENCE_SUBSTRATES)] for i in range(NS)]
+    data = {
+        "NS": NS,
+        "Substrates": ["Substrate" + str(i + 1) for i in range(NS)],
+        "HBVS": 16000,
+        "HRT": HRT,
+        "air_flow": 15.0,
+        "relative_humidity": 60,
+        "ambient_temp": 20,
+        "water_flow": 0.0,
+        "water_temp": 20,
+        "air_alternance": False,
+        "air_on_time": 1.0,
+        "air_off_time": 0.5,
+    }
+    for key in ("CCS", "FR", "FS", "FVS", "FBVS", "FfBVS", "fKT20", "sKT20", "Cp", "T"):
+        data[key] = [substrate[key] for substrate in substrates]
+    data.update(overrides)
+    return data
+
+
+def timed(function, repeat=5, min_time=0.05):
+    """
+    Chronomètre une fonction sans argument
+
+    La fonction est appelée en boucle jusqu'à min_time secondes par mesure (au
+    moins une fois), et la mesure est répétée repeat fois.
+
+    Returns:
+        {'min', 'median', 'repeat', 'loops'} : durées par appel (secondes)
+    """
+    function()  # Échauffement (compilation, caches)
+    loops = 1
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+    if 0 < elapsed < min_time:
+        loops = int(min_time / elapsed) + 1
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            function()
+        samples.append((time.perf_counter() - start) / loops)
+    return {"min": min(samples), "median": statistics.median(samples), "repeat": repeat, "loops": loops}
+
+
+def benchmark_engine(grid, repeat):
+    """Durée de run_simulation par NS, HRT et noyau"""
+    backends = ["python"] + (["numba"] if jit_available() else [])
+    results = {}
+    for backend in backends:
+        for NS in grid["NS"]:
+            for HRT in grid["HRT"]:
+                data = make_data(NS, HRT)
+                name = "run_simulation[{},NS={},HRT={}]".format(backend, NS, HRT)
+                results[name] = timed(lambda: SimulationModel.run_simulation(data, backend=backend), repeat)
+    return results
+
+
+def benchmark_batch(grid, repeat, workers=None):
+    """Durée d'un lot de simulations (variantes de débit d'air)"""
+    results = {}
+    for size in grid["batch"]:
+        datas = [make_data(2, 1080, air_flow=5.0 + i) for i in range(size)]
+        name = "run_batch[n={}]".format(size)
+        results[name] = timed(lambda: run_batch(datas, workers=workers), max(1, repeat // 2), min_time=0)
+    return results
+
+
+def load_interface():
+    """
+    Charge le module de l'interface sans créer de fenêtre
+
+    Returns:
+        Module, ou None si ses dépendances ne sont pas installées
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "interface final.py")
+    spec = importlib.util.spec_from_file_location("interface_final", path)
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except ImportError:
+        return None
+    return module
+
+
+def benchmark_gui(repeat, HRT=1080):
+    """
+    Durée des traitements de l'interface sur des résultats de simulation
+
+    Les méthodes sont appelées sur un objet minimal portant les attributs
+    qu'elles utilisent (substrats, simulations), sans fenêtre Tk.
+
+    Returns:
+        (résultats, cas ignorés avec leur raison)
+    """
+    results = {}
+    skipped = {}
+    interface = load_interface()
+    if interface is None:
+        reason = "dépendances de l'interface non installées"
+        for name in ("calculate_cn_ratio", "calculate_gas_emissions", "export_data"):
+            skipped[name] = reason
+        return results, skipped
+
+    App = interface.BioProcessApp
+    data = make_data(2, HRT)
+    result = SimulationModel.run_simulation(data)
+    substrates = [{"name": name, "composition": ccs} for name, ccs in zip(data["Substrates"], data["CCS"])]
+    app = types.SimpleNamespace(substrates=substrates, simulations=[
+        {"name": "Simulation {}".format(i + 1), "params": data, "data": result} for i in range(4)
+    ])
+
+    results["calculate_cn_ratio[HRT={}]".format(HRT)] = timed(lambda: App.calculate_cn_ratio(app, result), repeat)
+    results["calculate_gas_emissions[HRT={}]".format(HRT)] = timed(lambda: App.calculate_gas_emissions(app, result), repeat)
+
+    try:
+        import pandas
+        import openpyxl
+    except ImportError:
+        skipped["export_data"] = "pandas/openpyxl non installés"
+        return results, skipped
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "export.xlsx")
+        with mock.patch("tkinter.filedialog.asksaveasfilename", return_value=path), \
+                mock.patch.object(interface, "messagebox"):
+            results["export_data[4 simulations,HRT={}]".format(HRT)] = timed(
+                lambda: App.export_data(app), max(1, repeat // 2), min_time=0)
+    return results, skipped
+
+
+def run_benchmarks(quick=False, repeat=5, workers=None, group=None):
+    """
+    Exécute l'ensemble des mesures
+
+    Args:
+        quick: Grille réduite (vérification rapide)
+        repeat: Nombre de répétitions de chaque mesure
+        workers: Nombre de processus pour les lots
+        group: Groupe de mesures à exécuter
+                 ('engine', 'batch' ou 'gui', None pour tous)
+
+    Returns:
+        Dictionnaire {'meta', 'results', 'skipped'}
+    """
+    grid = QUICK_GRID if quick else FULL_GRID
+    results = {}
+    skipped = {}
+    if group in (None, "engine"):
+        results.update(benchmark_engine(grid, repeat))
+    if group in (None, "batch"):
+        results.update(benchmark_batch(grid, repeat, workers))
+    if group in (None, "gui"):
+        gui_results, gui_skipped = benchmark_gui(repeat)
+        results.update(gui_results)
+        skipped.update(gui_skipped)
+
+    return {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "numba": jit_available(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "quick": quick,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def compare(current, baseline, threshold=1.2):
+    """
+    Compare des mesures à une référence
+
+    Args:
+        current: Résultats de run_benchmarks
+        baseline: Résultats de référence (même format)
+        threshold: Rapport de durées au-delà duquel un cas est une régression
+
+    Returns:
+        Liste de (cas, durée de référence, durée actuelle, accélération, régression)
+        pour les cas présents dans les deux mesures (comparaison des minima)
+    """
+    rows = []
+    for name, measure in current["results"].items():
+        reference = baseline.get("results", {}).get(name)
+        if reference is None:
+            continue
+        speedup = reference["min"] / measure["min"] if measure["min"] > 0 else float("inf")
+        rows.append((name, reference["min"], measure["min"], speedup, measure["min"] > threshold * reference["min"]))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc de mesure des performances du modèle de bio-séchage")
+    parser.add_argument("--output", help="Fichier JSON où enregistrer les mesures")
+    parser.add_argument("--baseline", help="Fichier JSON de référence à comparer")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="Rapport de durées signalé comme régression (défaut : 1.2)")
+    parser.add_argument("--quick", action="store_true", help="Grille réduite")
+    parser.add_argument("--repeat", type=int, default=5, help="Répétitions par mesure")
+    parser.add_argument("--workers", type=int, default=None, help="Processus pour les lots")
+    parser.add_argument("--only", choices=("engine", "batch", "gui"), help="Ne mesurer qu'un groupe")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.quick, args.repeat, args.workers, args.only)
+    for name, measure in report["results"].items():
+        print(f"{name:50s} {measure['min'] * 1000:10.3f} ms (médiane {measure['median'] * 1000:.3f} ms)")
+    for name, reason in report["skipped"].items():
+        print(f"{name:50s} ignoré : {reason}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(report, baseline, args.threshold)
+        print("\nComparaison avec", args.baseline)
+        for name, reference, current, speedup, regression in rows:
+            flag = "  RÉGRESSION" if regression else ""
+            print(f"{name:50s} {reference * 1000:10.3f} -> {current * 1000:10.3f} ms  x{speedup:.2f}{flag}")
+        if any(row[4] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
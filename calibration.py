@@ -0,0 +1,424 @@
+"""
+Calibration des paramètres du modèle sur des mesures de température et d'humidité.
+
+Les paramètres sélectionnés sont ajustés par moindres carrés (Levenberg-Marquardt)
+en comparant run_simulation aux séries mesurées par les sondes. Le jacobien est
+évalué par différences finies, toutes les simulations d'une itération étant
+lancées en parallèle sur un même pool de processus, conservé pendant tout
+l'ajustement ; chaque jeu de paramètres déjà simulé est mis en cache (séries
+simulées aux seuls instants de mesure).
+"""
+import csv
+import math
+import os
+
+import numpy as np
+
+from batch import WorkerPool, run_batch
+from parameters import DEFAULT_PARAMETERS, ModelParameters
+
+try:
+    from scipy import stats
+except ImportError:
+    stats = None
+
+
+# Paramètres calibrables : nom -> (bornes min, max)
+# Les paramètres par substrat s'écrivent "fKT20[i]" / "sKT20[i]" ; "fKT20_scale" et
+# "sKT20_scale" multiplient les constantes de tous les substrats. Les constantes du
+# modèle (ModelParameters) sont transmises par les clés du même nom.
+PARAMETER_BOUNDS = {
+    "HBVS": (1000.0, 50000.0),
+    "insulation_factor": (0.0, 1.0),
+    "heat_loss_coefficient": (0.0, 100.0),
+    "aeration_loss_coefficient": (0.0, 1.0),
+    "inertia_factor": (0.0, 0.9),
+    "moisture_optimum": (20.0, 80.0),
+    "theta_growth": (1.0, 1.3),
+    "theta_inhibition": (1.0, 2.0),
+    "fKT20": (0.0, 10.0),
+    "sKT20": (0.0, 10.0),
+    "fKT20_scale": (0.01, 100.0),
+    "sKT20_scale": (0.01, 100.0),
+}
+
+# Valeurs initiales des paramètres qui ne figurent pas dans les données d'entrée
+# (les constantes du modèle partent de leur valeur par défaut dans ModelParameters)
+DEFAULT_VALUES = {
+    "HBVS": 16000.0,
+    "fKT20_scale": 1.0,
+    "sKT20_scale": 1.0,
+}
+
+# Écart-type de mesure par défaut (pondération des résidus)
+DEFAULT_SIGMAS = {
+    "Temperatures": 1.0,       # °C
+    "MoistureFraction": 1.0,   # %
+}
+
+
+def _parse_float(text):
+    """Convertit une cellule CSV en nombre (virgule décimale acceptée), NaN si vide"""
+    text = text.strip().replace(",", ".")
+    if not text:
+        return math.nan
+    return float(text)
+
+
+def load_measurements(file_path, time_column="time", columns=None):
+    """
+    Charge des séries mesurées depuis un fichier CSV
+
+    Le séparateur (',' ou ';') est détecté automatiquement et la virgule décimale
+    est acceptée. Les cellules vides sont ignorées lors de l'ajustement.
+
+    Args:
+        file_path: Chemin du fichier CSV
+        time_column: Nom de la colonne du temps (heures)
+        columns: Dictionnaire {colonne du fichier: série du modèle}, par défaut
+                 {"temperature": "Temperatures", "moisture": "MoistureFraction"}
+
+    Returns:
+        Dictionnaire {"Times": array, "<série>": array, ...}
+    """
+    if columns is None:
+        columns = {"temperature": "Temperatures", "moisture": "MoistureFraction"}
+
+    with open(file_path, "r", encoding="utf-8-sig", newline="") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        delimiter = ";" if sample.count(";") > sample.count(",") else ","
+        reader = csv.DictReader(f, delimiter=delimiter)
+        rows = list(reader)
+
+    measurements = {"Times": np.array([_parse_float(row[time_column]) for row in rows])}
+    for column, channel in columns.items():
+        if rows and column in rows[0]:
+            measurements[channel] = np.array([_parse_float(row[column]) for row in rows])
+
+    return measurements
+
+
+def apply_parameters(base_data, names, values):
+    """
+    Construit un jeu de données avec les paramètres calibrés remplacés
+
+    Args:
+        base_data: Dictionnaire de paramètres de référence
+        names: Noms des paramètres calibrés
+        values: Valeurs correspondantes
+
+    Returns:
+        Nouveau dictionnaire de paramètres
+    """
+    data = dict(base_data)
+    for name, value in zip(names, values):
+        value = float(value)
+        if name.endswith("_scale"):
+            key = name[:-len("_scale")]
+            data[key] = [v * value for v in base_data[key]]
+        elif "[" in name:
+            key, index = name[:-1].split("[")
+            data[key] = list(data[key])
+            data[key][int(index)] = value
+        else:
+            data[name] = value
+    return data
+
+
+def initial_value(base_data, name):
+    """Valeur de départ d'un paramètre : celle des données d'entrée ou la valeur par défaut du modèle"""
+    if "[" in name:
+        key, index = name[:-1].split("[")
+        return float(base_data[key][int(index)])
+    if name in ModelParameters.names():
+        return float(base_data.get(name, getattr(DEFAULT_PARAMETERS, name)))
+    return float(base_data.get(name, DEFAULT_VALUES.get(name)))
+
+
+def parameter_bounds(name):
+    """Bornes d'un paramètre calibrable"""
+    key = name.split("[")[0]
+    if key not in PARAMETER_BOUNDS:
+        raise ValueError(f"Paramètre non calibrable : {name}")
+    return PARAMETER_BOUNDS[key]
+
+
+class Calibration:
+    """
+    Ajustement de paramètres du modèle sur des séries mesurées.
+
+    Les simulations sont mises en cache par jeu de paramètres, si bien qu'un
+    point déjà évalué (pas refusé, jacobien, relance de l'ajustement) n'est
+    jamais recalculé. Le cache ne conserve que les séries mesurées, interpolées
+    aux instants de mesure.
+    """
+
+    def __init__(self, base_data, measurements, parameters, sigmas=None,
+                 workers=None, executor=None, pool=None):
+        """
+        Args:
+            base_data: Dictionnaire de paramètres de référence (format de run_simulation)
+            measurements: Séries mesurées (voir load_measurements)
+            parameters: Noms des paramètres à ajuster, ou dictionnaire {nom: valeur initiale}
+            sigmas: Écart-type de mesure par série (pondération des résidus)
+            workers: Nombre de processus pour les simulations
+            executor: Executor existant à réutiliser
+            pool: WorkerPool existant à réutiliser (prioritaire sur workers et
+                  executor). Sans pool ni executor, fit() crée un pool pour toute
+                  la durée de l'ajustement
+        """
+        self.base_data = base_data
+        self.measurements = measurements
+        if isinstance(parameters, dict):
+            self.names = list(parameters.keys())
+            self.initial = np.array([float(v) for v in parameters.values()])
+        else:
+            self.names = list(parameters)
+            self.initial = np.array([initial_value(base_data, name) for name in self.names])
+        bounds = [parameter_bounds(name) for name in self.names]
+        self.lower = np.array([b[0] for b in bounds])
+        self.upper = np.array([b[1] for b in bounds])
+
+        self.sigmas = dict(DEFAULT_SIGMAS)
+        if sigmas:
+            self.sigmas.update(sigmas)
+        self.channels = [c for c in measurements if c != "Times"]
+        self.workers = workers
+        self.executor = executor
+        self.pool = pool
+        self.cache = {}
+        self.n_simulations = 0
+
+    def _key(self, values):
+        return tuple(np.round(np.asarray(values, dtype=float), 12).tolist())
+
+    def _run_batch(self, datas, outputs=None):
+        """Simule plusieurs jeux de données sur le pool, l'executor ou des processus dédiés"""
+        if self.pool is not None:
+            return self.pool.run_batch(datas, outputs=outputs)
+        return run_batch(datas, workers=self.workers, executor=self.executor, outputs=outputs)
+
+    def project(self, result):
+        """
+        Séries mesurées d'un résultat, interpolées aux instants de mesure valides
+
+        Returns:
+            Dictionnaire {série: array des valeurs simulées}
+        """
+        times = self.measurements["Times"]
+        projection = {}
+        for channel in self.channels:
+            valid = ~np.isnan(self.measurements[channel]) & ~np.isnan(times)
+            projection[channel] = np.interp(times[valid], result["Times"], result[channel])
+        return projection
+
+    def simulate(self, points):
+        """
+        Simule plusieurs jeux de paramètres (en parallèle, avec cache)
+
+        Args:
+            points: Liste de vecteurs de paramètres
+
+        Returns:
+            Liste des séries simulées aux instants de mesure (voir project)
+        """
+        keys = [self._key(p) for p in points]
+        missing = []
+        for key in keys:
+            if key not in self.cache and key not in missing:
+                missing.append(key)
+
+        if missing:
+            datas = [apply_parameters(self.base_data, self.names, key) for key in missing]
+            results = self._run_batch(datas, outputs=self.channels)
+            self.n_simulations += len(missing)
+            for key, result in zip(missing, results):
+                self.cache[key] = self.project(result)
+
+        return [self.cache[key] for key in keys]
+
+    def residuals_from_projection(self, projection):
+        """Résidus pondérés (simulé - mesuré) / sigma à partir des séries projetées"""
+        times = self.measurements["Times"]
+        residuals = []
+        for channel in self.channels:
+            measured = self.measurements[channel]
+            valid = ~np.isnan(measured) & ~np.isnan(times)
+            residuals.append((projection[channel] - measured[valid]) / self.sigmas.get(channel, 1.0))
+        return np.concatenate(residuals)
+
+    def residuals_from_result(self, result):
+        """Résidus pondérés (simulé - mesuré) / sigma aux instants de mesure"""
+        return self.residuals_from_projection(self.project(result))
+
+    def residuals(self, values):
+        """Résidus pondérés pour un vecteur de paramètres"""
+        return self.residuals_from_projection(self.simulate([values])[0])
+
+    def jacobian(self, values, relative_step=1e-3):
+        """
+        Jacobien des résidus par différences finies, toutes les perturbations
+        étant simulées dans un même lot parallèle
+
+        Returns:
+            (résidus au point, jacobien (n_résidus, n_paramètres))
+        """
+        values = np.asarray(values, dtype=float)
+        steps = relative_step * np.maximum(np.abs(values), 1e-3)
+        points = [values]
+        for j in range(len(values)):
+            shifted = values.copy()
+            # Différence arrière si la perturbation sort des bornes
+            if shifted[j] + steps[j] > self.upper[j]:
+                steps[j] = -steps[j]
+            shifted[j] += steps[j]
+            points.append(shifted)
+
+        projections = self.simulate(points)
+        r0 = self.residuals_from_projection(projections[0])
+        J = np.empty((len(r0), len(values)))
+        for j in range(len(values)):
+            J[:, j] = (self.residuals_from_projection(projections[j + 1]) - r0) / steps[j]
+        return r0, J
+
+    def fit(self, max_iterations=30, tolerance=1e-6, relative_step=1e-3, progress=None):
+        """
+        Ajustement par Levenberg-Marquardt avec bornes (projection)
+
+        Args:
+            max_iterations: Nombre maximal d'itérations
+            tolerance: Tolérance relative sur la variation du coût et des paramètres
+            relative_step: Pas relatif des différences finies
+            progress: Fonction optionnelle appelée avec (itération, coût)
+
+        Returns:
+            Dictionnaire contenant les valeurs ajustées, erreurs types, intervalles de
+            confiance à 95 %, coût final, RMSE par série et nombre de simulations
+        """
+        workers = self.workers or os.cpu_count() or 1
+        own_pool = self.pool is None and self.executor is None and workers > 1
+        if own_pool:
+            # Un jacobien simule len(names) + 1 jeux de paramètres à la fois
+            self.pool = WorkerPool(min(workers, len(self.names) + 1))
+        try:
+            return self._fit(max_iterations, tolerance, relative_step, progress)
+        finally:
+            if own_pool:
+                self.pool.shutdown()
+                self.pool = None
+
+    def _fit(self, max_iterations, tolerance, relative_step, progress):
+        """Itérations de Levenberg-Marquardt (voir fit)"""
+        p = np.clip(self.initial, self.lower, self.upper)
+        r = self.residuals(p)
+        cost = 0.5 * float(r @ r)
+        damping = 1e-2
+        converged = False
+        iteration = 0
+
+        for iteration in range(1, max_iterations + 1):
+            r, J = self.jacobian(p, relative_step)
+            A = J.T @ J
+            g = J.T @ r
+            improved = False
+
+            while damping < 1e10:
+                scaled = A + damping * np.diag(np.maximum(np.diag(A), 1e-12))
+                try:
+                    step = np.linalg.solve(scaled, -g)
+                except np.linalg.LinAlgError:
+                    damping *= 4
+                    continue
+                p_new = np.clip(p + step, self.lower, self.upper)
+                r_new = self.residuals(p_new)
+                cost_new = 0.5 * float(r_new @ r_new)
+                if cost_new < cost:
+                    improved = True
+                    break
+                damping *= 4
+
+            if not improved:
+                converged = True
+                break
+
+            cost_change = (cost - cost_new) / max(cost, 1e-300)
+            param_change = np.max(np.abs(p_new - p) / np.maximum(np.abs(p), 1e-12))
+            p, r, cost = p_new, r_new, cost_new
+            damping = max(damping / 3, 1e-12)
+
+            if progress is not None:
+                progress(iteration, cost)
+            if cost_change < tolerance or param_change < tolerance:
+                converged = True
+                break
+
+        return self.summary(p, relative_step, iteration, converged)
+
+    def summary(self, values, relative_step=1e-3, iterations=0, converged=False):
+        """Statistiques de l'ajustement au point donné (covariance depuis le jacobien)"""
+        r, J = self.jacobian(values, relative_step)
+        n_obs, n_par = J.shape
+        dof = max(n_obs - n_par, 1)
+        s2 = float(r @ r) / dof
+
+        try:
+            covariance = s2 * np.linalg.inv(J.T @ J)
+            stderr = np.sqrt(np.maximum(np.diag(covariance), 0))
+        except np.linalg.LinAlgError:
+            covariance = np.full((n_par, n_par), np.nan)
+            stderr = np.full(n_par, np.nan)
+
+        t_value = stats.t.ppf(0.975, dof) if stats is not None else 1.96
+
+        best = self._run_batch([apply_parameters(self.base_data, self.names, values)])[0]
+        rmse = {}
+        offset = 0
+        for channel in self.channels:
+            measured = self.measurements[channel]
+            n = int(np.sum(~np.isnan(measured) & ~np.isnan(self.measurements["Times"])))
+            chunk = r[offset:offset + n] * self.sigmas.get(channel, 1.0)
+            rmse[channel] = float(np.sqrt(np.mean(chunk ** 2))) if n else math.nan
+            offset += n
+
+        return {
+            "parameters": dict(zip(self.names, values.tolist())),
+            "stderr": dict(zip(self.names, stderr.tolist())),
+            "ci95": {
+                name: (value - t_value * err, value + t_value * err)
+                for name, value, err in zip(self.names, values.tolist(), stderr.tolist())
+            },
+            "covariance": covariance,
+            "cost": 0.5 * float(r @ r),
+            "rmse": rmse,
+            "iterations": iterations,
+            "converged": converged,
+            "n_simulations": self.n_simulations,
+            "result": best,
+            "data": apply_parameters(self.base_data, self.names, values),
+        }
+
+
+def calibrate(base_data, measurements, parameters, sigmas=None, workers=None,
+              executor=None, pool=None, **fit_options):
+    """
+    Raccourci : ajuste les paramètres sur les mesures et renvoie le résumé
+
+    Args:
+        base_data: Dictionnaire de paramètres de référence
+        measurements: Séries mesurées ou chemin d'un fichier CSV
+        parameters: Noms des paramètres à ajuster (ex. ["fKT20_scale", "HBVS", "insulation_factor"])
+        sigmas: Écart-type de mesure par série
+        workers: Nombre de processus
+        executor: Executor existant à réutiliser
+        pool: WorkerPool existant à réutiliser
+        **fit_options: Options transmises à Calibration.fit
+
+    Returns:
+        Dictionnaire de résultats (voir Calibration.fit)
+    """
+    if isinstance(measurements, str):
+        measurements = load_measurements(measurements)
+    calibration = Calibration(base_data, measurements, parameters, sigmas=sigmas,
+                              workers=workers, executor=executor, pool=pool)
+    return calibration.fit(**fit_options)
@@ -0,0 +1,154 @@
+"""
+Réacteur en alimentation continue (écoulement piston) avec apports périodiques.
+
+Dans ce mode, FR est un débit d'alimentation (kg/h) et HRT le temps de séjour
+(heures). Toutes les feed_interval heures, une cohorte de substrat frais
+(FR × feed_interval kg) entre dans le réacteur. Chaque cohorte vieillit sans se
+mélanger aux autres : le facteur de chaleur de phase dépend de son âge. Une
+cohorte est soutirée comme produit lorsqu'elle atteint le temps de séjour.
+
+Les cohortes sont stockées dans une file circulaire à capacité fixe (arrays
+EnsembleState) : la cohorte soutirée libère l'emplacement de la cohorte fraîche,
+sans allocation pendant la simulation. Le débit d'air, l'eau ajoutée et les
+pertes par les parois sont ceux du réacteur entier, répartis à parts égales
+entre les emplacements (tranches du réacteur).
+"""
+import math
+
+import numpy as np
+
+from modelvic import SimulationModel
+from ensemble import EnsembleState, ensemble_step
+from kernel import S_QAIR, S_TAIR, S_PV, S_P, S_MAIRIN, S_MWVIN, S_MWAD, X_T
+
+
+class ContinuousReactorModel:
+    """
+    Simulation d'un réacteur de bio-séchage alimenté en continu
+    """
+
+    @staticmethod
+    def run_simulation(data, duration=None, feed_interval=24, params=None):
+        """
+        Exécute une simulation en alimentation continue
+
+        Args:
+            data: Dictionnaire de paramètres (format de SimulationModel.run_simulation) ;
+                  'FR' est le débit d'alimentation de chaque substrat (kg/h) et
+                  'HRT' le temps de séjour (heures)
+            duration: Durée de fonctionnement simulée (heures, défaut : 3 × HRT)
+            feed_interval: Intervalle entre deux apports (heures, défaut : quotidien).
+                           Le temps de séjour effectif est arrondi au multiple
+                           supérieur de cet intervalle
+            params: Constantes du modèle (ModelParameters) ;
+                    schéma explicite au pas horaire uniquement (voir ensemble.check_solver)
+
+        Returns:
+            Dictionnaire des résultats horaires du réacteur (Times, Temperatures,
+            Moisture, MoistureFraction, QExhaustgases, VExhaustgases,
+            RelativeHumidity, Solids, NH3, Cohorts), et du produit soutiré :
+                'Product': {'Times', 'Solids', 'Moisture', 'MoistureFraction'},
+                           une valeur par cohorte soutirée
+                'Fed': masse totale introduite (kg)
+        """
+        feed_interval = int(feed_interval)
+        if feed_interval < 1:
+            raise ValueError("feed_interval doit être un entier positif (heures)")
+
+        # Cohorte type : un apport de FR × feed_interval kg
+        feed_data = dict(data, FR=[float(fr) * feed_interval for fr in data.get('FR', [])])
+        cohort = SimulationModel.prepare(feed_data, params)
+        params = cohort.params
+        residence = cohort.HRT
+        if duration is None:
+            duration = 3 * residence
+        duration = int(duration)
+        if duration < 1:
+            raise ValueError("duration doit être un entier positif (heures)")
+
+        # Séries de l'air entrant sur toute la durée de fonctionnement
+        plant = SimulationModel.prepare(dict(feed_data, HRT=duration), params)
+        series = plant.series
+        consts = cohort.consts
+
+        # File circulaire : un emplacement par apport présent dans le réacteur
+        capacity = math.ceil(residence / feed_interval)
+        residence = capacity * feed_interval
+        share = 1.0 / capacity
+        fresh = EnsembleState.from_setups([cohort])
+        fresh.base_hlc = fresh.base_hlc * share
+        slots = EnsembleState.from_setups([cohort] * capacity)
+        active = np.zeros(capacity, dtype=bool)
+        age = np.zeros(capacity, dtype=int)
+        phase_by_age = np.array([params.heat_factor(a / residence) for a in range(residence)])
+
+        results = {name: np.zeros(duration + 1) for name in (
+            "Temperatures", "Moisture", "MoistureFraction", "QExhaustgases",
+            "VExhaustgases", "RelativeHumidity", "Solids", "NH3", "Cohorts",
+        )}
+        results["Temperatures"][0] = cohort.state[X_T]
+        results["RelativeHumidity"][0] = 60
+
+        n_withdrawals = duration // feed_interval + 1
+        product_times = np.zeros(n_withdrawals)
+        product_solids = np.zeros(n_withdrawals)
+        product_moisture = np.zeros(n_withdrawals)
+        n_product = 0
+        emitted_NH3 = 0.0
+        fed = 0.0
+        cohort_mass = cohort.S_tot_in + cohort.H_tot_in
+
+        for t in range(duration):
+            # Soutirage puis apport : la cohorte fraîche prend la place de la plus ancienne
+            if t % feed_interval == 0:
+                slot = (t // feed_interval) % capacity
+                if active[slot]:
+                    solids = slots.ASH_NBVS[slot].sum() + slots.BVS[slot].sum()
+                    product_times[n_product] = t
+                    product_solids[n_product] = solids
+                    product_moisture[n_product] = slots.mws[slot]
+                    n_product += 1
+                slots.set_member(slot, fresh)
+                active[slot] = True
+                age[slot] = 0
+                fed += cohort_mass
+
+            Qair = np.where(active, series[S_QAIR, t] * share, 0.0)
+            step = ensemble_step(
+                slots, consts, Qair, series[S_TAIR, t], series[S_PV, t], series[S_P, t],
+                np.where(active, series[S_MAIRIN, t] * share, 0.0),
+                np.where(active, series[S_MWVIN, t] * share, 0.0),
+                np.where(active, series[S_MWAD, t] * share, 0.0),
+                phase_by_age[np.minimum(age, residence - 1)],
+            )
+            age += 1
+            emitted_NH3 += step["mNH3"][active].sum()
+
+            # Résultats du réacteur (cohortes présentes)
+            Stot = step["Solids"][active].sum()
+            mws = step["mws"][active].sum()
+            results["Temperatures"][t + 1] = step["T"][active].mean()
+            results["Moisture"][t + 1] = mws
+            results["MoistureFraction"][t + 1] = mws / (Stot + mws) * 100 if Stot + mws > 0 else 0.0
+            results["QExhaustgases"][t + 1] = step["mgasout"][active].sum()
+            results["VExhaustgases"][t + 1] = step["Vgases"][active].sum()
+            results["RelativeHumidity"][t + 1] = step["RH"][active].mean()
+            results["Solids"][t + 1] = Stot
+            results["NH3"][t + 1] = emitted_NH3
+            results["Cohorts"][t + 1] = active.sum()
+
+        output = {"Times": list(range(duration + 1))}
+        for name, values in results.items():
+            output[name] = values.tolist()
+        product_solids = product_solids[:n_product]
+        product_moisture = product_moisture[:n_product]
+        product_total = np.maximum(product_solids + product_moisture, 1e-12)
+        output["Product"] = {
+            "Times": product_times[:n_product].tolist(),
+            "Solids": product_solids.tolist(),
+            "Moisture": product_moisture.tolist(),
+            "MoistureFraction": (product_moisture / product_total * 100).tolist(),
+        }
+        output["Fed"] = fed
+        output["process_volume"] = capacity * cohort.process_volume
+        return output
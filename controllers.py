@@ -0,0 +1,268 @@
+"""
+Régulation de l'aération en boucle fermée.
+
+Un régulateur fixe le débit d'air de chaque pas de temps à partir de l'état
+mesuré du procédé (température du tas, O2 dans l'air sortant), au lieu du débit
+constant ou du cycle ON/OFF fixe de run_simulation. Les régulateurs travaillent
+sur des arrays : un seul passage simule M lots, chacun avec ses propres réglages
+(consignes, gains...), ce qui permet d'évaluer des milliers de combinaisons.
+
+Exemple (stratégie de type Rutgers : aération minimale temporisée et
+refroidissement par rétroaction sur la température) :
+
+    gains = np.linspace(1, 20, 1000)
+    controller = MaxController(
+        ScheduleController(flow=5.0, on_time=1, off_time=3),
+        PIDController(setpoint=60.0, kp=gains, ki=0.1, q_max=50.0),
+    )
+    results = run_controlled(data, controller, n=len(gains))
+"""
+import numpy as np
+
+from modelvic import SimulationModel, OUTPUT_CHANNELS
+from ensemble import EnsembleState, ensemble_step
+from kernel import S_TAIR, S_PV, S_P, S_MWAD, S_PHASE, O_T, O_MOIST, O_MFRAC, O_RH, O_SOLIDS
+from plant import blower_power
+from psychrometrics import dry_air_flow, vapour_flow
+
+
+# O2 de l'air entrant (% vol, valeur du bilan VPO2calculated du modèle)
+AIR_OXYGEN = 21.0
+
+
+class AerationController:
+    """
+    Base des régulateurs d'aération
+
+    Les réglages passés au constructeur sont des scalaires ou des arrays (M,),
+    un par lot simulé. Les mesures reçues par __call__ sont :
+        'T': température du tas (°C)
+        'VPO2': O2 dans l'air sortant au pas précédent (% vol, VPO2calculated du
+                modèle borné à [0, AIR_OXYGEN] : 0 lorsque la consommation d'O2
+                dépasse l'apport d'air)
+    """
+
+    def reset(self, n):
+        """Réinitialise l'état interne pour n lots"""
+        self.n = n
+
+    def __call__(self, t, measurements):
+        """
+        Débit d'air à appliquer pendant l'heure t
+
+        Args:
+            t: Heure courante
+            measurements: Dictionnaire de mesures (arrays (n,))
+
+        Returns:
+            Débits d'air (m³/h), array (n,)
+        """
+        raise NotImplementedError
+
+    def _setting(self, value):
+        return np.broadcast_to(np.asarray(value, dtype=float), (self.n,))
+
+
+class ScheduleController(AerationController):
+    """Aération temporisée (boucle ouverte) : flow pendant on_time h toutes les on_time + off_time h"""
+
+    def __init__(self, flow, on_time=1.0, off_time=0.0):
+        self.flow = flow
+        self.on_time = on_time
+        self.off_time = off_time
+
+    def __call__(self, t, measurements):
+        flow = self._setting(self.flow)
+        on_time = self._setting(self.on_time)
+        period = on_time + self._setting(self.off_time)
+        # Même convention que SimulationModel.aeration_schedule (cycle en heures)
+        return np.where((period <= 0) | (np.mod(t, np.where(period > 0, period, 1.0)) < on_time), flow, 0.0)
+
+
+class HysteresisController(AerationController):
+    """
+    Tout ou rien avec hystérésis sur la température
+
+    Le ventilateur démarre lorsque T >= t_on et s'arrête lorsque T <= t_off.
+    """
+
+    def __init__(self, t_on=60.0, t_off=55.0, q_on=20.0, q_off=0.0):
+        self.t_on = t_on
+        self.t_off = t_off
+        self.q_on = q_on
+        self.q_off = q_off
+
+    def reset(self, n):
+        super().reset(n)
+        if np.any(np.asarray(self.t_off) > np.asarray(self.t_on)):
+            raise ValueError("t_off doit être inférieure ou égale à t_on")
+        self.running = np.zeros(n, dtype=bool)
+
+    def __call__(self, t, measurements):
+        T = measurements["T"]
+        self.running = np.where(T >= self._setting(self.t_on), True,
+                                np.where(T <= self._setting(self.t_off), False, self.running))
+        return np.where(self.running, self._setting(self.q_on), self._setting(self.q_off))
+
+
+class PIDController(AerationController):
+    """
+    PID sur la température du tas : le débit augmente lorsque T dépasse la consigne
+
+    Q = q_min + kp·e + ki·Σe + kd·de/dt, borné à [q_min, q_max], avec e = T - consigne.
+    L'intégrale est gelée lorsque la sortie est saturée (anti-emballement).
+    """
+
+    def __init__(self, setpoint=60.0, kp=2.0, ki=0.05, kd=0.0, q_min=0.0, q_max=50.0):
+        self.setpoint = setpoint
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.q_min = q_min
+        self.q_max = q_max
+
+    def error(self, measurements):
+        """Écart à la consigne (positif lorsqu'il faut plus d'air)"""
+        return measurements["T"] - self._setting(self.setpoint)
+
+    def reset(self, n):
+        super().reset(n)
+        self.integral = np.zeros(n)
+        self.previous_error = None
+
+    def __call__(self, t, measurements):
+        e = self.error(measurements)
+        derivative = np.zeros(self.n) if self.previous_error is None else e - self.previous_error
+        self.previous_error = e
+
+        q_min = self._setting(self.q_min)
+        q_max = self._setting(self.q_max)
+        integral = self.integral + e
+        Q = q_min + self._setting(self.kp) * e + self._setting(self.ki) * integral + self._setting(self.kd) * derivative
+
+        # Anti-emballement : pas d'intégration lorsque la sortie sature dans le sens de l'écart
+        saturated = ((Q > q_max) & (e > 0)) | ((Q < q_min) & (e < 0))
+        self.integral = np.where(saturated, self.integral, integral)
+        return np.clip(Q, q_min, q_max)
+
+
+class OxygenController(PIDController):
+    """
+    Régulation sur l'O2 de l'air sortant : le débit augmente lorsque l'O2 descend
+    sous la consigne (% vol)
+
+    Le déficit en O2 varie comme l'inverse du débit : le gain du procédé est
+    d'autant plus fort que le débit est faible. Les gains par défaut, surtout
+    intégraux, restent stables jusqu'à q_min sur le cas de démonstration.
+    """
+
+    def __init__(self, setpoint=15.0, kp=0.2, ki=0.2, kd=0.0, q_min=1.0, q_max=50.0):
+        super().__init__(setpoint, kp, ki, kd, q_min, q_max)
+
+    def error(self, measurements):
+        return self._setting(self.setpoint) - measurements["VPO2"]
+
+
+class MaxController(AerationController):
+    """Combinaison de régulateurs : le débit appliqué est le plus grand des débits demandés"""
+
+    def __init__(self, *controllers):
+        if not controllers:
+            raise ValueError("MaxController nécessite au moins un régulateur")
+        self.controllers = controllers
+
+    def reset(self, n):
+        super().reset(n)
+        for controller in self.controllers:
+            controller.reset(n)
+
+    def __call__(self, t, measurements):
+        flows = [controller(t, measurements) for controller in self.controllers]
+        return np.maximum.reduce(flows)
+
+
+def run_controlled(data, controller, n=None, params=None, pressure_drop=2000.0, blower_efficiency=0.6):
+    """
+    Simule des lots dont l'aération est fixée par un régulateur
+
+    Args:
+        data: Dictionnaire de paramètres (format de run_simulation), ou liste de
+              dictionnaires (un par lot, même HRT et même nombre de substrats) ;
+              'air_flow' et le cycle ON/OFF sont ignorés ; sans params, chaque lot
+              garde ses propres constantes du modèle (ModelParameters.from_data)
+        controller: AerationController (réglages scalaires ou arrays (n,))
+        n: Nombre de lots identiques à simuler lorsque data est un dictionnaire
+           (défaut : 1)
+        params: Constantes du modèle (ModelParameters) ;
+                schéma explicite au pas horaire uniquement (voir ensemble.check_solver)
+        pressure_drop: Perte de charge pour le calcul de l'énergie (Pa)
+        blower_efficiency: Rendement des soufflantes (0-1)
+
+    Returns:
+        Dictionnaire : 'Times', les séries de OUTPUT_CHANNELS, 'AirFlow' et 'VPO2'
+        (arrays (n, HRT+1)), 'AirVolume' (m³) et 'Energy' (kWh) par lot (arrays (n,))
+    """
+    if isinstance(data, dict):
+        setup = SimulationModel.prepare(data, params)
+        setups = [setup] * (1 if n is None else int(n))
+    else:
+        setups = [SimulationModel.prepare(d, params) for d in data]
+    if not setups:
+        raise ValueError("Aucun lot à simuler")
+    if len({setup.HRT for setup in setups}) > 1 or len({setup.fBVS.shape for setup in setups}) > 1:
+        raise ValueError("Les lots doivent avoir la même durée et le même nombre de substrats")
+
+    m = len(setups)
+    HRT = setups[0].HRT
+    # Constantes propres à chaque lot (ModelParameters.from_data)
+    consts = np.array([setup.consts for setup in setups])
+    state = EnsembleState.from_setups(setups)
+    if all(setup is setups[0] for setup in setups):
+        series = np.broadcast_to(setups[0].series, (m,) + setups[0].series.shape)
+    else:
+        series = np.array([setup.series for setup in setups])
+
+    # Masses d'air sec et de vapeur par m³ d'air entrant (kg/m³)
+    Tair = series[:, S_TAIR]
+    PV = series[:, S_PV]
+    P = series[:, S_P]
+    dry_air_density = dry_air_flow(1.0, P, PV, Tair)
+    vapour_density = vapour_flow(1.0, PV, Tair)
+
+    out = np.zeros((len(OUTPUT_CHANNELS), m, HRT + 1))
+    out[O_T, :, 0] = state.T
+    out[O_MOIST, :, 0] = [setup.H_tot_in for setup in setups]
+    out[O_MFRAC, :, 0] = [setup.FH_tot_in for setup in setups]
+    out[O_RH, :, 0] = 60
+    out[O_SOLIDS, :, 0] = [setup.S_tot_in for setup in setups]
+    airflow = np.zeros((m, HRT + 1))
+    oxygen = np.zeros((m, HRT + 1))
+    oxygen[:, 0] = 20.95
+
+    controller.reset(m)
+    for t in range(HRT):
+        measurements = {"T": state.T, "VPO2": oxygen[:, t]}
+        Qair = np.maximum(np.asarray(controller(t, measurements), dtype=float) * np.ones(m), 0.0)
+
+        step = ensemble_step(
+            state, consts, Qair, Tair[:, t], PV[:, t], P[:, t],
+            dry_air_density[:, t] * Qair, vapour_density[:, t] * Qair,
+            series[:, S_MWAD, t], series[:, S_PHASE, t],
+        )
+
+        # step suit l'ordre de OUTPUT_CHANNELS
+        for k, name in enumerate(("T", "mws", "FH", "mgasout", "Vgases", "RH", "Solids", "NH3")):
+            out[k, :, t + 1] = step[name]
+        airflow[:, t + 1] = Qair
+        # Mesure bornée à [0, O2 de l'air] : le bilan devient négatif lorsque la
+        # demande en O2 dépasse l'apport (air épuisé en O2)
+        oxygen[:, t + 1] = np.clip(step["VPO2"], 0.0, AIR_OXYGEN)
+
+    results = {"Times": list(range(HRT + 1))}
+    for k, name in enumerate(OUTPUT_CHANNELS):
+        results[name] = out[k]
+    results["AirFlow"] = airflow
+    results["VPO2"] = oxygen
+    results["AirVolume"] = airflow.sum(axis=1)
+    results["Energy"] = blower_power(airflow, pressure_drop, blower_efficiency).sum(axis=1)
+    return results
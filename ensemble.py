@@ -0,0 +1,310 @@
+"""
+Pas de temps vectorisé sur un ensemble de réacteurs, de couches ou de cohortes.
+
+Reprend la physique du noyau horaire (kernel.hourly_kernel) sous forme d'opérations
+NumPy sur M membres à la fois : états scalaires en arrays (M,), grandeurs par
+substrat en arrays (M, NS). Chaque membre reçoit ses propres conditions d'air
+entrant, ce qui permet de chaîner des couches (air en série), de partager un
+débit entre réacteurs ou de piloter l'aération membre par membre.
+
+Seul le schéma explicite au pas horaire est disponible : des paramètres
+energy_solver, time_step ou segment_drift_limit différents de leur valeur par
+défaut sont refusés (ValueError) à la construction de l'état.
+"""
+import numpy as np
+
+from kernel import (
+    X_T, X_MWS, X_FS, X_FH, X_FVS, X_NH3,
+    U_ASH_NBVS, U_FKT20, U_SKT20, U_CP, U_TCO2, U_TNH3, U_TO2, U_TH2O,
+    C_HBVS, C_FO2, C_BASE_HLC, C_AERATION_LOSS, C_HEAT_DAMPING, C_COOL_DAMPING,
+    C_MOIST_OPT, C_MOIST_TOL, C_THETA_G, C_THETA_I, C_DSUB, C_DWATER, C_ASH_TOT,
+    C_CPWATER, C_CPAIR,
+)
+from psychrometrics import saturation_pressure, latent_heat, vapour_flow
+
+
+class EnsembleState:
+    """
+    État vectorisé de M membres (réacteurs, couches ou cohortes)
+
+    Les masses (eau, BVS, cendres) sont extensives et propres à chaque membre ;
+    les propriétés par substrat sont des arrays (M, NS).
+    """
+
+    FIELDS = ("T", "mws", "FS", "FH", "FVS", "NH3", "fBVS", "sBVS", "BVS",
+              "ASH_NBVS", "ASH_tot", "fKT20", "sKT20", "Cp", "TCO2", "TNH3",
+              "TO2", "TH2O", "HBVS", "base_hlc")
+
+    def __init__(self, T, mws, FS, FH, FVS, NH3, fBVS, sBVS, BVS,
+                 ASH_NBVS, ASH_tot, fKT20, sKT20, Cp, TCO2, TNH3, TO2, TH2O,
+                 HBVS, base_hlc):
+        self.T = T
+        self.mws = mws
+        self.FS = FS
+        self.FH = FH
+        self.FVS = FVS
+        self.NH3 = NH3
+        self.fBVS = fBVS
+        self.sBVS = sBVS
+        self.BVS = BVS
+        self.ASH_NBVS = ASH_NBVS
+        self.ASH_tot = ASH_tot
+        self.fKT20 = fKT20
+        self.sKT20 = sKT20
+        self.Cp = Cp
+        self.TCO2 = TCO2
+        self.TNH3 = TNH3
+        self.TO2 = TO2
+        self.TH2O = TH2O
+        self.HBVS = HBVS
+        self.base_hlc = base_hlc
+
+    @property
+    def size(self):
+        """Nombre de membres"""
+        return len(self.T)
+
+    def set_member(self, i, other, j=0):
+        """
+        Remplace le membre i par le membre j d'un autre ensemble (mise à jour en place)
+
+        Args:
+            i: Indice du membre à remplacer
+            other: EnsembleState source (même nombre de substrats)
+            j: Indice du membre source
+        """
+        for name in self.FIELDS:
+            getattr(self, name)[i] = getattr(other, name)[j]
+
+    @classmethod
+    def from_setups(cls, setups, fractions=None):
+        """
+        Empile les états initiaux de plusieurs simulations préparées
+
+        Args:
+            setups: Liste de SimulationSetup (même nombre de substrats)
+            fractions: Part de chaque setup attribuée au membre (1 par défaut) :
+                       les masses et les pertes thermiques sont multipliées par
+                       cette part, les grandeurs intensives sont inchangées
+
+        Returns:
+            EnsembleState
+
+        Raises:
+            ValueError: paramètres de résolution non pris en charge (voir check_solver)
+        """
+        for setup in setups:
+            check_solver(setup.params)
+        if fractions is None:
+            fractions = np.ones(len(setups))
+        fractions = np.asarray(fractions, dtype=float)
+        column = fractions[:, None]
+
+        state = np.array([setup.state for setup in setups])
+        subs = np.array([setup.subs for setup in setups])
+        consts = np.array([setup.consts for setup in setups])
+
+        return cls(
+            T=state[:, X_T].copy(),
+            mws=state[:, X_MWS] * fractions,
+            FS=state[:, X_FS].copy(),
+            FH=state[:, X_FH].copy(),
+            FVS=state[:, X_FVS].copy(),
+            NH3=state[:, X_NH3] * fractions,
+            fBVS=np.array([setup.fBVS for setup in setups]) * column,
+            sBVS=np.array([setup.sBVS for setup in setups]) * column,
+            BVS=np.array([setup.BVS for setup in setups]) * column,
+            ASH_NBVS=subs[:, U_ASH_NBVS] * column,
+            ASH_tot=consts[:, C_ASH_TOT] * fractions,
+            fKT20=subs[:, U_FKT20].copy(),
+            sKT20=subs[:, U_SKT20].copy(),
+            Cp=subs[:, U_CP].copy(),
+            TCO2=subs[:, U_TCO2].copy(),
+            TNH3=subs[:, U_TNH3].copy(),
+            TO2=subs[:, U_TO2].copy(),
+            TH2O=subs[:, U_TH2O].copy(),
+            HBVS=consts[:, C_HBVS].copy(),
+            base_hlc=consts[:, C_BASE_HLC] * fractions,
+        )
+
+    @classmethod
+    def split(cls, setup, n):
+        """
+        Découpe une simulation en n membres identiques (couches d'un même tas)
+
+        Args:
+            setup: SimulationSetup
+            n: Nombre de membres
+
+        Returns:
+            EnsembleState dont chaque membre porte 1/n des masses
+        """
+        return cls.from_setups([setup] * n, np.full(n, 1.0 / n))
+
+
+def check_solver(params):
+    """
+    Vérifie que les paramètres de résolution sont ceux du pas vectorisé
+
+    Args:
+        params: Constantes du modèle (ModelParameters)
+
+    Raises:
+        ValueError: schéma implicite, pas de plusieurs heures ou segments
+                    quasi isothermes demandés
+    """
+    if params.energy_solver != "explicit" or params.time_step != 1 or params.segment_drift_limit != 0:
+        raise ValueError("Le pas vectorisé n'utilise que le schéma explicite au pas horaire "
+                         "(energy_solver='explicit', time_step=1, segment_drift_limit=0)")
+
+
+def moisture_availability(FS):
+    """Facteur biologique F1 (disponibilité de l'eau) en fonction de la fraction solide (%)"""
+    return 1 / (np.exp(-17.684 * (1 - FS / 100) + 7.0622) + 1)
+
+
+def ensemble_step(s, consts, Qair, Tairin, PV, P, mairin, mwvin, mwad, phase, Tambient=None):
+    """
+    Avance tous les membres d'une heure (mise à jour de s en place)
+
+    Args:
+        s: EnsembleState
+        consts: Constantes du modèle (indices C_* de kernel, voir SimulationSetup.consts),
+                communes (N_CONSTS,) ou propres à chaque membre (M, N_CONSTS)
+        Qair: Débit d'air de chaque membre (m³/h)
+        Tairin: Température de l'air entrant (°C)
+        PV: Pression de vapeur de l'air entrant (Pa)
+        P: Pression atmosphérique (Pa)
+        mairin: Débit d'air sec entrant (kg/h)
+        mwvin: Débit de vapeur entrant (kg/h)
+        mwad: Eau ajoutée (kg/h)
+        phase: Facteur de chaleur de la phase de compostage
+        Tambient: Température extérieure pour les pertes par les parois
+                  (par défaut, celle de l'air entrant)
+
+    Les arguments peuvent être des scalaires ou des arrays (M,).
+
+    Returns:
+        Dictionnaire d'arrays (M,) : T, mws, FH, Solids, mgasout, Vgases, RH, NH3
+        (cumulé), PVO, mwvout, mCO2, mNH3, mO2, Cp_total, VPO2 (O2 en sortie, % vol)
+    """
+    consts = np.asarray(consts)
+    # FO2 multiplie des grandeurs par substrat (M, NS)
+    FO2 = consts[..., C_FO2, None]
+    aeration_loss_coefficient = consts[..., C_AERATION_LOSS]
+    heating_damping = consts[..., C_HEAT_DAMPING]
+    cooling_damping = consts[..., C_COOL_DAMPING]
+    moisture_optimum = consts[..., C_MOIST_OPT]
+    moisture_tolerance = consts[..., C_MOIST_TOL]
+    theta_growth = consts[..., C_THETA_G]
+    theta_inhibition = consts[..., C_THETA_I]
+    Deltasubstrate = consts[..., C_DSUB]
+    Deltawater = consts[..., C_DWATER]
+    Cpwater = consts[..., C_CPWATER]
+    Cpair = consts[..., C_CPAIR]
+
+    if Tambient is None:
+        Tambient = Tairin
+    Qair = np.asarray(Qair, dtype=float)
+    aerated = Qair > 0
+    T = s.T
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Caractéristiques biologiques
+        F1 = moisture_availability(s.FS)
+        Gm = 1/((s.FVS/100)/1 + ((1 - s.FVS/100)/2.5))
+        FAS = 1 - ((Deltasubstrate * s.FS/100) / (Gm * Deltawater) - (Deltasubstrate * (s.FH/100)/Deltawater))
+        F2 = 1/(np.exp(-23.675*FAS + 3.4945) + 1)
+
+        # Dégradation par substrat
+        thermal = (theta_growth**(T-20) - theta_inhibition**(T-60))[:, None]
+        fKT = np.maximum(s.fKT20 * thermal, 0.0)
+        sKT = np.maximum(s.sKT20 * thermal, 0.0)
+        fK = fKT * F1[:, None] * F2[:, None] * FO2
+        sK = sKT * F1[:, None] * F2[:, None] * FO2
+        fBVSout = s.fBVS / (1 + fK * (1/24))
+        sBVSout = s.sBVS / (1 + sK * (1/24))
+        BVSout = fBVSout + sBVSout
+        Sout = s.ASH_NBVS + BVSout
+        BVSdegraded = s.BVS - BVSout
+
+        Stotout = Sout.sum(axis=1)
+        BVSdegradedtot = BVSdegraded.sum(axis=1)
+        mCO2tot = (s.TCO2 * BVSdegraded).sum(axis=1)
+        mNH3tot = (s.TNH3 * BVSdegraded).sum(axis=1)
+        mO2tot = (s.TO2 * BVSdegraded).sum(axis=1)
+        mwptot = (s.TH2O * BVSdegraded).sum(axis=1)
+        Cp_solids = (Sout * s.Cp).sum(axis=1)
+
+        # Bilan d'air et d'eau
+        mgasout = mairin + mCO2tot + mNH3tot - mO2tot
+        HLv = latent_heat(T)
+        PVSO = saturation_pressure(T)
+        PVO = np.minimum(PV + (PVSO - PV) * F1, PVSO)
+        mwvout = np.where(aerated, vapour_flow(Qair, PVO, T), 0.0)
+        mwsout = np.maximum(s.mws + mwptot + mwad + mwvin - mwvout, 0.0)
+
+        # Mise à jour des fractions
+        total = Stotout + mwsout
+        FHtotout = np.where(total > 0, (mwsout / total) * 100, 0.0)
+        FStotout = np.where(total > 0, (Stotout / total) * 100, 0.0)
+        FVStotout = np.where(Stotout > 0, ((Stotout - s.ASH_tot) / Stotout) * 100, 0.0)
+
+        # Facteur de chaleur : phase, température, humidité
+        heat_factor = phase * np.where(
+            T > 65, np.maximum(0.2, 1.0 - ((T - 65) / 20)),
+            np.where(T < 15, np.maximum(0.5, T / 15), 1.0)
+        )
+        heat_factor = heat_factor * np.maximum(0.3, 1.0 - np.abs(FHtotout - moisture_optimum) / moisture_tolerance)
+
+        # Bilan énergétique : parois (air extérieur) et aération (air entrant)
+        Horg = s.HBVS * BVSdegradedtot * heat_factor
+        H_loss = s.base_hlc * (T - Tambient) + np.where(aerated, Qair * aeration_loss_coefficient, 0.0) * (T - Tairin)
+        H_evap = (mwvout - mwvin) * HLv
+        H_available = Horg - H_evap - H_loss
+        Cp_total = Cp_solids + mwsout * Cpwater + mgasout * Cpair
+
+        delta_T = np.where(Cp_total > 0, H_available / Cp_total, 0.0)
+        Tprocess = T + np.where(delta_T > 0, delta_T * heating_damping, delta_T * cooling_damping)
+
+        RHO = (PVO / PVSO) * 100
+        Vgases = np.where(
+            P > PVO,
+            (8.314 * (Tprocess + 273) / (P - PVO)) * ((mairin / (28.96/1000)) +
+                                                     (mCO2tot / (44/1000)) +
+                                                     (mNH3tot / (17/1000)) -
+                                                     (mO2tot / (32/1000))),
+            0.0
+        )
+
+        # O2 dans les gaz de sortie (% vol), calculé comme VPO2calculated du modèle
+        VPO2 = np.where(mgasout > 0, (21 / 100) * (mairin - mO2tot) / mgasout * 100, 0.0) * np.ones_like(T)
+
+    # Mise à jour de l'état
+    s.fBVS = fBVSout
+    s.sBVS = sBVSout
+    s.BVS = BVSout
+    s.T = Tprocess
+    s.mws = mwsout
+    s.FS = FStotout
+    s.FH = FHtotout
+    s.FVS = FVStotout
+    s.NH3 = s.NH3 + mNH3tot
+
+    return {
+        "T": Tprocess,
+        "mws": mwsout,
+        "FH": FHtotout,
+        "Solids": Stotout,
+        "mgasout": mgasout,
+        "Vgases": Vgases,
+        "RH": RHO,
+        "NH3": s.NH3,
+        "PVO": PVO,
+        "mwvout": mwvout,
+        "mCO2": mCO2tot,
+        "mNH3": mNH3tot,
+        "mO2": mO2tot,
+        "Cp_total": Cp_total,
+        "VPO2": VPO2,
+    }
@@ -19,6 +19,9 @@ import sys
 from scipy.signal import savgol_filter
 # Import du module de modèle
 from modelvic import SimulationModel
+from batch import WorkerPool
+from results import SimulationResult, gas_emissions, cn_ratios, phase_boundaries
+from pareto import pareto_search, OBJECTIVES
 import matplotlib.patches as mpatches
 
 # Gestionnaire de signal pour capturer les interruptions
@@ -47,6 +50,10 @@ class BioProcessApp(ctk.CTk):
         self.input_data = {}
         self.results = {}
         
+        # Pool de processus de calcul, démarré à la première simulation et
+        # conservé jusqu'à la fermeture
+        self.worker_pool = WorkerPool()
+        
         # Create tabs
         self.notebook = ctk.CTkTabview(self)
         self.notebook.pack(expand=True, fill="both", padx=15, pady=15)
@@ -69,6 +76,12 @@ class BioProcessApp(ctk.CTk):
     def on_closing(self):
         """Gérer proprement la fermeture de l'application"""
         try:
+            # Arrêter les processus de calcul et libérer les séries partagées
+            self.worker_pool.shutdown()
+            for sim in getattr(self, 'simulations', []):
+                if isinstance(sim["data"], SimulationResult):
+                    sim["data"].release()
+            
             # Libérer les ressources matplotlib
             plt.close('all')
             
@@ -1595,63 +1608,6 @@ class BioProcessApp(ctk.CTk):
         # Afficher un message de diagnostic
         print("Test de graphique gaz exécuté. Le graphique devrait être visible dans l'onglet Gazeuse.")
     
-    def calculate_gas_emissions(self, data):
-        """Calcule les émissions de gaz (CO2, O2, NH3) basées sur la dégradation de la matière organique"""
-        # Vérifier si les données nécessaires sont disponibles
-        if not all(key in data for key in ["Times", "Solids"]):
-            return {}, False
-            
-        # Récupérer les données de dégradation
-        times = data["Times"]
-        initial_solids = data["Solids"][0]
-        final_solids = data["Solids"][-1]
-        solids = data["Solids"]
-        
-        # Initialiser les tableaux pour stocker les valeurs calculées
-        co2_values = []
-        o2_values = []
-        nh3_values = []
-        
-        # Facteurs stœchiométriques approximatifs pour la dégradation aérobie
-        # Basés sur la composition typique de la matière organique C₂₇H₃₈O₁₆N
-        CO2_FACTOR = 1.5  # kg CO2 / kg matière organique dégradée
-        O2_FACTOR = 1.2   # kg O2 / kg matière organique dégradée
-        NH3_FACTOR = 0.05 # kg NH3 / kg matière organique dégradée
-        
-        # Calcul cumulatif des émissions
-        cumulative_co2 = 0
-        cumulative_o2 = 0
-        cumulative_nh3 = 0
-        
-        for i in range(len(times)):
-            if i > 0:
-                # Calcul de la matière dégradée entre ce pas de temps et le précédent
-                degraded = solids[i-1] - solids[i]
-                if degraded > 0:
-                    # Conversion de la matière dégradée en gaz émis
-                    co2_produced = degraded * CO2_FACTOR
-                    o2_consumed = degraded * O2_FACTOR
-                    nh3_produced = degraded * NH3_FACTOR
-                    
-                    # Accumulation
-                    cumulative_co2 += co2_produced
-                    cumulative_o2 += o2_consumed
-                    cumulative_nh3 += nh3_produced
-            
-            # Stocker les valeurs cumulatives
-            co2_values.append(cumulative_co2)
-            o2_values.append(cumulative_o2)
-            nh3_values.append(cumulative_nh3)
-        
-        # Retourner les résultats calculés
-        gas_data = {
-            "CO2": co2_values,
-            "O2": o2_values,
-            "NH3": nh3_values
-        }
-        
-        return gas_data, True
-
     def plot_gas_graphs(self):
         """Afficher les graphiques de la phase gazeuse"""
         # Effacer le graphique actuel
@@ -2177,8 +2133,9 @@ class BioProcessApp(ctk.CTk):
                 "air_off_time": self.simulation_params["air_off_time"]
             }
             
-            # Call process_data with prepared data
-            sim_result = SimulationModel.run_simulation(data)
+            # Calcul dans un processus du pool, séries reçues par mémoire partagée
+            # (libérées par clear_simulations), grandeurs dérivées en cache
+            sim_result = self.worker_pool.run_simulation(data, storage="float64", shared=True)
             
             # Store simulation with a name
             sim_name = self.sim_name_var.get()
@@ -2235,6 +2192,10 @@ class BioProcessApp(ctk.CTk):
             return
             
         if messagebox.askyesno("Confirmation", "Êtes-vous sûr de vouloir effacer toutes les simulations?"):
+            # Libérer les séries reçues des processus de calcul (mémoire partagée)
+            for sim in self.simulations:
+                if isinstance(sim["data"], SimulationResult):
+                    sim["data"].release()
             self.simulations = []
             self.simulation_names = []
             self.sim_name_var.set("Simulation 1")
@@ -2376,6 +2337,35 @@ class BioProcessApp(ctk.CTk):
         )
         run_analysis_btn.pack(pady=5)
         
+        # Recherche multi-objectif (front de Pareto)
+        pareto_frame = ctk.CTkFrame(main_frame)
+        pareto_frame.pack(fill="x", padx=10, pady=10)
+        
+        ctk.CTkLabel(pareto_frame, text="Recherche multi-objectif (front de Pareto):", font=("Arial", 12, "bold")).grid(row=0, column=0, columnspan=2, padx=10, pady=10, sticky="w")
+        ctk.CTkLabel(pareto_frame, text="Le débit d'air utilise l'intervalle ci-dessus. Valeurs séparées par des virgules.", font=("Arial", 10)).grid(row=0, column=2, columnspan=4, padx=10, pady=10, sticky="w")
+        
+        ctk.CTkLabel(pareto_frame, text="Temps ON (h):").grid(row=1, column=0, padx=10, pady=5, sticky="w")
+        self.pareto_on_var = ctk.StringVar(value="1, 2")
+        ctk.CTkEntry(pareto_frame, textvariable=self.pareto_on_var, width=120).grid(row=1, column=1, padx=5, pady=5, sticky="w")
+        
+        ctk.CTkLabel(pareto_frame, text="Temps OFF (h):").grid(row=1, column=2, padx=10, pady=5, sticky="w")
+        self.pareto_off_var = ctk.StringVar(value="0.5, 1")
+        ctk.CTkEntry(pareto_frame, textvariable=self.pareto_off_var, width=120).grid(row=1, column=3, padx=5, pady=5, sticky="w")
+        
+        ctk.CTkLabel(pareto_frame, text="Débit d'eau (kg/h):").grid(row=1, column=4, padx=10, pady=5, sticky="w")
+        self.pareto_water_var = ctk.StringVar(value="0, 0.5")
+        ctk.CTkEntry(pareto_frame, textvariable=self.pareto_water_var, width=120).grid(row=1, column=5, padx=5, pady=5, sticky="w")
+        
+        run_pareto_btn = ctk.CTkButton(
+            pareto_frame,
+            text="Rechercher le front de Pareto",
+            command=self.run_pareto_analysis,
+            width=250,
+            height=35,
+            font=("Arial", 13, "bold")
+        )
+        run_pareto_btn.grid(row=2, column=0, columnspan=6, pady=10)
+        
         # Results display area (graph + texte)
         results_label = ctk.CTkLabel(
             main_frame,
@@ -2419,79 +2409,129 @@ class BioProcessApp(ctk.CTk):
         if not substrates:
             return [], False
             
-        # Récupérer les données de dégradation
-        times = data["Times"]
-        solids = data["Solids"]
-        
-        # Initialiser le tableau pour les rapports C/N
-        cn_ratios = []
-        
-        # Obtenir la composition initiale
-        initial_c = 0
-        initial_n = 0
-        
-        # Calculer la quantité initiale de C et N à partir des substrats
-        for i, sub in enumerate(substrates):
-            if i < len(substrates) and "composition" in sub:
-                # La composition est [C, H, O, N]
-                c_atoms = sub["composition"][0]  # Nombre d'atomes de carbone
-                n_atoms = sub["composition"][3]  # Nombre d'atomes d'azote
-                
-                # Masses atomiques
-                c_atomic_mass = 12.011  # g/mol
-                n_atomic_mass = 14.007  # g/mol
-                
-                # Masse de C et N dans le substrat
-                c_mass = c_atoms * c_atomic_mass
-                n_mass = n_atoms * n_atomic_mass
-                
-                # Proportion massique de C et N dans le substrat
-                total_mass = c_mass + n_mass
-                c_fraction = c_mass / total_mass if total_mass > 0 else 0
-                n_fraction = n_mass / total_mass if total_mass > 0 else 0
-                
-                # Masse initiale du substrat
-                initial_solid = solids[0]
-                
-                # Contribution à la masse totale de C et N
-                initial_c += initial_solid * c_fraction
-                initial_n += initial_solid * n_fraction
-        
-        # Éviter la division par zéro
-        if initial_n == 0:
-            initial_n = 0.001
-            
-        # Calculer le rapport C/N initial
-        initial_cn_ratio = initial_c / initial_n
-        
-        # Simuler la dégradation du rapport C/N
-        for i in range(len(times)):
-            # La dégradation affecte légèrement le rapport C/N
-            # Dans un processus de compostage, le C est consommé plus rapidement que N
-            degradation_factor = 1.0
-            if i > 0:
-                # Plus la dégradation des solides est importante, plus le rapport C/N diminue
-                solid_degradation = (solids[0] - solids[i]) / solids[0] if solids[0] > 0 else 0
-                # Le carbone se dégrade environ 30 fois plus vite que l'azote
-                c_degradation = solid_degradation * 1.0  # Coefficient de dégradation du carbone
-                n_degradation = solid_degradation * 0.03  # Coefficient de dégradation de l'azote
-                
-                # Calcul du nouveau rapport C/N
-                remaining_c = initial_c * (1 - c_degradation)
-                remaining_n = initial_n * (1 - n_degradation)
-                
-                # Éviter division par zéro
-                if remaining_n <= 0:
-                    remaining_n = 0.001
-                    
-                cn_ratio = remaining_c / remaining_n
-            else:
-                cn_ratio = initial_cn_ratio
-                
-            cn_ratios.append(cn_ratio)
+        # La composition est [C, H, O, N]
+        compositions = [sub["composition"] for sub in substrates if "composition" in sub]
         
-        return cn_ratios, True
+        # Rapport calculé une seule fois par simulation (substrats inchangés)
+        if isinstance(data, SimulationResult) and data.compositions == compositions:
+            return data.cn_ratio, True
+        return cn_ratios(data["Solids"], compositions), True
 
+    def build_simulation_data(self, sim_params):
+        """Construit le dictionnaire d'entrée du modèle à partir des substrats et des paramètres"""
+        return {
+            "NS": self.NS,
+            "Substrates": [sub["name"] for sub in self.substrates],
+            "CCS": [sub["composition"] for sub in self.substrates],
+            "FR": [sub["FR"] for sub in self.substrates],
+            "FS": [sub["FS"] for sub in self.substrates],
+            "FH": [100 - sub["FS"] for sub in self.substrates],
+            "FVS": [sub["FVS"] for sub in self.substrates],
+            "FASH": [sub.get("FASH", 0) for sub in self.substrates],
+            "FBVS": [sub["FBVS"] for sub in self.substrates],
+            "FNBVS": [sub.get("FNBVS", 0) for sub in self.substrates],
+            "FfBVS": [sub["FfBVS"] for sub in self.substrates],
+            "FsBVS": [sub.get("FsBVS", 0) for sub in self.substrates],
+            "T": [sub["T"] for sub in self.substrates],
+            "fKT20": [sub["fKT20"] for sub in self.substrates],
+            "sKT20": [sub["sKT20"] for sub in self.substrates],
+            "Cp": [sub["Cp"] for sub in self.substrates],
+            "HRT": sim_params["HRT"],
+            "air_flow": sim_params["air_flow"],
+            "relative_humidity": sim_params["relative_humidity"],
+            "ambient_temp": sim_params["ambient_temp"],
+            "water_flow": sim_params["water_flow"],
+            "water_temp": sim_params["water_temp"],
+            "air_alternance": sim_params["air_alternance"],
+            "air_on_time": sim_params["air_on_time"],
+            "air_off_time": sim_params["air_off_time"]
+        }
+    
+    def run_pareto_analysis(self):
+        """Recherche multi-objectif : vitesse de séchage, énergie d'aération et NH3 émis"""
+        try:
+            if not self.substrates:
+                messagebox.showerror("Erreur", "Aucun substrat défini. Veuillez d'abord configurer au moins un substrat.")
+                return
+            
+            if not hasattr(self, 'simulation_params'):
+                messagebox.showerror("Erreur", "Paramètres de simulation non définis. Veuillez d'abord enregistrer les paramètres de simulation.")
+                return
+            
+            min_flow = float(self.air_flow_min_var.get())
+            max_flow = float(self.air_flow_max_var.get())
+            step_flow = float(self.air_flow_step_var.get())
+            if min_flow >= max_flow or step_flow <= 0:
+                messagebox.showerror("Erreur", "Intervalle de débit d'air invalide.")
+                return
+            
+            def parse_values(text):
+                return [float(v) for v in text.replace(";", ",").split(",") if v.strip()]
+            
+            grid = {
+                "air_flow": [min_flow + i*step_flow for i in range(int((max_flow - min_flow) / step_flow) + 1) if min_flow + i*step_flow <= max_flow],
+                "air_on_time": parse_values(self.pareto_on_var.get()),
+                "air_off_time": parse_values(self.pareto_off_var.get()),
+                "water_flow": parse_values(self.pareto_water_var.get())
+            }
+            grid = {name: values for name, values in grid.items() if values}
+            
+            # Fenêtre de progression
+            progress_window = ctk.CTkToplevel(self)
+            progress_window.title("Recherche en cours")
+            progress_window.geometry("400x150")
+            progress_window.transient(self)
+            progress_window.grab_set()
+            
+            ctk.CTkLabel(progress_window, text="Recherche du front de Pareto...", font=("Arial", 12)).pack(pady=15)
+            progressbar = ctk.CTkProgressBar(progress_window, width=300)
+            progressbar.pack(pady=10)
+            progressbar.set(0)
+            status_label = ctk.CTkLabel(progress_window, text="Initialisation...", font=("Arial", 10))
+            status_label.pack(pady=5)
+            progress_window.update()
+            
+            def on_progress(done, total):
+                progressbar.set(done / total)
+                status_label.configure(text=f"Simulation {done}/{total}")
+                progress_window.update()
+            
+            base_data = self.build_simulation_data(self.simulation_params)
+            search = pareto_search(base_data, grid, progress=on_progress, pool=self.worker_pool)
+            
+            progress_window.destroy()
+            
+            values = search["values"]
+            pareto = search["pareto"]
+            candidates = search["candidates"]
+            labels = [OBJECTIVES[name][2] for name in search["objectives"]]
+            
+            # Graphique : vitesse de séchage en fonction de l'énergie, couleur = NH3
+            self.sensitivity_figure.clear()
+            ax = self.sensitivity_figure.add_subplot(111)
+            scatter = ax.scatter(values[:, 1], values[:, 0], c=values[:, 2], cmap="viridis", alpha=0.5, s=30)
+            front = pareto[np.argsort(values[pareto, 1])]
+            ax.plot(values[front, 1], values[front, 0], 'o-', color='red', markersize=8, linewidth=1.5, label='Front de Pareto')
+            self.sensitivity_figure.colorbar(scatter, ax=ax, label=labels[2])
+            ax.set_xlabel(labels[1], fontsize=12)
+            ax.set_ylabel(labels[0], fontsize=12)
+            ax.set_title("Compromis séchage / énergie / NH₃", fontsize=14, fontweight='bold')
+            ax.grid(True, linestyle='--', alpha=0.7)
+            ax.legend()
+            self.sensitivity_canvas_plot.draw()
+            
+            # Résumé des réglages non dominés
+            self.sensitivity_results_text.delete("1.0", "end")
+            self.sensitivity_results_text.insert("end", "=== FRONT DE PARETO ===\n\n")
+            self.sensitivity_results_text.insert("end", f"{len(candidates)} réglages simulés, {len(pareto)} non dominés\n\n")
+            for index in pareto:
+                candidate = candidates[index]
+                settings = ", ".join(f"{name}={value:g}" for name, value in candidate.items() if name != "air_alternance")
+                objectives = ", ".join(f"{label}: {value:.3g}" for label, value in zip(labels, values[index]))
+                self.sensitivity_results_text.insert("end", f"- {settings}\n    {objectives}\n")
+        except Exception as e:
+            messagebox.showerror("Erreur", f"Erreur lors de la recherche multi-objectif : {str(e)}")
+    
     def run_sensitivity_analysis(self):
         """Run sensitivity analysis with strict validation for each criterion"""
         try:
@@ -2549,13 +2589,9 @@ class BioProcessApp(ctk.CTk):
             criteria_values = []
             cn_ratio_values = []  # Pour stocker les rapports C/N finaux
             
-            # Run simulations for each air flow value
-            for i, flow in enumerate(air_flow_values):
-                # Update progress
-                progressbar.set((i+1)/len(air_flow_values))
-                status_label.configure(text=f"Simulation {i+1}/{len(air_flow_values)} - Débit d'air: {flow} m³/h")
-                progress_window.update()
-                
+            # Prepare the data set for each air flow value
+            datas = []
+            for flow in air_flow_values:
                 # Create a copy of simulation parameters with updated air flow
                 sim_params = self.simulation_params.copy()
                 sim_params["air_flow"] = flow
@@ -2589,11 +2625,17 @@ class BioProcessApp(ctk.CTk):
                     "air_on_time": sim_params["air_on_time"],
                     "air_off_time": sim_params["air_off_time"]
                 }
-                
-                # Run the simulation
-                sim_result = SimulationModel.run_simulation(data)
-                results.append(sim_result)
-                
+                datas.append(data)
+            
+            def on_progress(done, total):
+                progressbar.set(done / total)
+                status_label.configure(text=f"Simulation {done}/{total}")
+                progress_window.update()
+            
+            # Run the simulations on the persistent worker pool
+            results = self.worker_pool.run_batch(datas, progress=on_progress, storage="float64")
+            
+            for flow, sim_result in zip(air_flow_values, results):
                 # Calculer le rapport C/N final
                 cn_ratios, success = self.calculate_cn_ratio(sim_result, self.substrates)
                 if success and len(cn_ratios) > 0:
@@ -2612,7 +2654,7 @@ class BioProcessApp(ctk.CTk):
                     criteria_value = "NH3" in sim_result["data"] and sim_result["data"]["NH3"][-1] < 1.0  # seuil critique arbitraire (à ajuster)
                 elif criteria == "Consommation énergétique raisonnable":
                     solids_degraded = sim_result["Solids"][0] - sim_result["Solids"][-1]
-                    energy_consumed = flow * sim_params["HRT"]  # Simple energy estimate
+                    energy_consumed = flow * self.simulation_params["HRT"]  # Simple energy estimate
                     criteria_value = solids_degraded / energy_consumed if energy_consumed > 0 else 0
                 else:
                     criteria_value = 0
@@ -2894,57 +2936,11 @@ class BioProcessApp(ctk.CTk):
         # Vérifier si les données nécessaires sont disponibles
         if not all(key in data for key in ["Times", "Solids"]):
             return {}, False
-            
-        # Récupérer les données de dégradation
-        times = data["Times"]
-        initial_solids = data["Solids"][0]
-        final_solids = data["Solids"][-1]
-        solids = data["Solids"]
-        
-        # Initialiser les tableaux pour stocker les valeurs calculées
-        co2_values = []
-        o2_values = []
-        nh3_values = []
-        
-        # Facteurs stœchiométriques approximatifs pour la dégradation aérobie
-        # Basés sur la composition typique de la matière organique C₂₇H₃₈O₁₆N
-        CO2_FACTOR = 1.5  # kg CO2 / kg matière organique dégradée
-        O2_FACTOR = 1.2   # kg O2 / kg matière organique dégradée
-        NH3_FACTOR = 0.05 # kg NH3 / kg matière organique dégradée
-        
-        # Calcul cumulatif des émissions
-        cumulative_co2 = 0
-        cumulative_o2 = 0
-        cumulative_nh3 = 0
-        
-        for i in range(len(times)):
-            if i > 0:
-                # Calcul de la matière dégradée entre ce pas de temps et le précédent
-                degraded = solids[i-1] - solids[i]
-                if degraded > 0:
-                    # Conversion de la matière dégradée en gaz émis
-                    co2_produced = degraded * CO2_FACTOR
-                    o2_consumed = degraded * O2_FACTOR
-                    nh3_produced = degraded * NH3_FACTOR
-                    
-                    # Accumulation
-                    cumulative_co2 += co2_produced
-                    cumulative_o2 += o2_consumed
-                    cumulative_nh3 += nh3_produced
-            
-            # Stocker les valeurs cumulatives
-            co2_values.append(cumulative_co2)
-            o2_values.append(cumulative_o2)
-            nh3_values.append(cumulative_nh3)
-        
-        # Retourner les résultats calculés
-        gas_data = {
-            "CO2": co2_values,
-            "O2": o2_values,
-            "NH3": nh3_values
-        }
         
-        return gas_data, True
+        # Émissions cumulées calculées une seule fois par simulation
+        if isinstance(data, SimulationResult):
+            return data.gas_emissions, True
+        return gas_emissions(data["Solids"]), True
 
     def plot_solid_graphs(self):
         """Afficher les graphiques de la phase solide"""
@@ -2999,7 +2995,9 @@ class BioProcessApp(ctk.CTk):
                         temperatures_data[sim_name] = {
                             "times": data["Times"],
                             "values": data["Temperatures"],
-                            "color": color
+                            "color": color,
+                            "phases": (data.phases if isinstance(data, SimulationResult)
+                                       else phase_boundaries(data["Temperatures"]))
                         }
                         
                     elif option == "Rapport C/N":
@@ -3029,27 +3027,19 @@ class BioProcessApp(ctk.CTk):
                 # Phase 3: Phase de refroidissement - diminution de l'activité
                 # Phase 4: Phase de maturation - stabilisation
                 
-                max_temp_idx = temp_values.index(max(temp_values))
+                # Bornes des phases : seuil thermophile de 45°C, maturation sur la
+                # seconde moitié après le refroidissement
+                phases = temperatures_data[first_sim]["phases"]
+                max_temp_idx = phases["peak"]
                 max_temp_time = temp_times[max_temp_idx]
                 
-                # Trouver l'indice où la température dépasse 45°C
-                try:
-                    thermo_start_idx = next(i for i, t in enumerate(temp_values) if t >= 45)
-                    thermo_start_time = temp_times[thermo_start_idx]
-                except (StopIteration, IndexError):
-                    thermo_start_idx = max_temp_idx // 2
-                    thermo_start_time = temp_times[thermo_start_idx]
-                
-                # Trouver l'indice où la température redescend sous 45°C après la phase thermophile
-                cooling_start_idx = max_temp_idx
-                for i in range(max_temp_idx, len(temp_values)):
-                    if temp_values[i] < 45:
-                        cooling_start_idx = i
-                        break
+                thermo_start_idx = phases["thermophilic_start"]
+                thermo_start_time = temp_times[thermo_start_idx]
+                
+                cooling_start_idx = phases["cooling_start"]
                 cooling_start_time = temp_times[cooling_start_idx]
                 
-                # Maturation: dernier tiers après la phase de refroidissement
-                maturation_start_idx = (cooling_start_idx + len(temp_values)) // 2
+                maturation_start_idx = phases["maturation_start"]
                 maturation_start_time = temp_times[maturation_start_idx]
                 
                 # Délimiter et annoter les phases
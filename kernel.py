@@ -0,0 +1,589 @@
+"""
+Noyau de calcul horaire du modèle de bio-séchage.
+
+Toutes les grandeurs qui ne dépendent que du temps (aération, air entrant,
+pression, facteur de phase...) sont précalculées par SimulationModel.prepare ;
+le noyau ne fait plus que la récurrence heure par heure sur l'état (T, eau,
+BVS), en arithmétique flottante simple (module math, listes Python), sans
+appels scalaires NumPy.
+
+Le noyau avance de t0 à t1 et met à jour l'état en place : une simulation peut
+ainsi être calculée d'un seul bloc ou par tranches successives.
+
+Chaque pas dure series[S_DT][t] heures (1 au pas horaire). Deux schémas de
+bilan thermique et hydrique sont disponibles (consts[C_SOLVER]) :
+    - explicite : vitesses évaluées à la température du début du pas,
+      dT = H / Cp amorti par le facteur d'inertie ; réservé au pas horaire,
+      pour lequel l'amortissement a été ajusté ;
+    - implicite (Euler implicite) : dégradation, évaporation et pertes sont
+      évaluées à la température de fin de pas, solution de
+      Cp·(T' - T) = H(T') par une méthode de Newton encadrée ; l'évaporation
+      est bornée par l'eau disponible sous forme implicite. La raideur du
+      bilan (pertes, inhibition thermophile) stabilise le schéma à pas de
+      plusieurs heures, sans amortissement empirique.
+
+Sur les segments quasi isothermes (maturation, essais à température régulée),
+le noyau peut enchaîner les pas sans réévaluer les facteurs biologiques ni le
+bilan thermique : la dégradation y suit la forme fermée BVS·r^k. Le segment
+s'arrête dès que les entrées changent ou que la dérive extrapolée de la
+température ou de l'humidité dépasse la limite consts[C_SEGMENT_DRIFT] ; une
+limite nulle (défaut) désactive ce raccourci. Cette limite porte sur
+l'extrapolation d'un segment, pas sur l'écart au calcul pas à pas : les écarts
+des segments successifs s'additionnent et sont amplifiés par les montées en
+température (écarts mesurés : parameters.SEGMENT_ACCURACY).
+
+Si numba est installé, le même noyau est compilé en code machine (arguments
+sous forme d'arrays NumPy) ; sinon le noyau Python est utilisé. L'exécution
+directe de ce module vérifie l'équivalence numérique des deux versions.
+
+Les commentaires « # stage: <nom> » délimitent les étapes du calcul ; ils sont
+sans effet sur le noyau et servent à construire sa version instrumentée
+(voir profiling.py). Ils restent au niveau du pas de temps : un marqueur dans
+la boucle par substrat ajouterait un appel au profileur par substrat.
+"""
+from math import exp, log
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+from psychrometrics import PVSO_A, PVSO_B, PVSO_C, PVSO_SCALE
+
+
+# Noyaux disponibles
+BACKENDS = ("auto", "python", "numba")
+
+# Indices des séries horaires précalculées (series[k][t])
+S_QAIR = 0       # Débit d'air (m³/h)
+S_TAIR = 1       # Température de l'air entrant (°C)
+S_PV = 2         # Pression de vapeur de l'air entrant (Pa)
+S_P = 3          # Pression atmosphérique (Pa)
+S_MAIRIN = 4     # Débit d'air sec entrant (kg/h)
+S_MWVIN = 5      # Débit de vapeur entrant (kg/h)
+S_MWAD = 6       # Eau ajoutée (kg/h)
+S_TWATAD = 7     # Température de l'eau ajoutée (°C)
+S_PHASE = 8      # Facteur de chaleur de la phase de compostage
+S_DT = 9         # Durée du pas (heures)
+S_RUN = 10       # Nombre de pas suivants aux entrées identiques (voir input_runs)
+N_SERIES = 11
+
+# Indices des propriétés par substrat (subs[k][i])
+U_ASH_NBVS = 0   # Cendres + matière non biodégradable (kg)
+U_FKT20 = 1      # Constante de dégradation rapide à 20°C
+U_SKT20 = 2      # Constante de dégradation lente à 20°C
+U_CP = 3         # Capacité calorifique (kJ/kg·°C)
+U_TCO2 = 4       # kg CO2 produit / kg BVS dégradé
+U_TNH3 = 5       # kg NH3 produit / kg BVS dégradé
+U_TO2 = 6        # kg O2 consommé / kg BVS dégradé
+U_TH2O = 7       # kg H2O produite / kg BVS dégradé
+N_SUBS = 8
+
+# Indices des constantes (consts[k])
+C_HBVS = 0            # Chaleur de dégradation (kJ/kg BVS)
+C_FO2 = 1             # Facteur oxygène
+C_BASE_HLC = 2        # Coefficient de pertes hors aération (kJ/h/°C)
+C_AERATION_LOSS = 3   # Pertes supplémentaires par m³/h d'air
+C_HEAT_DAMPING = 4    # 1 - inertie (montée en température)
+C_COOL_DAMPING = 5    # 1 - inertie × multiplicateur (refroidissement)
+C_MOIST_OPT = 6       # Humidité optimale (%)
+C_MOIST_TOL = 7       # Tolérance d'humidité (%)
+C_THETA_G = 8         # Coefficient de température de la croissance
+C_THETA_I = 9         # Coefficient de température de l'inhibition
+C_DSUB = 10           # Masse volumique du substrat (kg/m³)
+C_DWATER = 11         # Masse volumique de l'eau (kg/m³)
+C_ASH_TOT = 12        # Masse totale de cendres (kg)
+C_CPWATER = 13        # Capacité calorifique de l'eau (kJ/kg·°C)
+C_CPAIR = 14          # Capacité calorifique de l'air (kJ/kg·°C)
+C_SOLVER = 15         # Schéma du bilan thermique (SOLVER_*)
+C_SEGMENT_DRIFT = 16  # Dérive extrapolée maximale d'un segment quasi isotherme (0 = désactivé)
+C_GAS_OUTPUTS = 17    # 1 pour calculer VExhaustgases et RelativeHumidity, 0 pour les ignorer
+N_CONSTS = 18
+
+# Schémas du bilan thermique et hydrique (consts[C_SOLVER])
+SOLVER_EXPLICIT = 0.0
+SOLVER_IMPLICIT = 1.0
+
+# Résolution de la température de fin de pas (schéma implicite)
+_MAX_ITERATIONS = 50    # Nombre maximal d'itérations de Newton
+_TOLERANCE = 1e-6       # Précision sur la température (°C)
+_BRACKET_STEP = 10.0    # Pas de recherche de l'encadrement (°C)
+
+# Nombre maximal de pas calculés d'un seul tenant sur un segment quasi isotherme
+_MAX_SEGMENT = 48
+
+# Indices de l'état scalaire (state[k])
+X_T = 0          # Température du procédé (°C)
+X_MWS = 1        # Masse d'eau dans le solide (kg)
+X_FS = 2         # Fraction solide (%)
+X_FH = 3         # Fraction d'humidité (%)
+X_FVS = 4        # Fraction volatile des solides (%)
+X_NH3 = 5        # NH3 cumulé (kg)
+N_STATE = 6
+
+# Indices des séries de sortie (out[k][t])
+O_T = 0          # Temperatures
+O_MOIST = 1      # Moisture
+O_MFRAC = 2      # MoistureFraction
+O_QEX = 3        # QExhaustgases
+O_VEX = 4        # VExhaustgases
+O_RH = 5         # RelativeHumidity
+O_SOLIDS = 6     # Solids
+O_NH3 = 7        # NH3
+N_OUTPUTS = 8
+
+
+def hourly_kernel(t0, t1, state, fBVS, sBVS, BVS, subs, series, consts, out):
+    """
+    Avance la simulation du pas t0 au pas t1 (exclu)
+
+    Args:
+        t0, t1: Bornes des pas de temps à calculer
+        state: État scalaire (indices X_*), mis à jour en place
+        fBVS, sBVS, BVS: Matières biodégradables par substrat, mises à jour en place
+        subs: Propriétés par substrat (indices U_*)
+        series: Séries précalculées par pas de temps (indices S_*)
+        consts: Constantes du modèle (indices C_*)
+        out: Séries de sortie (indices O_*), la valeur du pas t est écrite en t + 1
+    """
+    NS = len(fBVS)
+
+    HBVS = consts[C_HBVS]
+    FO2 = consts[C_FO2]
+    base_hlc = consts[C_BASE_HLC]
+    aeration_loss_coefficient = consts[C_AERATION_LOSS]
+    heating_damping = consts[C_HEAT_DAMPING]
+    cooling_damping = consts[C_COOL_DAMPING]
+    moisture_optimum = consts[C_MOIST_OPT]
+    moisture_tolerance = consts[C_MOIST_TOL]
+    theta_growth = consts[C_THETA_G]
+    theta_inhibition = consts[C_THETA_I]
+    Deltasubstrate = consts[C_DSUB]
+    Deltawater = consts[C_DWATER]
+    ASH_tot = consts[C_ASH_TOT]
+    Cpwater = consts[C_CPWATER]
+    Cpair = consts[C_CPAIR]
+    implicit = consts[C_SOLVER] == SOLVER_IMPLICIT
+    segment_drift_limit = consts[C_SEGMENT_DRIFT]
+    gas_outputs = consts[C_GAS_OUTPUTS] != 0.0
+    log_theta_growth = log(theta_growth)
+    log_theta_inhibition = log(theta_inhibition)
+
+    ASH_NBVS = subs[U_ASH_NBVS]
+    fKT20 = subs[U_FKT20]
+    sKT20 = subs[U_SKT20]
+    Cpsubstrate = subs[U_CP]
+    TCO2 = subs[U_TCO2]
+    TNH3 = subs[U_TNH3]
+    TO2 = subs[U_TO2]
+    TH2O = subs[U_TH2O]
+
+    T = state[X_T]
+    mwsin = state[X_MWS]
+    FS_tot_in = state[X_FS]
+    FH_tot_in = state[X_FH]
+    FVS_tot_in = state[X_FVS]
+    NH3_cumulated = state[X_NH3]
+
+    # Facteurs de décroissance d'un segment quasi isotherme
+    fDecay = [0.0] * NS
+    sDecay = [0.0] * NS
+
+    t = t0
+    while t < t1:
+        # stage: biology
+        current_Qair = series[S_QAIR][t]
+        Tairin = series[S_TAIR][t]
+        PV = series[S_PV][t]
+        P = series[S_P][t]
+        mairin = series[S_MAIRIN][t]
+        mwvin = series[S_MWVIN][t]
+        current_mwad = series[S_MWAD][t]
+        current_Twatad = series[S_TWATAD][t]
+        dt = series[S_DT][t]
+
+        # Caractéristiques biologiques
+        F1 = 1/(exp(-17.684*(1 - FS_tot_in/100) + 7.0622) + 1)
+        Gm = 1/((FVS_tot_in/100)/1 + ((1 - FVS_tot_in/100)/2.5))
+
+        # Espace d'air libre (FAS) et facteur d'aération (F2)
+        FAS = 1 - ((Deltasubstrate * FS_tot_in/100) / (Gm * Deltawater) - (Deltasubstrate * (FH_tot_in/100)/Deltawater))
+        F2 = 1/(exp(-23.675*FAS + 3.4945) + 1)
+
+        # Schéma explicite : un seul passage, les vitesses étant évaluées à T.
+        # Schéma implicite : le pas est évalué à la température finale Tprocess,
+        # solution de Cp·(Tprocess - T) = H(Tprocess) (Newton encadré), puis un
+        # dernier passage enregistre le pas à la température trouvée.
+        Tprocess = T
+        T_low = -1e9
+        T_high = 1e9
+        converged = not implicit
+        for iteration in range(_MAX_ITERATIONS + 1):
+            commit = converged or iteration == _MAX_ITERATIONS
+
+            # Dégradation, bilan de matière et stoechiométrie par substrat
+            # stage: degradation
+            growth = theta_growth**(Tprocess-20)
+            inhibition = theta_inhibition**(Tprocess-60)
+            thermal = growth - inhibition
+            dthermal = 0.0
+            if implicit:
+                dthermal = log_theta_growth * growth - log_theta_inhibition * inhibition
+            Stotout = 0.0
+            BVSdegradedtot = 0.0
+            dBVSdegraded = 0.0
+            mCO2tot = 0.0
+            mNH3tot = 0.0
+            mO2tot = 0.0
+            mwptot = 0.0
+            Cp_solids = 0.0
+            for i in range(NS):
+                fKT = fKT20[i] * thermal
+                sKT = sKT20[i] * thermal
+                # Limiter les valeurs négatives
+                if fKT < 0:
+                    fKT = 0.0
+                if sKT < 0:
+                    sKT = 0.0
+                fK = fKT * F1 * F2 * FO2
+                sK = sKT * F1 * F2 * FO2
+
+                fBVSout = fBVS[i] / (1 + fK * (dt/24))
+                sBVSout = sBVS[i] / (1 + sK * (dt/24))
+                BVSout = fBVSout + sBVSout
+                Sout = ASH_NBVS[i] + BVSout
+                BVSdegraded = BVS[i] - BVSout
+                if implicit:
+                    # Sensibilité de la masse dégradée à la température
+                    if fKT > 0:
+                        dBVSdegraded += fBVSout * fKT20[i] * dthermal * F1 * F2 * FO2 * (dt/24) / (1 + fK * (dt/24))
+                    if sKT > 0:
+                        dBVSdegraded += sBVSout * sKT20[i] * dthermal * F1 * F2 * FO2 * (dt/24) / (1 + sK * (dt/24))
+
+                Stotout += Sout
+                BVSdegradedtot += BVSdegraded
+                mCO2tot += TCO2[i] * BVSdegraded
+                mNH3tot += TNH3[i] * BVSdegraded
+                mO2tot += TO2[i] * BVSdegraded
+                mwptot += TH2O[i] * BVSdegraded
+                Cp_solids += Sout * Cpsubstrate[i]
+
+                if commit:
+                    fBVS[i] = fBVSout
+                    sBVS[i] = sBVSout
+                    BVS[i] = BVSout
+
+            # Calcul du bilan d'air et d'eau
+            # stage: mass_balance
+            mgasout = mairin + mCO2tot/dt + mNH3tot/dt - mO2tot/dt
+
+            # Chaleur latente (kJ/kg) et pression de vapeur en sortie
+            HLv = (1033.7 - 0.5683 * Tprocess) * 2.326
+            PVSO = exp(PVSO_A - PVSO_B / (PVSO_C + Tprocess)) * PVSO_SCALE
+            PVO = PV + (PVSO - PV) * F1
+            if PVO > PVSO:
+                PVO = PVSO
+
+            # Débit d'eau évaporée
+            if current_Qair > 0:
+                mwvout = ((18.015/1000) * PVO * current_Qair) / (8.314 * (Tprocess + 273))
+            else:
+                mwvout = 0.0
+
+            if implicit:
+                # Évaporation implicite : le séchage ralentit lorsque l'eau disponible
+                # s'épuise (jamais plus que l'eau présente, quel que soit le pas)
+                mwavailable = mwsin + mwptot + current_mwad*dt + mwvin*dt
+                mwvdemand = mwvout*dt
+                if mwavailable > 0:
+                    mwevaporated = mwvdemand * mwavailable / (mwavailable + mwvdemand)
+                    evaporation_sensitivity = (mwavailable / (mwavailable + mwvdemand))**2
+                else:
+                    mwevaporated = 0.0
+                    evaporation_sensitivity = 0.0
+                mwsout = mwavailable - mwevaporated
+            else:
+                mwevaporated = mwvout*dt
+                mwsout = mwsin + mwptot + current_mwad*dt + mwvin*dt - mwvout*dt
+            if mwsout < 0:
+                mwsout = 0.0
+
+            # Mise à jour des fractions
+            if (Stotout + mwsout) > 0:
+                FHtotout = (mwsout / (Stotout + mwsout)) * 100
+                FStotout = (Stotout / (Stotout + mwsout)) * 100
+            else:
+                FHtotout = 0.0
+                FStotout = 0.0
+
+            if Stotout > 0:
+                FVStotout = ((Stotout - ASH_tot) / Stotout) * 100
+            else:
+                FVStotout = 0.0
+
+            # Facteur de chaleur : phase du compostage, température puis humidité
+            # stage: energy_balance
+            heat_factor = series[S_PHASE][t]
+            dheat_factor = 0.0
+            if Tprocess > 65:
+                temp_inhibition = 1.0 - ((Tprocess - 65) / 20)
+                if temp_inhibition > 0.2:
+                    dheat_factor = -heat_factor / 20
+                heat_factor *= max(0.2, temp_inhibition)
+            elif Tprocess < 15:
+                if Tprocess / 15 > 0.5:
+                    dheat_factor = heat_factor / 15
+                temp_activation = max(0.5, Tprocess / 15)
+                heat_factor *= temp_activation
+
+            moisture_factor = 1.0 - abs(FHtotout - moisture_optimum) / moisture_tolerance
+            heat_factor *= max(0.3, moisture_factor)
+            dheat_factor *= max(0.3, moisture_factor)
+
+            # Bilan énergétique
+            Horg = HBVS * BVSdegradedtot * heat_factor
+            heat_loss_coefficient = base_hlc
+            if current_Qair > 0:
+                heat_loss_coefficient += current_Qair * aeration_loss_coefficient
+            H_loss = heat_loss_coefficient * (Tprocess - Tairin) * dt
+            H_evap = (mwevaporated - mwvin*dt) * HLv
+            H_available = Horg - H_evap - H_loss
+
+            Cp_total = Cp_solids + mwsout * Cpwater + mgasout * Cpair
+
+            if commit:
+                break
+
+            # Résidu R = Cp·(Tprocess - T) - H et sa dérivée Cp - dH/dT (pertes,
+            # évaporation, chaleur biologique)
+            residual = Cp_total * (Tprocess - T) - H_available
+            slope = Cp_total + heat_loss_coefficient * dt - HBVS * (heat_factor * dBVSdegraded
+                                                                    + BVSdegradedtot * dheat_factor)
+            if mwvout > 0:
+                dPVSO = PVSO * PVSO_B / (PVSO_C + Tprocess)**2
+                if PVO < PVSO:
+                    dPVO = dPVSO * F1
+                else:
+                    dPVO = dPVSO
+                dmwvout = mwvout * (dPVO / PVO - 1 / (Tprocess + 273))
+                slope += (dmwvout * dt * evaporation_sensitivity * HLv
+                          - (mwevaporated - mwvin*dt) * 0.5683 * 2.326)
+
+            # Newton encadré : le résidu est négatif sous la solution, positif au-dessus
+            if residual < 0:
+                T_low = Tprocess
+            else:
+                T_high = Tprocess
+            T_next = Tprocess
+            if slope > 0:
+                T_next = Tprocess - residual / slope
+            if slope <= 0 or not T_low < T_next < T_high:
+                if T_high - T_low < 1e8:
+                    T_next = 0.5 * (T_low + T_high)
+                elif residual < 0:
+                    T_next = Tprocess + _BRACKET_STEP
+                else:
+                    T_next = Tprocess - _BRACKET_STEP
+            if abs(T_next - Tprocess) < _TOLERANCE or T_high - T_low < _TOLERANCE:
+                converged = True
+            Tprocess = T_next
+
+        if not implicit and Cp_total > 0:
+            # Nouvelle température avec inertie thermique
+            delta_T = H_available / Cp_total
+            if delta_T > 0:
+                Tprocess = T + delta_T * heating_damping
+            else:
+                Tprocess = T + delta_T * cooling_damping
+
+        # stage: gas
+        # Humidité relative et volume des gaz : sorties seulement, sans effet sur l'état
+        RHO = 0.0
+        if gas_outputs:
+            RHO = (PVO / PVSO) * 100
+        if gas_outputs and P > PVO:
+            Vgases = (8.314 * (Tprocess + 273) / (P - PVO)) * ((mairin / (28.96/1000)) +
+                                                        (mCO2tot / dt / (44/1000)) +
+                                                        (mNH3tot / dt / (17/1000)) -
+                                                        (mO2tot / dt / (32/1000)))
+        else:
+            Vgases = 0.0
+
+        NH3_cumulated += mNH3tot
+
+        # Historique
+        # stage: history
+        out[O_T][t + 1] = Tprocess
+        out[O_MOIST][t + 1] = mwsout
+        out[O_MFRAC][t + 1] = FHtotout
+        out[O_QEX][t + 1] = mgasout
+        out[O_VEX][t + 1] = Vgases
+        out[O_RH][t + 1] = RHO
+        out[O_SOLIDS][t + 1] = Stotout
+        out[O_NH3][t + 1] = NH3_cumulated
+
+        # Segment quasi isotherme : si la température et l'humidité dérivent de
+        # moins de la limite et que les entrées restent identiques, les pas
+        # suivants sont calculés avec les facteurs biologiques figés, la
+        # dégradation suivant alors la forme fermée BVS·r^k, r = 1/(1 + K·dt/24)
+        # (températures extrapolées linéairement)
+        # stage: segment
+        n_segment = 0
+        if segment_drift_limit > 0:
+            n_segment = min(int(series[S_RUN][t]), t1 - 1 - t, _MAX_SEGMENT)
+            drift = max(abs(Tprocess - T), abs(FHtotout - FH_tot_in))
+            if drift * n_segment > segment_drift_limit:
+                n_segment = int(segment_drift_limit / drift)
+
+        if n_segment > 0:
+            # Facteurs de décroissance par pas, figés sur le segment
+            thermal_factor = thermal
+            if thermal_factor < 0:
+                thermal_factor = 0.0
+            for i in range(NS):
+                fDecay[i] = 1 / (1 + fKT20[i] * thermal_factor * F1 * F2 * FO2 * (dt/24))
+                sDecay[i] = 1 / (1 + sKT20[i] * thermal_factor * F1 * F2 * FO2 * (dt/24))
+            mwbalance = current_mwad*dt + mwvin*dt - mwevaporated
+
+        T_segment = Tprocess
+        for j in range(1, n_segment + 1):
+            Tprocess = T_segment + (T_segment - T) * j
+            Stotout = 0.0
+            mCO2tot = 0.0
+            mNH3tot = 0.0
+            mO2tot = 0.0
+            mwptot = 0.0
+            for i in range(NS):
+                fBVSout = fBVS[i] * fDecay[i]
+                sBVSout = sBVS[i] * sDecay[i]
+                BVSout = fBVSout + sBVSout
+                BVSdegraded = BVS[i] - BVSout
+                Stotout += ASH_NBVS[i] + BVSout
+                mCO2tot += TCO2[i] * BVSdegraded
+                mNH3tot += TNH3[i] * BVSdegraded
+                mO2tot += TO2[i] * BVSdegraded
+                mwptot += TH2O[i] * BVSdegraded
+                fBVS[i] = fBVSout
+                sBVS[i] = sBVSout
+                BVS[i] = BVSout
+
+            mgasout = mairin + mCO2tot/dt + mNH3tot/dt - mO2tot/dt
+            mwsout = mwsout + mwptot + mwbalance
+            if mwsout < 0:
+                mwsout = 0.0
+            if (Stotout + mwsout) > 0:
+                FHtotout = (mwsout / (Stotout + mwsout)) * 100
+                FStotout = (Stotout / (Stotout + mwsout)) * 100
+            if Stotout > 0:
+                FVStotout = ((Stotout - ASH_tot) / Stotout) * 100
+            if gas_outputs and P > PVO:
+                Vgases = (8.314 * (Tprocess + 273) / (P - PVO)) * ((mairin / (28.96/1000)) +
+                                                            (mCO2tot / dt / (44/1000)) +
+                                                            (mNH3tot / dt / (17/1000)) -
+                                                            (mO2tot / dt / (32/1000)))
+            NH3_cumulated += mNH3tot
+
+            out[O_T][t + 1 + j] = Tprocess
+            out[O_MOIST][t + 1 + j] = mwsout
+            out[O_MFRAC][t + 1 + j] = FHtotout
+            out[O_QEX][t + 1 + j] = mgasout
+            out[O_VEX][t + 1 + j] = Vgases
+            out[O_RH][t + 1 + j] = RHO
+            out[O_SOLIDS][t + 1 + j] = Stotout
+            out[O_NH3][t + 1 + j] = NH3_cumulated
+
+        # Mise à jour des variables d'état
+        FS_tot_in = FStotout
+        FH_tot_in = FHtotout
+        FVS_tot_in = FVStotout
+        T = Tprocess
+        mwsin = mwsout
+        t += 1 + n_segment
+
+    state[X_T] = T
+    state[X_MWS] = mwsin
+    state[X_FS] = FS_tot_in
+    state[X_FH] = FH_tot_in
+    state[X_FVS] = FVS_tot_in
+    state[X_NH3] = NH3_cumulated
+
+
+_compiled_kernel = None
+
+
+def jit_available():
+    """Vrai si le noyau compilé (numba) peut être utilisé"""
+    return numba is not None
+
+
+def select_kernel(backend="auto"):
+    """
+    Choisit le noyau de calcul
+
+    Args:
+        backend: "python", "numba" ou "auto" (compilé si numba est installé)
+
+    Returns:
+        (fonction noyau, True si elle attend des arrays NumPy plutôt que des listes)
+    """
+    global _compiled_kernel
+
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend inconnu : {backend} (choix : {', '.join(BACKENDS)})")
+
+    if backend == "python" or (backend == "auto" and numba is None):
+        return hourly_kernel, False
+
+    if numba is None:
+        raise RuntimeError("Le backend 'numba' nécessite le module numba (pip install numba)")
+
+    if _compiled_kernel is None:
+        # Compilation paresseuse, mise en cache sur disque entre les sessions
+        _compiled_kernel = numba.njit(cache=True)(hourly_kernel)
+    return _compiled_kernel, True
+
+
+def check_backends(data=None, rtol=1e-9):
+    """
+    Vérifie que les noyaux Python et compilé donnent les mêmes résultats
+
+    Args:
+        data: Dictionnaire de paramètres (par défaut, le cas de démonstration)
+        rtol: Écart relatif maximal toléré
+
+    Returns:
+        Écart relatif maximal observé, par série
+    """
+    import numpy as np
+    from modelvic import SimulationModel, OUTPUT_CHANNELS
+
+    if data is None:
+        data = {
+            "NS": 2,
+            "CCS": [[53.19/12, 7.48/1, 35.46/16, 3.88/14], [40.0/12, 6.0/1, 40.0/16, 1.0/14]],
+            "FR": [5000, 2000], "FS": [40, 80], "FVS": [90, 80], "FBVS": [80, 60], "FfBVS": [70, 50],
+            "fKT20": [0.05, 0.03], "sKT20": [0.005, 0.003], "Cp": [0.9, 1.34], "T": [20, 20],
+            "HRT": 1080, "air_flow": 15.0, "air_alternance": True, "air_on_time": 2, "air_off_time": 1,
+            "water_flow": 0.2,
+        }
+
+    reference = SimulationModel.run_simulation(data, backend="python")
+    compiled = SimulationModel.run_simulation(data, backend="numba")
+
+    deviations = {}
+    for name in OUTPUT_CHANNELS:
+        a = np.asarray(reference[name])
+        b = np.asarray(compiled[name])
+        deviations[name] = float(np.max(np.abs(a - b) / np.maximum(np.abs(a), 1e-12)))
+        if deviations[name] > rtol:
+            raise AssertionError(f"Écart entre noyaux sur {name} : {deviations[name]:.3e}")
+    return deviations
+
+
+if __name__ == "__main__":
+    if not jit_available():
+        print("numba n'est pas installé : seul le noyau Python est disponible.")
+    else:
+        for name, deviation in check_backends().items():
+            print(f"{name:20s} écart relatif max : {deviation:.2e}")
+        print("Noyaux Python et compilé équivalents.")
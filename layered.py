@@ -0,0 +1,207 @@
+"""
+Modèle de tas (ou de colonne) résolu verticalement en N couches.
+
+Le tas est découpé en couches de même masse initiale, numérotées du bas (entrée
+d'air) vers le haut (sortie d'air). L'air traverse les couches en série : chaque
+couche reçoit l'air sortant de la couche inférieure (température, pression de
+vapeur, vapeur d'eau), ce qui reproduit le séchage du bas et la condensation
+dans les couches froides du haut. La chaleur se propage entre couches voisines
+par conduction (schéma implicite, stable quel que soit le nombre de couches).
+
+Avec une seule couche, le modèle se réduit au modèle homogène de modelvic.
+"""
+import numpy as np
+
+from modelvic import SimulationModel
+from ensemble import EnsembleState, ensemble_step, moisture_availability
+from psychrometrics import saturation_pressure, vapour_flow
+from kernel import S_QAIR, S_TAIR, S_PV, S_P, S_MAIRIN, S_MWVIN, S_MWAD, S_PHASE
+
+
+def conduction_step(T, heat_capacity, conductance):
+    """
+    Échanges de chaleur par conduction entre couches voisines (Euler implicite)
+
+    Résout (C_k + G_bas + G_haut) T'_k - G T'_(k-1) - G T'_(k+1) = C_k T_k par
+    l'algorithme de Thomas ; les faces inférieure et supérieure sont adiabatiques
+    (les pertes vers l'extérieur sont comptées dans le bilan de chaque couche).
+
+    Args:
+        T: Températures des couches (°C)
+        heat_capacity: Capacités thermiques des couches (kJ/°C)
+        conductance: Conductance entre deux couches voisines (kJ/h/°C)
+
+    Returns:
+        Liste des nouvelles températures
+    """
+    n = len(T)
+    if n < 2 or conductance <= 0:
+        return list(T)
+
+    G = conductance
+    c_prime = [0.0] * n
+    d_prime = [0.0] * n
+
+    # Élimination descendante
+    diagonal = heat_capacity[0] + G
+    c_prime[0] = -G / diagonal
+    d_prime[0] = heat_capacity[0] * T[0] / diagonal
+    for k in range(1, n):
+        diagonal = heat_capacity[k] + (G if k == n - 1 else 2 * G) + G * c_prime[k - 1]
+        c_prime[k] = -G / diagonal
+        d_prime[k] = (heat_capacity[k] * T[k] + G * d_prime[k - 1]) / diagonal
+
+    # Remontée
+    result = [0.0] * n
+    result[-1] = d_prime[-1]
+    for k in range(n - 2, -1, -1):
+        result[k] = d_prime[k] - c_prime[k] * result[k + 1]
+    return result
+
+
+class LayeredPileModel:
+    """
+    Simulation du bio-séchage d'un tas résolu en couches verticales
+    """
+
+    @staticmethod
+    def run_simulation(data, n_layers=10, params=None, store_layers=None,
+                       pile_height=None, thermal_conductivity=None):
+        """
+        Exécute une simulation multicouche
+
+        Args:
+            data: Dictionnaire de paramètres (format de SimulationModel.run_simulation),
+                  éventuellement complété de 'pile_height' et 'thermal_conductivity'
+            n_layers: Nombre de couches verticales
+            params: Constantes du modèle (ModelParameters) ;
+                    schéma explicite au pas horaire uniquement (voir ensemble.check_solver)
+            store_layers: Indices des couches dont l'historique est conservé
+                          (None = toutes, [] = aucune : seuls les résultats globaux
+                          et la sortie d'air sont stockés)
+            pile_height: Hauteur du tas (m, défaut 2.0)
+            thermal_conductivity: Conductivité thermique du substrat (W/m/°C, défaut 0.5)
+
+        Returns:
+            Dictionnaire des résultats globaux (mêmes séries que le modèle homogène,
+            la température étant la moyenne des couches et l'air sortant celui de la
+            couche supérieure), complété de :
+                'ExhaustTemperature': température de l'air en sortie (°C)
+                'Layers': {'indices', 'Temperatures', 'MoistureFraction'}, arrays
+                          (nombre de couches stockées, HRT+1)
+        """
+        n_layers = int(n_layers)
+        if n_layers < 1:
+            raise ValueError("n_layers doit être un entier positif")
+        if pile_height is None:
+            pile_height = float(data.get('pile_height', 2.0))
+        if thermal_conductivity is None:
+            thermal_conductivity = float(data.get('thermal_conductivity', 0.5))
+        if pile_height <= 0:
+            raise ValueError("pile_height doit être strictement positif")
+        if thermal_conductivity < 0:
+            raise ValueError("thermal_conductivity doit être positive")
+
+        if store_layers is None:
+            store_layers = range(n_layers)
+        store_layers = np.array(sorted(set(int(k) for k in store_layers)), dtype=int)
+        if len(store_layers) and (store_layers[0] < 0 or store_layers[-1] >= n_layers):
+            raise ValueError("Indices de couches hors limites")
+
+        setup = SimulationModel.prepare(data, params)
+        HRT = setup.HRT
+        series = setup.series
+        consts = setup.consts
+        state = EnsembleState.split(setup, n_layers)
+
+        # Conductance entre couches : k·A/dz (W/°C) convertie en kJ/h/°C
+        area = setup.process_volume / pile_height
+        thickness = pile_height / n_layers
+        conductance = thermal_conductivity * area / thickness * 3.6
+
+        results = {name: np.zeros(HRT + 1) for name in (
+            "Temperatures", "Moisture", "MoistureFraction", "QExhaustgases",
+            "VExhaustgases", "RelativeHumidity", "Solids", "NH3", "ExhaustTemperature",
+        )}
+        results["Temperatures"][0] = state.T.mean()
+        results["Moisture"][0] = setup.H_tot_in
+        results["MoistureFraction"][0] = setup.FH_tot_in
+        results["RelativeHumidity"][0] = 60
+        results["Solids"][0] = setup.S_tot_in
+        results["ExhaustTemperature"][0] = state.T[-1]
+
+        layer_T = np.zeros((len(store_layers), HRT + 1))
+        layer_FH = np.zeros((len(store_layers), HRT + 1))
+        layer_T[:, 0] = state.T[store_layers]
+        layer_FH[:, 0] = state.FH[store_layers]
+
+        mwad = np.zeros(n_layers)
+        for t in range(HRT):
+            Qair = series[S_QAIR, t]
+            Tair = series[S_TAIR, t]
+            P = series[S_P, t]
+            mairin = series[S_MAIRIN, t]
+
+            # Air en série : conditions d'entrée de chaque couche (du bas vers le haut)
+            T_layers = state.T.tolist()
+            F1 = moisture_availability(state.FS).tolist()
+            PVSO = saturation_pressure(state.T).tolist()
+            Tin = [Tair] * n_layers
+            PVin = [series[S_PV, t]] * n_layers
+            mwvin = [series[S_MWVIN, t]] * n_layers
+            for k in range(n_layers - 1):
+                PVO = PVin[k] + (PVSO[k] - PVin[k]) * F1[k]
+                if PVO > PVSO[k]:
+                    PVO = PVSO[k]
+                Tin[k + 1] = T_layers[k]
+                PVin[k + 1] = PVO
+                if Qair > 0:
+                    mwvin[k + 1] = vapour_flow(Qair, PVO, T_layers[k])
+
+            # Eau ajoutée par arrosage en surface
+            mwad[-1] = series[S_MWAD, t]
+
+            step = ensemble_step(
+                state, consts, Qair, np.array(Tin), np.array(PVin), P, mairin,
+                np.array(mwvin), mwad, series[S_PHASE, t], Tambient=Tair,
+            )
+
+            # Conduction entre couches
+            if n_layers > 1:
+                state.T = np.array(conduction_step(state.T.tolist(), step["Cp_total"].tolist(), conductance))
+
+            # Résultats globaux : sortie d'air en haut du tas
+            Stot = step["Solids"].sum()
+            mws = step["mws"].sum()
+            mCO2 = step["mCO2"].sum()
+            mNH3 = step["mNH3"].sum()
+            mO2 = step["mO2"].sum()
+            PVO_top = step["PVO"][-1]
+            T_top = state.T[-1]
+
+            results["Temperatures"][t + 1] = state.T.mean()
+            results["Moisture"][t + 1] = mws
+            results["MoistureFraction"][t + 1] = mws / (Stot + mws) * 100 if Stot + mws > 0 else 0.0
+            results["QExhaustgases"][t + 1] = mairin + mCO2 + mNH3 - mO2
+            if P > PVO_top:
+                results["VExhaustgases"][t + 1] = (8.314 * (T_top + 273) / (P - PVO_top)) * (
+                    (mairin / (28.96/1000)) + (mCO2 / (44/1000)) + (mNH3 / (17/1000)) - (mO2 / (32/1000))
+                )
+            results["RelativeHumidity"][t + 1] = step["RH"][-1]
+            results["Solids"][t + 1] = Stot
+            results["NH3"][t + 1] = state.NH3.sum()
+            results["ExhaustTemperature"][t + 1] = T_top
+
+            layer_T[:, t + 1] = state.T[store_layers]
+            layer_FH[:, t + 1] = state.FH[store_layers]
+
+        output = {"Times": list(range(HRT + 1))}
+        for name, values in results.items():
+            output[name] = values.tolist()
+        output["process_volume"] = setup.process_volume
+        output["Layers"] = {
+            "indices": store_layers.tolist(),
+            "Temperatures": layer_T,
+            "MoistureFraction": layer_FH,
+        }
+        return output
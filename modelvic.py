@@ -1,5 +1,233 @@
 import numpy as np
-import matplotlib.pyplot as plt
+
+from parameters import ModelParameters
+from psychrometrics import barometric_pressure, vapour_pressure, dry_air_flow, vapour_flow
+from kernel import (
+    select_kernel,
+    S_QAIR, S_TAIR, S_PV, S_P, S_MAIRIN, S_MWVIN, S_MWAD, S_TWATAD, S_PHASE, S_DT, S_RUN, N_SERIES,
+    U_ASH_NBVS, U_FKT20, U_SKT20, U_CP, U_TCO2, U_TNH3, U_TO2, U_TH2O, N_SUBS,
+    C_HBVS, C_FO2, C_BASE_HLC, C_AERATION_LOSS, C_HEAT_DAMPING, C_COOL_DAMPING,
+    C_MOIST_OPT, C_MOIST_TOL, C_THETA_G, C_THETA_I, C_DSUB, C_DWATER, C_ASH_TOT,
+    C_CPWATER, C_CPAIR, C_SOLVER, C_SEGMENT_DRIFT, C_GAS_OUTPUTS, N_CONSTS, SOLVER_EXPLICIT, SOLVER_IMPLICIT,
+    X_T, X_MWS, X_FS, X_FH, X_FVS, N_STATE,
+    O_T, O_MOIST, O_MFRAC, O_RH, O_SOLIDS, N_OUTPUTS,
+)
+
+
+def input_runs(series):
+    """
+    Nombre de pas suivant chaque pas avec les mêmes entrées (série S_RUN)
+
+    Args:
+        series: Séries d'entrée (N_SERIES, nombre de pas)
+
+    Returns:
+        Array : pour chaque pas t, nombre de pas consécutifs après t dont toutes
+        les séries d'entrée (hors S_RUN) sont égales à celles de t
+    """
+    inputs = np.delete(series, S_RUN, axis=0)
+    n = inputs.shape[1]
+    changes = np.append(np.any(inputs[:, 1:] != inputs[:, :-1], axis=0), True)
+    # Indice du prochain changement à partir de chaque pas
+    next_change = np.where(changes, np.arange(n), n)
+    next_change = np.minimum.accumulate(next_change[::-1])[::-1]
+    return (next_change - np.arange(n)).astype(float)
+
+
+# Noms des séries de résultats, dans l'ordre des indices O_* du noyau
+OUTPUT_CHANNELS = (
+    "Temperatures",
+    "Moisture",
+    "MoistureFraction",
+    "QExhaustgases",
+    "VExhaustgases",
+    "RelativeHumidity",
+    "Solids",
+    "NH3",
+)
+
+
+class SimulationSetup:
+    """
+    Entrées préparées d'une simulation : état initial, propriétés des substrats,
+    constantes et séries horaires précalculées (voir SimulationModel.prepare)
+    """
+    
+    def __init__(self, HRT, params, state, fBVS, sBVS, BVS, subs, series, consts,
+                 S_tot_in, H_tot_in, FH_tot_in, process_volume, compositions=None):
+        self.HRT = HRT
+        self.params = params
+        self.state = state
+        self.fBVS = fBVS
+        self.sBVS = sBVS
+        self.BVS = BVS
+        self.subs = subs
+        self.series = series
+        self.consts = consts
+        self.S_tot_in = S_tot_in
+        self.H_tot_in = H_tot_in
+        self.FH_tot_in = FH_tot_in
+        self.process_volume = process_volume
+        # Composition [C, H, O, N] des substrats (rapport C/N des résultats)
+        self.compositions = compositions
+        self.time_step = params.time_step
+        # Nombre de pas du noyau (le dernier pas peut être plus court)
+        self.n_steps = -(-HRT // self.time_step)
+    
+    @property
+    def times(self):
+        """Instants (heures) de l'état initial et de la fin de chaque pas"""
+        return list(range(0, self.HRT, self.time_step)) + [self.HRT]
+    
+    def step_series(self):
+        """
+        Séries d'entrée au pas de temps du noyau
+        
+        Au pas horaire, les séries préparées ; sinon leur moyenne sur chaque pas
+        (débits moyens, cycles d'aération compris), S_DT portant la durée du pas.
+        """
+        if self.time_step == 1:
+            return self.series
+        starts = np.arange(0, self.HRT, self.time_step)
+        durations = np.diff(np.append(starts, self.HRT))
+        series = np.add.reduceat(self.series, starts, axis=1) / durations
+        series[S_DT] = durations
+        series[S_RUN] = input_runs(series)
+        return series
+    
+    def kernel_arguments(self, arrays=False, history=True):
+        """
+        Copie de travail des arguments du noyau horaire
+        
+        Args:
+            arrays: True pour des arrays NumPy (noyau compilé), False pour des
+                    listes de flottants (accès rapide dans le noyau Python)
+            history: False pour ne réserver que l'état initial dans out (exécution
+                     par tranches, voir iter_chunks) ; series reste alors un array
+                     NumPy, découpé tranche par tranche
+            
+        Returns:
+            Liste [state, fBVS, sBVS, BVS, subs, series, consts, out]
+        """
+        out = np.zeros((N_OUTPUTS, self.n_steps + 1 if history else 1))
+        out[O_T, 0] = self.state[X_T]
+        out[O_MOIST, 0] = self.H_tot_in
+        out[O_MFRAC, 0] = self.FH_tot_in
+        out[O_RH, 0] = 60
+        out[O_SOLIDS, 0] = self.S_tot_in
+        
+        series = self.step_series()
+        arguments = [self.state, self.fBVS, self.sBVS, self.BVS, self.subs, series, self.consts, out]
+        if arrays:
+            return [np.array(argument, dtype=np.float64) for argument in arguments]
+        return [argument if argument is series and not history else argument.tolist() for argument in arguments]
+    
+    def build_results(self, out, storage=None):
+        """
+        Dictionnaire de résultats au format attendu par l'interface
+        
+        Args:
+            out: Séries de sortie du noyau (indices O_*)
+            storage: None pour des listes de flottants, ou mode de stockage d'un
+                     SimulationResult ("float64", "float32", "compact", voir results.py)
+        """
+        if storage is not None:
+            from results import SimulationResult
+            return SimulationResult(self.times, dict(zip(OUTPUT_CHANNELS, out)), self.process_volume, storage,
+                                    compositions=self.compositions)
+        if isinstance(out, np.ndarray):
+            out = out.tolist()
+        results = {"Times": self.times}
+        for k, name in enumerate(OUTPUT_CHANNELS):
+            results[name] = out[k]
+        results["process_volume"] = self.process_volume
+        return results
+    
+    def iter_results(self, backend="auto", chunk_size=None):
+        """
+        Exécute la simulation par tranches et publie les résultats au fur et à mesure
+        
+        Args:
+            backend: Noyau de calcul : "python", "numba" ou "auto"
+            chunk_size: None pour un enregistrement par pas de temps, ou nombre de
+                        pas K (des heures au pas horaire) pour des tranches de K pas
+        
+        Yields:
+            chunk_size None : {'Time': t, 'Temperatures': ..., ...} (une valeur par
+            série de OUTPUT_CHANNELS), pour chaque instant de times
+            chunk_size K : {'Times': [...], 'Temperatures': [...], ...} ; la première
+            tranche contient aussi l'état initial (t = 0), la concaténation des
+            tranches redonne les séries de run_simulation (sauf avec
+            segment_drift_limit : un segment s'arrête en fin de tranche)
+        """
+        if chunk_size is not None:
+            chunk_size = int(chunk_size)
+            if chunk_size < 1:
+                raise ValueError("chunk_size doit être un entier positif")
+        
+        step = self.time_step
+        for t0, t1, out_chunk in self.iter_chunks(backend, chunk_size or 256):
+            if isinstance(out_chunk, np.ndarray):
+                out_chunk = out_chunk.tolist()
+            
+            if chunk_size is None:
+                if t0 == 0:
+                    yield dict(zip(OUTPUT_CHANNELS, [row[0] for row in out_chunk]), Time=0)
+                for k in range(1, t1 - t0 + 1):
+                    record = {name: out_chunk[c][k] for c, name in enumerate(OUTPUT_CHANNELS)}
+                    record["Time"] = min((t0 + k) * step, self.HRT)
+                    yield record
+            else:
+                first = 0 if t0 == 0 else 1
+                chunk = {"Times": [min(k * step, self.HRT) for k in range(t0 + first, t1 + 1)]}
+                for c, name in enumerate(OUTPUT_CHANNELS):
+                    chunk[name] = out_chunk[c][first:]
+                yield chunk
+    
+    def iter_chunks(self, backend="auto", block=256):
+        """
+        Exécute le noyau par tranches de pas, sans conserver l'historique
+        
+        Args:
+            backend: Noyau de calcul : "python", "numba" ou "auto"
+            block: Nombre de pas par tranche
+        
+        Yields:
+            (t0, t1, out_chunk) : sorties des pas t0 à t1 - 1 dans les colonnes 1 à
+            t1 - t0 de out_chunk (array NumPy ou listes selon le noyau) ; la colonne
+            0 reprend la dernière valeur de la tranche précédente (l'état initial
+            pour la première)
+        """
+        kernel, arrays = select_kernel(backend)
+        state, fBVS, sBVS, BVS, subs, series, consts, out = self.kernel_arguments(arrays, history=False)
+        previous = [row[0] for row in out]
+        
+        n_steps = self.n_steps
+        t0 = 0
+        while t0 < n_steps:
+            t1 = min(n_steps, t0 + block)
+            # Séries d'entrée et sorties de la tranche, indexées à partir de 0
+            if arrays:
+                series_chunk = np.ascontiguousarray(series[:, t0:t1])
+                out_chunk = np.zeros((N_OUTPUTS, t1 - t0 + 1))
+                out_chunk[:, 0] = previous
+            else:
+                series_chunk = series[:, t0:t1].tolist()
+                out_chunk = [[value] + [0.0] * (t1 - t0) for value in previous]
+            try:
+                kernel(0, t1 - t0, state, fBVS, sBVS, BVS, subs, series_chunk, consts, out_chunk)
+            except Exception:
+                if backend != "auto" or not arrays or t0 > 0:
+                    raise
+                # Échec de la compilation : repli sur le noyau Python
+                kernel, arrays = select_kernel("python")
+                state, fBVS, sBVS, BVS, subs, series, consts, out = self.kernel_arguments(arrays, history=False)
+                continue
+            
+            previous = [row[-1] for row in out_chunk]
+            yield t0, t1, out_chunk
+            t0 = t1
+
 
 class SimulationModel:
     """
@@ -8,15 +236,126 @@ class SimulationModel:
     """
     
     @staticmethod
-    def run_simulation(data):
+    def run_simulation(data, params=None, backend="auto", profiler=None, outputs=None, resolution=None,
+                       storage=None):
         """
         Exécute une simulation avec les paramètres provenant de l'interface
+
+        Args:
+            data: Dictionnaire contenant tous les paramètres de simulation
+            params: Constantes du modèle (ModelParameters). Par défaut, construites à
+                    partir des clés correspondantes de data (voir ModelParameters.from_data)
+            backend: Noyau de calcul : "python", "numba" (compilé) ou "auto"
+                     (compilé si numba est installé, Python sinon)
+            profiler: StageProfiler optionnel (voir profiling.py) : mesure le temps
+                      passé dans chaque étape, avec le noyau Python instrumenté
+            outputs: None pour toutes les séries, ou liste des sorties à conserver
+                     (séries complètes ou résumés, voir outputs.py)
+            resolution: None pour un enregistrement par pas, un nombre de pas N
+                        (un enregistrement tous les N pas) ou une agrégation par
+                        fenêtre, ex. "daily:mean", "6h:max" (voir outputs.py)
+            storage: None pour un dictionnaire de listes, ou mode de stockage
+                     ("float64", "float32", "compact") d'un SimulationResult
+                     (séries en arrays NumPy, voir results.py)
+
+        Returns:
+            Dictionnaire avec les résultats de la simulation au format attendu
+            (avec outputs : les seules sorties demandées, voir OutputRecorder.results),
+            ou SimulationResult si storage est indiqué
+        """
+        if storage is not None:
+            from results import STORAGE_MODES
+            if storage not in STORAGE_MODES:
+                raise ValueError(f"Stockage inconnu : {storage} (choix : {', '.join(STORAGE_MODES)})")
+
+        recorder = None
+        if outputs is not None or resolution is not None:
+            from outputs import OutputRecorder
+            recorder = OutputRecorder(OUTPUT_CHANNELS if outputs is None else outputs, resolution)
+
+        if profiler is not None:
+            return SimulationModel._run_profiled(data, params, profiler, recorder, storage)
+
+        setup = SimulationModel.prepare(data, params)
+        if recorder is not None:
+            if not recorder.gas_outputs:
+                setup.consts[C_GAS_OUTPUTS] = 0.0
+            return recorder.record(setup, backend, storage)
+
+        kernel, arrays = select_kernel(backend)
+        arguments = setup.kernel_arguments(arrays)
+        
+        # Boucle principale de simulation
+        try:
+            kernel(0, setup.n_steps, *arguments)
+        except Exception:
+            if backend != "auto" or not arrays:
+                raise
+            # Échec de la compilation : repli sur le noyau Python
+            kernel, arrays = select_kernel("python")
+            arguments = setup.kernel_arguments(arrays)
+            kernel(0, setup.n_steps, *arguments)
+        
+        return setup.build_results(arguments[-1], storage)
+
+    @staticmethod
+    def _run_profiled(data, params, profiler, recorder=None, storage=None):
+        """run_simulation avec mesure du temps par étape (noyau Python instrumenté)"""
+        from profiling import instrumented_kernel
+
+        kernel = instrumented_kernel()
+        with profiler.stage("prepare"):
+            setup = SimulationModel.prepare(data, params)
+            if recorder is not None and not recorder.gas_outputs:
+                setup.consts[C_GAS_OUTPUTS] = 0.0
+            arguments = setup.kernel_arguments(arrays=False)
+        kernel(0, setup.n_steps, *arguments, profiler)
+        profiler.stop()
+        with profiler.stage("results"):
+            if recorder is None:
+                results = setup.build_results(arguments[-1], storage)
+            else:
+                recorder.reset()
+                recorder.update(setup.times, arguments[-1])
+                results = recorder.results(setup.process_volume, storage, setup.compositions)
+        return results
+
+    @staticmethod
+    def iter_simulation(data, params=None, backend="auto", chunk_size=None):
+        """
+        Exécute une simulation en publiant les résultats au fur et à mesure
+        
+        Le noyau avance par tranches : seules les sorties de la tranche en cours
+        sont conservées. Les séries d'entrée précalculées par prepare (N_SERIES
+        valeurs float64 par pas) restent en mémoire pour toute la durée simulée ;
+        les sorties, elles, ne grandissent pas avec elle.
+        Interrompre l'itération arrête le calcul.
+        
+        Args:
+            data: Dictionnaire contenant tous les paramètres de simulation
+            params: Constantes du modèle (ModelParameters)
+            backend: Noyau de calcul : "python", "numba" ou "auto"
+            chunk_size: None pour un enregistrement par pas de temps, ou nombre de
+                        pas K (des heures au pas horaire) pour des tranches de K pas
+        
+        Yields:
+            Voir SimulationSetup.iter_results
+        """
+        setup = SimulationModel.prepare(data, params)
+        return setup.iter_results(backend, chunk_size)
+
+    @staticmethod
+    def prepare(data, params=None):
+        """
+        Prépare une simulation : validation des entrées, état initial, constantes
+        et séries horaires précalculées (tout ce qui ne dépend que du temps)
         
         Args:
             data: Dictionnaire contenant tous les paramètres de simulation
+            params: Constantes du modèle (ModelParameters), optionnel
             
         Returns:
-            Dictionnaire avec les résultats de la simulation au format attendu
+            SimulationSetup
         """
         # Récupération des paramètres depuis data
         NS = data.get('NS', len(data.get('Substrates', [])))
@@ -40,6 +379,10 @@ class SimulationModel:
         Cpsubstrate = np.array(data.get('Cp', [0.9] * NS))
         HBVS = data.get('HBVS', 16000)  # kJ/kg BVS dégradé
         
+        # Constantes du modèle (validées)
+        if params is None:
+            params = ModelParameters.from_data(data)
+        
         # Paramètres de simulation - conversion explicite des types
         # S'assurer que HRT est un entier valide
         try:
@@ -59,8 +402,6 @@ class SimulationModel:
             # En cas d'erreur de conversion, utiliser la valeur par défaut
             HRT = 1080
         
-        points_per_hour = 1  # Points de calcul par heure
-        
         # Paramètres d'aération - avec validation des types
         try:
             air_flow = float(data.get('air_flow', 10.0))
@@ -187,348 +528,143 @@ class SimulationModel:
         FVS_tot_in = (VS_tot_in / S_tot_in) * 100
         
         # Configuration de l'aération selon les paramètres
-        Qair = np.zeros(HRT)
-        
-        if air_alternance:
-            # Alternance ON/OFF
-            cycle_duration = air_on_time + air_off_time
-            for t in range(HRT):
-                cycle_position = t % cycle_duration
-                if cycle_position < air_on_time:
-                    Qair[t] = air_flow
-                else:
-                    Qair[t] = 0
-        else:
-            # Aération continue
-            Qair[:] = air_flow
+        Qair = SimulationModel.aeration_schedule(HRT, air_flow, air_alternance, air_on_time, air_off_time)
         
         # Configuration de la température et humidité de l'air
         Tambiant_array = np.ones(HRT) * Tambiant
         RHair_array = np.ones(HRT) * RHair
-        AirCaract = np.column_stack((Qair, Tambiant_array, RHair_array))
         
         # Configuration de l'eau ajoutée
         mwad = np.ones(HRT) * water_flow
         Twatad = np.ones(HRT) * water_temp
-        WateraddCaract = np.column_stack((mwad, Twatad))
-        
-        # Paramètres du modèle thermique
-        Tairin = Tambiant_array
-        Z = 0  # m (altitude)
-        P0 = 101325  # Pa (pression atmosphérique au niveau de la mer)
-        P = P0 * np.exp(-28.96/1000 * 9.81 * Z / (8.314 * (Tambiant + 273)))
         
         # Chaleurs spécifiques
         if len(Cpsubstrate) < NS:
             Cpsubstrate = np.pad(Cpsubstrate, (0, NS - len(Cpsubstrate)), 'constant', constant_values=(1.0))
         
         Cpwater = 4.196  # kJ/kg·°C
-        Cpvapor = 1.4  # kJ/kg·°C
         Cpair = 1.005  # kJ/kg·°C
         
-        # Variables de suivi du processus
-        Times = [0]
-        Temperatures = [T]
-        Moisture = [H_tot_in]
-        MoistureFraction = [FH_tot_in]
-        QExhaustgases = [0]
-        VExhaustgases = [0]
-        RelativeHumidity = [60]
-        Solids = [S_tot_in]
-        
-        # Variables du processus
-        fKT = np.zeros(NS)
-        sKT = np.zeros(NS)
-        fK = np.zeros(NS)
-        sK = np.zeros(NS)
-        fBVSout = np.zeros(NS)
-        sBVSout = np.zeros(NS)
-        BVSout = np.zeros(NS)
-        Sout = np.zeros(NS)
-        BVSdegraded = np.zeros(NS)
-        TCO2 = np.zeros(NS)
-        TO2 = np.zeros(NS)
-        TNH3 = np.zeros(NS)
-        mCO2 = np.zeros(NS)
-        mNH3 = np.zeros(NS)
-        mO2 = np.zeros(NS)
-        TH2O = np.zeros(NS)
-        mwp = np.zeros(NS)
-        Hsolidin = np.zeros(NS)
-        Hsolidout = np.zeros(NS)
-        
-        # Densités (selon conditions standard)
-        Deltasubstrate = 1000  # kg/m3
-        Deltawater = 1000  # kg/m3
+        # Séries horaires de l'air entrant (ne dépendent que du temps)
+        Tairin = Tambiant_array
+        P = barometric_pressure(params.altitude, Tambiant_array)
+        PV = vapour_pressure(Tairin, RHair_array)
+        aerated = Qair > 0
+        mairin = np.where(aerated, dry_air_flow(Qair, P, PV, Tairin), 0.0)
+        mwvin = np.where(aerated, vapour_flow(Qair, PV, Tairin), 0.0)
+        
+        # Facteur de chaleur selon la phase du compostage (progression t / HRT)
+        phase_factor = np.array([params.heat_factor(t / HRT) for t in range(HRT)])
+        
+        series = np.empty((N_SERIES, HRT))
+        series[S_QAIR] = Qair
+        series[S_TAIR] = Tairin
+        series[S_PV] = PV
+        series[S_P] = P
+        series[S_MAIRIN] = mairin
+        series[S_MWVIN] = mwvin
+        series[S_MWAD] = mwad
+        series[S_TWATAD] = Twatad
+        series[S_PHASE] = phase_factor
+        series[S_DT] = 1.0
+        series[S_RUN] = input_runs(series)
+        
+        # Rendements stoechiométriques des produits de dégradation (CO2, O2, NH3, H2O)
+        a, b, c, d = a[:NS], b[:NS], c[:NS], d[:NS]
+        denominator = a*12 + b*1 + c*16 + d*14
+        valid = denominator > 0
+        safe_denominator = np.where(valid, denominator, 1.0)
+        TCO2 = np.where(valid, (a * (12 + 2*16)) / safe_denominator, 0.0)
+        TO2 = np.where(valid, ((4*a + b - 3*d - 2*c) / 4) * ((2*16) / safe_denominator), 0.0)
+        TNH3 = np.where(valid, d * (14 + 3) / safe_denominator, 0.0)
+        TH2O = np.where(valid, ((b - 3*d)/2) * (2+16) / safe_denominator, 0.0)
+        
+        subs = np.empty((N_SUBS, NS))
+        subs[U_ASH_NBVS] = ASH + NBVS
+        subs[U_FKT20] = fKT20
+        subs[U_SKT20] = sKT20
+        subs[U_CP] = Cpsubstrate[:NS]
+        subs[U_TCO2] = TCO2
+        subs[U_TNH3] = TNH3
+        subs[U_TO2] = TO2
+        subs[U_TH2O] = TH2O
+        
+        consts = np.empty(N_CONSTS)
+        consts[C_HBVS] = HBVS
+        consts[C_FO2] = params.VPO2/(params.VPO2 + 2)
+        consts[C_BASE_HLC] = params.heat_loss_coefficient * params.insulation_factor
+        consts[C_AERATION_LOSS] = params.aeration_loss_coefficient
+        consts[C_HEAT_DAMPING] = 1 - params.inertia_factor
+        consts[C_COOL_DAMPING] = 1 - params.inertia_factor * params.cooling_inertia_multiplier
+        consts[C_MOIST_OPT] = params.moisture_optimum
+        consts[C_MOIST_TOL] = params.moisture_tolerance
+        consts[C_THETA_G] = params.theta_growth
+        consts[C_THETA_I] = params.theta_inhibition
+        consts[C_DSUB] = params.substrate_density
+        consts[C_DWATER] = params.water_density
+        consts[C_ASH_TOT] = np.sum(ASH)
+        consts[C_CPWATER] = Cpwater
+        consts[C_CPAIR] = Cpair
+        consts[C_SOLVER] = SOLVER_IMPLICIT if params.energy_solver == "implicit" else SOLVER_EXPLICIT
+        consts[C_SEGMENT_DRIFT] = params.segment_drift_limit
+        consts[C_GAS_OUTPUTS] = 1.0
+        
+        state = np.zeros(N_STATE)
+        state[X_T] = T
+        state[X_MWS] = mwsin
+        state[X_FS] = FS_tot_in
+        state[X_FH] = FH_tot_in
+        state[X_FVS] = FVS_tot_in
+        
+        return SimulationSetup(
+            HRT=HRT,
+            params=params,
+            state=state,
+            fBVS=fBVS,
+            sBVS=sBVS,
+            BVS=BVS,
+            subs=subs,
+            series=series,
+            consts=consts,
+            S_tot_in=S_tot_in,
+            H_tot_in=H_tot_in,
+            FH_tot_in=FH_tot_in,
+            # Calcul du volume du processus
+            process_volume=(S_tot_in + H_tot_in) / params.substrate_density,
+            compositions=[list(composition) for composition in CCS] or None
+        )
+    
+    @staticmethod
+    def aeration_schedule(HRT, air_flow, air_alternance=False, air_on_time=1.0, air_off_time=0.5):
+        """
+        Construit le profil horaire du débit d'air (m³/h)
         
-        # Boucle principale de simulation
-        for t in range(HRT):
-            # Utilise les données d'aération de l'heure courante
-            current_Qair = Qair[t]
-            current_Tambiant = Tambiant_array[t]
-            current_RHair = RHair_array[t]
-            current_mwad = mwad[t]
-            current_Twatad = Twatad[t]
-            
-            # Caractéristiques biologiques
-            F1 = 1/(np.exp(-17.684*(1 - FS_tot_in/100) + 7.0622) + 1)
-            VPO2 = 21
-            FO2 = VPO2/(VPO2 + 2)
-            Gm = 1/( (FVS_tot_in/100)/1 + ((1 - FVS_tot_in/100)/2.5) )
-            
-            # Espace d'air libre (FAS) et facteur d'aération (F2)
-            FAS = 1 - ( (Deltasubstrate * FS_tot_in/100) / (Gm * Deltawater) - (Deltasubstrate * (FH_tot_in/100)/Deltawater) )
-            F2 = 1/(np.exp(-23.675*FAS + 3.4945) + 1)
-            
-            # Initialisation
-            Tprocess = T  # On part de la température actuelle
-            Tairin = current_Tambiant
-            
-            # Calcul des propriétés de l'air entrant
-            PVS = np.exp(1.19*10 - (3.99e3)/(2.34e2 + Tairin)) * 1e5
-            PV = PVS * current_RHair / 100
-            P = P0 * np.exp(-28.96/1000 * 9.81 * Z / (8.314 * (current_Tambiant + 273)))
-            
-            # Éviter la division par zéro dans le calcul de mairin
-            if current_Qair > 0:
-                mairin = ((28.96/1000) * (P - PV) * current_Qair) / (8.314 * (Tairin + 273))
-                mwvin = ((18.015/1000) * PV * current_Qair) / (8.314 * (Tairin + 273))
-            else:
-                mairin = 0
-                mwvin = 0
-            
-            # Calcul des constantes de dégradation à la température actuelle
-            for i in range(NS):
-                fKT[i] = fKT20[i] * (1.066**(Tprocess-20) - 1.21**(Tprocess-60))
-                sKT[i] = sKT20[i] * (1.066**(Tprocess-20) - 1.21**(Tprocess-60))
-                # Limiter les valeurs négatives
-                fKT[i] = max(0, fKT[i])
-                sKT[i] = max(0, sKT[i])
-                fK[i] = fKT[i] * F1 * F2 * FO2
-                sK[i] = sKT[i] * F1 * F2 * FO2
-            
-            # Calcul des matières dégradées et des nouvelles masses
-            for i in range(NS):
-                fBVSout[i] = fBVS[i] / (1 + fK[i] * (1/24))
-                sBVSout[i] = sBVS[i] / (1 + sK[i] * (1/24))
-                BVSout[i] = fBVSout[i] + sBVSout[i]
-                Sout[i] = ASH[i] + NBVS[i] + BVSout[i]
-                BVSdegraded[i] = BVS[i] - BVSout[i]
-            
-            Stotout = np.sum(Sout)
-            BVSdegradedtot = np.sum(BVSdegraded)
-            
-            # Calcul des produits de dégradation (CO2, O2, NH3, H2O)
-            for i in range(NS):
-                denominator = a[i]*12 + b[i]*1 + c[i]*16 + d[i]*14
-                if denominator > 0:
-                    TCO2[i] = (a[i] * (12 + 2*16)) / denominator
-                    TO2[i] = ((4*a[i] + b[i] - 3*d[i] - 2*c[i]) / 4) * ((2*16) / denominator)
-                    TNH3[i] = d[i] * (14 + 3) / denominator
-                    TH2O[i] = ((b[i] - 3*d[i])/2) * (2+16) / denominator
-                else:
-                    TCO2[i] = TO2[i] = TNH3[i] = TH2O[i] = 0
-                    
-                mCO2[i] = TCO2[i] * BVSdegraded[i]
-                mNH3[i] = TNH3[i] * BVSdegraded[i]
-                mO2[i] = TO2[i] * BVSdegraded[i]
-                mwp[i] = TH2O[i] * BVSdegraded[i]
-            
-            mCO2tot = np.sum(mCO2)
-            mNH3tot = np.sum(mNH3)
-            mO2tot = np.sum(mO2)
-            mwptot = np.sum(mwp)
-            
-            # Calcul du bilan d'air et d'eau
-            mgasout = mairin + mCO2tot + mNH3tot - mO2tot
-            
-            # Calcul de la chaleur latente (kJ/kg)
-            HLv = (1033.7 - 0.5683 * Tprocess) * 2.326
-            
-            # Pression de vapeur via équation existante
-            PVSO = np.exp(1.19 * 10 - (3.99 * 10**3) / (2.34 * 10**2 + Tprocess)) * 10**5
-            PVO = PV + (PVSO - PV) * F1
-            
-            # Limiter PVO à PVSO pour éviter les valeurs irréalistes
-            PVO = min(PVO, PVSO)
-            
-            # Calcul du débit d'eau évaporée
-            if current_Qair > 0:
-                mwvout = ((18.015/1000) * PVO * current_Qair) / (8.314 * (Tprocess + 273))
-            else:
-                mwvout = 0
-            
-            # Évaporation - quantité d'eau évaporée
-            mwsout = mwsin + mwptot + current_mwad + mwvin - mwvout
-            
-            # Assurer que mwsout n'est pas négatif
-            mwsout = max(0, mwsout)
-            
-            # Mise à jour des fractions
-            if (Stotout + mwsout) > 0:
-                FHtotout = (mwsout / (Stotout + mwsout)) * 100
-                FStotout = (Stotout / (Stotout + mwsout)) * 100
-            else:
-                FHtotout = 0
-                FStotout = 0
-                
-            if Stotout > 0:
-                FVStotout = ((Stotout - np.sum(ASH)) / Stotout) * 100
-            else:
-                FVStotout = 0
-            
-            # Calcul du bilan énergétique
-            
-            # Énergie contenue initialement
-            for i in range(NS):
-                Hsolidin[i] = S[i] * Cpsubstrate[i] * (T - 0)
-            
-            Hwaterin = mwsin * Cpwater * (T - 0)
-            Hdryairin = mairin * Cpair * (Tairin - 0)
-            Hvaporin = mwvin * Cpvapor * (Tairin - 0)
-            Hwaterad = current_mwad * Cpwater * (current_Twatad - 0)
-            
-            # Énergie générée par la dégradation biologique
-            # Ajuster la chaleur générée en fonction de la phase du compostage
-            biodegradation_time = t / HRT  # Progression normalisée (0 à 1)
-            heat_factor = 1.0
-            
-            # Facteur de chaleur ajusté selon la phase de compostage pour correspondre à la courbe de référence
-            if biodegradation_time < 0.1:  # Premiers 10% du temps (phase mésophile)
-                heat_factor = 0.8  # Phase de démarrage
-            elif biodegradation_time < 0.2:  # 10-20% du temps (phase thermophile ascendante)
-                heat_factor = 1.5  # Phase de forte croissance
-            elif biodegradation_time < 0.35:  # 20-35% du temps (phase thermophile plateau)
-                heat_factor = 1.2  # Plateau thermophile
-            elif biodegradation_time < 0.65:  # 35-65% du temps (phase de refroidissement)
-                heat_factor = 0.7  # Phase de ralentissement
-            elif biodegradation_time < 0.85:  # 65-85% du temps (phase de maturation)
-                heat_factor = 0.5  # Phase finale
-            else:  # Derniers 15% (phase terminale)
-                heat_factor = 0.3  # Activité résiduelle minime
-                
-            # Modulation du facteur de chaleur en fonction de la température
-            # Réduction de l'activité quand il fait trop chaud (>65°C) ou trop froid (<15°C)
-            if Tprocess > 65:
-                temp_inhibition = 1.0 - ((Tprocess - 65) / 20)  # À 85°C, facteur = 0
-                heat_factor *= max(0.2, temp_inhibition)  # Éviter d'arrêter complètement
-            elif Tprocess < 15:
-                temp_activation = max(0.5, Tprocess / 15)  # En dessous de 15°C, réduction du facteur
-                heat_factor *= temp_activation
-                
-            # Modulation en fonction de l'humidité - trop sec ou trop humide inhibe
-            moisture_optimum = 50.0  # % d'humidité optimale
-            moisture_factor = 1.0 - abs(FHtotout - moisture_optimum) / 70.0  # Réduit quand trop loin de l'optimum
-            heat_factor *= max(0.3, moisture_factor)  # Minimum 30% de facteur
-                
-            # Appliquer le facteur à la chaleur générée
-            Horg = HBVS * BVSdegradedtot * heat_factor
-            
-            # Pertes thermiques par conduction et convection
-            insulation_factor = 0.6  # Facteur d'isolation (0-1), 0 = parfaitement isolé
-            heat_loss_coefficient = 15 * insulation_factor  # kJ/h/°C pour les pertes thermiques
-            
-            # Effet de l'aération sur les pertes
-            if current_Qair > 0:
-                # Aération active - pertes plus importantes
-                aeration_loss = current_Qair * 0.06  # Pertes accrues avec débit d'air
-                heat_loss_coefficient += aeration_loss
-            
-            # Pertes thermiques proportionnelles à la différence de température
-            H_loss = heat_loss_coefficient * (Tprocess - Tairin)
-            
-            # Énergie pour évaporer l'eau
-            H_evap = (mwvout - mwvin) * HLv
-            
-            # Énergie disponible pour chauffer le système
-            H_available = Horg - H_evap - H_loss
-            
-            # Capacité calorifique totale du système (kJ/°C)
-            Cp_total = 0
-            for i in range(NS):
-                Cp_total += Sout[i] * Cpsubstrate[i]
-            Cp_total += mwsout * Cpwater
-            Cp_total += mgasout * Cpair
-            
-            # Calcul de la nouvelle température avec inertie thermique
-            inertia_factor = 0.85  # Facteur d'inertie (0-1)
+        Args:
+            HRT: Durée de simulation (heures)
+            air_flow: Débit d'air lorsque l'aération est active (m³/h)
+            air_alternance: Active l'alternance ON/OFF
+            air_on_time: Durée de la phase ON (heures)
+            air_off_time: Durée de la phase OFF (heures)
             
-            if Cp_total > 0:
-                delta_T = H_available / Cp_total  # Changement instantané de température
-                
-                # Ajouter l'inertie thermique - changement plus lent de température
-                # Utiliser un coefficient différent pour la hausse vs. baisse de température
-                if delta_T > 0:
-                    # Montée en température
-                    delta_T_applied = delta_T * (1 - inertia_factor)
+        Returns:
+            Array numpy de longueur HRT avec le débit d'air de chaque heure
+        """
+        Qair = np.zeros(HRT)
+        
+        if air_alternance:
+            # Alternance ON/OFF
+            cycle_duration = air_on_time + air_off_time
+            for t in range(HRT):
+                cycle_position = t % cycle_duration
+                if cycle_position < air_on_time:
+                    Qair[t] = air_flow
                 else:
-                    # Descente en température - plus lente
-                    delta_T_applied = delta_T * (1 - inertia_factor * 1.1)
-                
-                # Application directe du changement de température sans aucune limite
-                Tprocess_new = T + delta_T_applied
-                
-            else:
-                Tprocess_new = T  # Pas de changement si pas de capacité thermique
-            
-            # Affecter la nouvelle température calculée
-            Tprocess = Tprocess_new
-            
-            # Éviter la division par zéro
-            if mgasout > 0:
-                VPO2calculated = (21 / 100) * (mairin - mO2tot) / mgasout * 100
-            else:
-                VPO2calculated = 0  # Valeur par défaut si mgasout est zéro
-                
-            RHO = (PVO / PVSO) * 100
-            
-            # Calcul du volume des gaz
-            if P > PVO:  # Éviter division par zéro ou nombres négatifs
-                Vgases = (8.314 * (Tprocess + 273) / (P - PVO)) * ((mairin / (28.96/1000)) + 
-                                                            (mCO2tot / (44/1000)) + 
-                                                            (mNH3tot / (17/1000)) - 
-                                                            (mO2tot / (32/1000)))
-            else:
-                Vgases = 0
-            
-            # Mise à jour des variables d'état pour le prochain pas de temps
-            FS_tot_in = FStotout
-            FH_tot_in = FHtotout
-            FVS_tot_in = FVStotout
-            
-            # Ajout des données aux historiques
-            Times.append(t+1)
-            Temperatures.append(Tprocess)
-            Moisture.append(mwsout)
-            MoistureFraction.append(FHtotout)
-            QExhaustgases.append(mgasout)
-            VExhaustgases.append(Vgases)
-            RelativeHumidity.append(RHO)
-            Solids.append(Stotout)
-            
-            # Mise à jour des variables d'état
-            fBVS = fBVSout.copy()
-            sBVS = sBVSout.copy()
-            BVS = BVSout.copy()
-            T = Tprocess
-            mwsin = mwsout
-            S = Sout.copy()
-        
-        # Calcul du volume du processus
-        process_volume = (S_tot_in + H_tot_in) / Deltasubstrate
-        
-        # Construction et retour des résultats au format attendu par l'interface
-        return {
-            "Times": Times,
-            "Temperatures": Temperatures,
-            "Moisture": Moisture,
-            "MoistureFraction": MoistureFraction,
-            "QExhaustgases": QExhaustgases,
-            "VExhaustgases": VExhaustgases,
-            "RelativeHumidity": RelativeHumidity,
-            "Solids": Solids,
-            "process_volume": process_volume
-        }
+                    Qair[t] = 0
+        else:
+            # Aération continue
+            Qair[:] = air_flow
+        
+        return Qair
     
     @staticmethod
     def plot_results(results):
@@ -544,6 +680,9 @@ class SimulationModel:
         6. Humidité relative : humidité de l'air dans le tas
         7. Matières solides : évolution de la masse sèche
         """
+        # Import différé : matplotlib n'est pas chargé par les processus de calcul
+        import matplotlib.pyplot as plt
+        
         # Extraction des données
         Times_array = results["Times"]
         Temperatures_array = results["Temperatures"]
@@ -0,0 +1,276 @@
+"""
+Propagation d'incertitude par Monte Carlo sur les propriétés des substrats.
+
+Les caractéristiques mesurées en laboratoire (FS, FVS, FBVS, FfBVS, fKT20, sKT20,
+composition CHON) sont tirées dans des lois définies par l'utilisateur. Les
+réalisations sont simulées par lots sur le moteur parallèle et réduites au fil
+de l'eau en bandes de percentiles : la mémoire utilisée ne dépend pas du nombre
+de réalisations.
+"""
+import os
+
+import numpy as np
+
+from batch import WorkerPool, run_batch
+
+
+# Paramètres des substrats pouvant être rendus incertains
+UNCERTAIN_PARAMETERS = ("FS", "FVS", "FBVS", "FfBVS", "fKT20", "sKT20", "CCS")
+
+# Bornes physiques appliquées après tirage
+PARAMETER_BOUNDS = {
+    "FS": (0.0, 100.0),
+    "FVS": (0.0, 100.0),
+    "FBVS": (0.0, 100.0),
+    "FfBVS": (0.0, 100.0),
+    "fKT20": (0.0, np.inf),
+    "sKT20": (0.0, np.inf),
+    "CCS": (0.0, np.inf),
+}
+
+# Séries temporelles réduites en percentiles
+DEFAULT_CHANNELS = ("Temperatures", "MoistureFraction", "Solids")
+
+
+def sample_distribution(rng, spec, base_value, size):
+    """
+    Tire des valeurs dans une loi de probabilité
+
+    Args:
+        rng: Générateur numpy (np.random.Generator)
+        spec: Tuple décrivant la loi :
+              ("fixed", valeur), ("normal", moyenne, écart-type),
+              ("lognormal", moyenne, écart-type), ("uniform", min, max),
+              ("triangular", min, mode, max).
+              Une moyenne (ou un mode) à None reprend la valeur de référence.
+        base_value: Valeur de référence du paramètre
+        size: Nombre de tirages
+
+    Returns:
+        Array numpy de taille size
+    """
+    kind = spec[0]
+    args = list(spec[1:])
+
+    if kind == "fixed":
+        value = base_value if not args or args[0] is None else args[0]
+        return np.full(size, float(value))
+
+    if kind in ("normal", "lognormal"):
+        mean = base_value if args[0] is None else args[0]
+        sd = args[1]
+        if kind == "normal":
+            return rng.normal(mean, sd, size)
+        # Loi lognormale paramétrée par la moyenne et l'écart-type de la variable
+        sigma2 = np.log(1 + (sd / mean) ** 2)
+        return rng.lognormal(np.log(mean) - sigma2 / 2, np.sqrt(sigma2), size)
+
+    if kind == "uniform":
+        return rng.uniform(args[0], args[1], size)
+
+    if kind == "triangular":
+        mode = base_value if args[1] is None else args[1]
+        return rng.triangular(args[0], mode, args[2], size)
+
+    raise ValueError(f"Loi de probabilité inconnue : {kind}")
+
+
+def sample_inputs(base_data, distributions, n, rng):
+    """
+    Génère n jeux de données en tirant les paramètres incertains
+
+    Args:
+        base_data: Dictionnaire de paramètres de référence (format de run_simulation)
+        distributions: Dictionnaire {paramètre: liste de lois par substrat}.
+                       Une loi à None laisse le substrat à sa valeur de référence.
+                       Pour "CCS", chaque substrat reçoit une liste de 4 lois (C, H, O, N).
+        n: Nombre de réalisations
+        rng: Générateur numpy
+
+    Returns:
+        Liste de n dictionnaires de paramètres
+    """
+    samples = {}
+    for name, specs in distributions.items():
+        if name not in UNCERTAIN_PARAMETERS:
+            raise ValueError(f"Paramètre non échantillonnable : {name}")
+
+        low, high = PARAMETER_BOUNDS[name]
+        base_values = base_data[name]
+
+        if name == "CCS":
+            # Tableau (n, NS, 4) des compositions CHON
+            drawn = np.empty((n, len(base_values), 4))
+            for i, base_comp in enumerate(base_values):
+                for k in range(4):
+                    spec = specs[i][k] if i < len(specs) and specs[i] is not None else None
+                    if spec is None:
+                        drawn[:, i, k] = base_comp[k]
+                    else:
+                        drawn[:, i, k] = sample_distribution(rng, spec, base_comp[k], n)
+        else:
+            # Tableau (n, NS) des valeurs par substrat
+            drawn = np.empty((n, len(base_values)))
+            for i, base_value in enumerate(base_values):
+                spec = specs[i] if i < len(specs) else None
+                if spec is None:
+                    drawn[:, i] = base_value
+                else:
+                    drawn[:, i] = sample_distribution(rng, spec, base_value, n)
+
+        samples[name] = np.clip(drawn, low, high)
+
+    return [
+        dict(base_data, **{name: values[j].tolist() for name, values in samples.items()})
+        for j in range(n)
+    ]
+
+
+class StreamingPercentiles:
+    """
+    Estimation des percentiles d'une série temporelle, réalisation par réalisation.
+
+    Chaque pas de temps possède un histogramme à bornes fixes (déterminées à partir
+    du premier lot avec une marge) : la mémoire est en O(nombre de pas × nombre de
+    classes), indépendante du nombre de réalisations. Les valeurs hors bornes sont
+    comptées dans les classes extrêmes.
+    """
+
+    def __init__(self, bins=400, margin=0.5):
+        self.bins = bins
+        self.margin = margin
+        self.edges = None
+        self.counts = None
+        self.total = None
+        self.minimum = None
+        self.maximum = None
+        self.n = 0
+
+    def update(self, values):
+        """
+        Ajoute un lot de réalisations
+
+        Args:
+            values: Array (n_realisations, n_pas) des valeurs simulées
+        """
+        values = np.asarray(values, dtype=float)
+        n_real, n_steps = values.shape
+
+        if self.edges is None:
+            low = values.min(axis=0)
+            high = values.max(axis=0)
+            span = np.maximum(high - low, 1e-9 + 1e-6 * np.abs(high))
+            low = low - self.margin * span
+            high = high + self.margin * span
+            self.edges = np.linspace(low, high, self.bins + 1, axis=1)
+            self.counts = np.zeros((n_steps, self.bins), dtype=np.int64)
+            self.total = np.zeros(n_steps)
+            self.minimum = np.full(n_steps, np.inf)
+            self.maximum = np.full(n_steps, -np.inf)
+
+        # Indice de classe de chaque valeur, pas de temps par pas de temps
+        low = self.edges[:, 0]
+        width = (self.edges[:, -1] - low) / self.bins
+        index = np.floor((values - low) / width).astype(np.int64)
+        np.clip(index, 0, self.bins - 1, out=index)
+
+        step_index = np.broadcast_to(np.arange(n_steps), index.shape)
+        np.add.at(self.counts, (step_index.ravel(), index.ravel()), 1)
+
+        self.total += values.sum(axis=0)
+        np.minimum(self.minimum, values.min(axis=0), out=self.minimum)
+        np.maximum(self.maximum, values.max(axis=0), out=self.maximum)
+        self.n += n_real
+
+    def mean(self):
+        """Moyenne exacte à chaque pas de temps"""
+        return self.total / self.n
+
+    def percentile(self, q):
+        """
+        Percentile q (0-100) à chaque pas de temps, par interpolation linéaire
+        dans l'histogramme cumulé
+
+        Returns:
+            Array (n_pas,)
+        """
+        cumulative = np.cumsum(self.counts, axis=1)
+        target = q / 100 * self.n
+        # Première classe dont l'effectif cumulé atteint la cible
+        k = np.minimum((cumulative < target).sum(axis=1), self.bins - 1)
+        steps = np.arange(len(k))
+        before = np.where(k > 0, cumulative[steps, k - 1], 0)
+        in_bin = self.counts[steps, k]
+        fraction = np.where(in_bin > 0, (target - before) / np.maximum(in_bin, 1), 0.5)
+        value = self.edges[steps, k] + fraction * (self.edges[steps, k + 1] - self.edges[steps, k])
+        return np.clip(value, self.minimum, self.maximum)
+
+
+def run_monte_carlo(base_data, distributions, n=1000, percentiles=(5, 50, 95),
+                    channels=DEFAULT_CHANNELS, chunk_size=200, seed=None,
+                    workers=None, executor=None, bins=400, progress=None, pool=None):
+    """
+    Propagation d'incertitude par Monte Carlo
+
+    Args:
+        base_data: Dictionnaire de paramètres de référence (format de run_simulation)
+        distributions: Lois des paramètres incertains (voir sample_inputs), par exemple
+                       {"FS": [("normal", None, 2.0), None], "fKT20": [("uniform", 0.04, 0.06), None]}
+        n: Nombre de réalisations
+        percentiles: Percentiles à calculer (0-100)
+        channels: Séries temporelles à réduire
+        chunk_size: Nombre de réalisations simulées puis réduites à la fois
+        seed: Graine du générateur aléatoire (reproductibilité)
+        workers: Nombre de processus pour les simulations
+        executor: Executor existant à réutiliser
+        bins: Nombre de classes des histogrammes de percentiles
+        progress: Fonction optionnelle appelée avec (réalisations terminées, total)
+        pool: WorkerPool existant à réutiliser (prioritaire sur workers et executor).
+              Sans pool ni executor, un pool est créé pour toute la propagation :
+              les processus ne démarrent qu'une fois, pas à chaque lot
+
+    Returns:
+        Dictionnaire contenant "Times", "n" et, pour chaque série, un dictionnaire
+        {"mean": array, "p5": array, "p50": array, ...}
+    """
+    rng = np.random.default_rng(seed)
+    reducers = {channel: StreamingPercentiles(bins=bins) for channel in channels}
+    times = None
+    done = 0
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    own_pool = pool is None and executor is None and workers > 1 and n > 1
+    if own_pool:
+        pool = WorkerPool(min(workers, chunk_size, n))
+
+    try:
+        while done < n:
+            size = min(chunk_size, n - done)
+            datas = sample_inputs(base_data, distributions, size, rng)
+            # Seules les séries réduites reviennent des processus
+            if pool is not None:
+                results = pool.run_batch(datas, outputs=list(channels))
+            else:
+                results = run_batch(datas, workers=workers, executor=executor, outputs=list(channels))
+
+            if times is None:
+                times = list(results[0]["Times"])
+            for channel, reducer in reducers.items():
+                reducer.update([result[channel] for result in results])
+
+            done += size
+            if progress is not None:
+                progress(done, n)
+    finally:
+        if own_pool:
+            pool.shutdown()
+
+    summary = {"Times": times, "n": n}
+    for channel, reducer in reducers.items():
+        bands = {"mean": reducer.mean()}
+        for q in percentiles:
+            bands[f"p{q:g}"] = reducer.percentile(q)
+        summary[channel] = bands
+
+    return summary
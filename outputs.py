@@ -0,0 +1,322 @@
+"""
+Sélection des sorties d'une simulation.
+
+Par défaut, run_simulation renvoie toutes les séries de OUTPUT_CHANNELS. Pour un
+balayage qui n'exploite que quelques grandeurs, run_simulation(data, outputs=[...])
+ne conserve que ce qui est demandé :
+    - une série complète : "Temperatures", "MoistureFraction"... (avec "Times") ;
+    - un résumé « série:résumé » : "MoistureFraction:final", "Temperatures:max",
+      "Temperatures:min", "Temperatures:mean" (moyenne pondérée par la durée des
+      pas), "Moisture:initial" ;
+    - une durée (heures) au-dessus ou au-dessous d'un seuil :
+      "Temperatures:above:55", "MoistureFraction:below:30".
+
+Les résumés sont cumulés tranche par tranche pendant le calcul : sans série
+complète demandée, la mémoire des sorties ne dépend pas de la durée simulée
+(seules les séries d'entrée précalculées, N_SERIES valeurs par pas, lui restent
+proportionnelles). Le
+noyau ne calcule les sorties gaz (VExhaustgases, RelativeHumidity) que si l'une
+d'elles est demandée.
+
+La résolution des séries complètes se choisit avec run_simulation(data,
+resolution=...), appliquée elle aussi pendant le calcul :
+    - N (entier) : un enregistrement tous les N pas, plus l'état final ;
+    - "24h:mean", "6h:max", "daily:min"... : une valeur par fenêtre de la durée
+      indiquée (moyenne pondérée par la durée des pas, minimum ou maximum des
+      valeurs de fin de pas), datée de la fin de sa fenêtre ("daily" = "24h",
+      règle par défaut : "mean").
+La première valeur reste l'état initial (t = 0). Les résumés sont toujours
+calculés sur tous les pas.
+
+    results = SimulationModel.run_simulation(
+        data, outputs=["MoistureFraction:final", "Temperatures:max", "Temperatures:above:55"])
+    results["Temperatures:above:55"]   # heures au-dessus de 55 °C
+
+    daily = SimulationModel.run_simulation(data, resolution="daily:mean")
+"""
+import numpy as np
+
+from modelvic import OUTPUT_CHANNELS
+
+
+# Résumés disponibles ; "above" et "below" attendent un seuil
+SUMMARIES = ("initial", "final", "min", "max", "mean", "above", "below")
+
+# Règles d'agrégation des séries par fenêtre de temps
+AGGREGATION_RULES = ("mean", "min", "max")
+
+# Durées de fenêtre nommées (heures)
+PERIODS = {"hourly": 1.0, "daily": 24.0, "weekly": 168.0}
+
+# Séries calculées par le noyau uniquement pour la sortie (voir C_GAS_OUTPUTS)
+GAS_CHANNELS = ("VExhaustgases", "RelativeHumidity")
+
+# Nombre de pas par tranche lorsque seuls des résumés sont demandés
+_BLOCK = 4096
+
+
+def parse_output(spec):
+    """
+    Décompose une sortie demandée
+
+    Args:
+        spec: "série", "série:résumé" ou "série:résumé:seuil"
+
+    Returns:
+        (série, résumé ou None, seuil ou None)
+    """
+    parts = str(spec).split(":")
+    channel = parts[0]
+    if channel not in OUTPUT_CHANNELS:
+        raise ValueError(f"Sortie inconnue : {channel} (choix : {', '.join(OUTPUT_CHANNELS)})")
+    if len(parts) == 1:
+        return channel, None, None
+
+    summary = parts[1]
+    if summary not in SUMMARIES:
+        raise ValueError(f"Résumé inconnu : {summary} (choix : {', '.join(SUMMARIES)})")
+    if summary in ("above", "below"):
+        if len(parts) != 3:
+            raise ValueError(f"Le résumé '{summary}' attend un seuil : {channel}:{summary}:<seuil>")
+        return channel, summary, float(parts[2])
+    if len(parts) != 2:
+        raise ValueError(f"Sortie mal formée : {spec}")
+    return channel, summary, None
+
+
+def parse_resolution(resolution):
+    """
+    Décompose une résolution de sortie
+
+    Args:
+        resolution: None, nombre de pas N, ou "durée:règle" ("24h:mean", "daily:max")
+
+    Returns:
+        (pas entre deux enregistrements, durée de fenêtre en heures ou None,
+        règle d'agrégation ou None)
+    """
+    if resolution is None:
+        return 1, None, None
+    if isinstance(resolution, str) and not resolution.strip().isdigit():
+        parts = resolution.split(":")
+        if len(parts) > 2:
+            raise ValueError(f"Résolution mal formée : {resolution}")
+        period = parts[0].strip()
+        rule = parts[1].strip() if len(parts) == 2 else "mean"
+        if rule not in AGGREGATION_RULES:
+            raise ValueError(f"Règle d'agrégation inconnue : {rule} (choix : {', '.join(AGGREGATION_RULES)})")
+        if period in PERIODS:
+            period = PERIODS[period]
+        else:
+            try:
+                period = float(period[:-1] if period.endswith("h") else period)
+            except ValueError:
+                raise ValueError(f"Durée de fenêtre inconnue : {parts[0]} (ex. : 24h, daily)")
+        if period <= 0:
+            raise ValueError("La durée de fenêtre doit être strictement positive")
+        return 1, period, rule
+
+    stride = int(resolution)
+    if stride < 1 or stride != float(resolution):
+        raise ValueError("La résolution doit être un nombre entier de pas positif")
+    return stride, None, None
+
+
+class OutputRecorder:
+    """
+    Cumul des sorties demandées au fil des tranches calculées par le noyau
+    """
+
+    def __init__(self, outputs=OUTPUT_CHANNELS, resolution=None):
+        self.stride, self.period, self.rule = parse_resolution(resolution)
+        self.outputs = [str(spec) for spec in outputs]
+        if not self.outputs:
+            raise ValueError("Aucune sortie demandée")
+        self.specs = [parse_output(spec) for spec in self.outputs]
+        self.indices = {name: k for k, name in enumerate(OUTPUT_CHANNELS)}
+        # Séries complètes demandées, dans l'ordre de la demande
+        self.series = []
+        for channel, summary, _ in self.specs:
+            if summary is None and channel not in self.series:
+                self.series.append(channel)
+        self.reset()
+
+    def reset(self):
+        """Remet les cumuls à zéro (nouvelle simulation)"""
+        self.values = {}
+        self.chunks = {channel: [] for channel in self.series}
+        self.times = []
+        self.duration = 0.0
+        self.started = False
+        # Pas comptés depuis le début, dernier pas calculé et dernier enregistré
+        self.count = 0
+        self.last = None
+        self.last_recorded = None
+        # Pas de la fenêtre d'agrégation en cours (times, durations, values)
+        self.pending = None
+
+    @property
+    def gas_outputs(self):
+        """Vrai si une sortie gaz est demandée (calcul nécessaire dans le noyau)"""
+        return any(channel in GAS_CHANNELS for channel, _, _ in self.specs)
+
+    def update(self, times, values):
+        """
+        Intègre une tranche de résultats
+
+        Args:
+            times: Instants des colonnes de values (heures) ; le premier est la fin
+                   de la tranche précédente (0 pour la première)
+            values: Sorties du noyau (N_OUTPUTS, len(times)), colonne 0 comprise
+                    (voir SimulationSetup.iter_chunks)
+        """
+        times = np.asarray(times)
+        values = np.asarray(values, dtype=float)
+        first = not self.started
+        self.started = True
+        start = 0 if first else 1
+        durations = np.diff(times)
+        self.duration += durations.sum()
+
+        if self.series:
+            rows = values[[self.indices[channel] for channel in self.series]]
+            if first:
+                self._append(times[:1], rows[:, :1])
+            self._record_steps(times[1:], durations, rows[:, 1:])
+
+        for spec, (channel, summary, threshold) in zip(self.outputs, self.specs):
+            if summary is None:
+                continue
+            row = values[self.indices[channel]]
+            steps = row[1:]
+            current = self.values.get(spec)
+            if summary == "initial":
+                value = row[0] if first else current
+            elif summary == "final":
+                value = row[-1]
+            elif summary == "min":
+                value = row[start:].min() if first else min(current, steps.min())
+            elif summary == "max":
+                value = row[start:].max() if first else max(current, steps.max())
+            else:
+                # Cumuls pondérés par la durée des pas (valeur de fin de pas)
+                if summary == "mean":
+                    increment = np.dot(steps, durations)
+                elif summary == "above":
+                    increment = durations[steps > threshold].sum()
+                else:
+                    increment = durations[steps < threshold].sum()
+                value = (current or 0.0) + increment
+            self.values[spec] = float(value)
+
+    def _append(self, times, rows):
+        """Ajoute des enregistrements aux séries complètes"""
+        self.times.append(times)
+        for k, channel in enumerate(self.series):
+            self.chunks[channel].append(rows[k])
+        self.last_recorded = times[-1]
+
+    def _record_steps(self, times, durations, rows):
+        """Enregistre les pas d'une tranche selon la résolution demandée"""
+        n = len(times)
+        if n == 0:
+            return
+        self.last = (times[-1:], rows[:, -1:])
+
+        if self.period is None:
+            if self.stride == 1:
+                self._append(times, rows)
+            else:
+                kept = np.flatnonzero((self.count + np.arange(1, n + 1)) % self.stride == 0)
+                if len(kept):
+                    self._append(times[kept], rows[:, kept])
+            self.count += n
+            return
+
+        if self.pending is not None:
+            times = np.concatenate((self.pending[0], times))
+            durations = np.concatenate((self.pending[1], durations))
+            rows = np.concatenate((self.pending[2], rows), axis=1)
+        # Fenêtre de chaque pas, selon l'instant de sa fin ; la dernière fenêtre
+        # peut se poursuivre dans la tranche suivante
+        windows = np.ceil(times / self.period) - 1
+        complete = np.searchsorted(windows, windows[-1])
+        self.pending = (times[complete:], durations[complete:], rows[:, complete:])
+        if complete > 0:
+            self._aggregate(windows[:complete], times[:complete], durations[:complete], rows[:, :complete])
+
+    def _aggregate(self, windows, times, durations, rows):
+        """Enregistre une valeur par fenêtre complète"""
+        starts = np.append(0, np.flatnonzero(np.diff(windows)) + 1)
+        ends = np.append(starts[1:], len(windows)) - 1
+        if self.rule == "mean":
+            values = np.add.reduceat(rows * durations, starts, axis=1) / np.add.reduceat(durations, starts)
+        elif self.rule == "min":
+            values = np.minimum.reduceat(rows, starts, axis=1)
+        else:
+            values = np.maximum.reduceat(rows, starts, axis=1)
+        self._append(times[ends], values)
+
+    def _flush(self):
+        """Enregistre la dernière fenêtre, ou l'état final s'il n'a pas été retenu"""
+        if self.pending is not None:
+            times, durations, rows = self.pending
+            self.pending = None
+            if len(times):
+                self._aggregate(np.zeros(len(times)), times, durations, rows)
+        elif self.last is not None and self.last[0][-1] != self.last_recorded:
+            self._append(*self.last)
+
+    def results(self, process_volume=None, storage=None, compositions=None):
+        """
+        Dictionnaire des sorties demandées
+
+        Args:
+            process_volume: Volume du procédé (m³)
+            storage: None pour des listes de flottants, ou mode de stockage d'un
+                     SimulationResult (voir results.py)
+            compositions: Composition [C, H, O, N] des substrats (SimulationResult)
+
+        Returns:
+            {'Times': [...]} si une série complète est demandée, une liste par série
+            complète, une valeur par résumé (clé : la sortie demandée), et
+            'process_volume' ; SimulationResult si storage est indiqué
+        """
+        results = {}
+        if self.series:
+            self._flush()
+            results["Times"] = np.concatenate(self.times)
+            for channel in self.series:
+                results[channel] = np.concatenate(self.chunks[channel])
+            if storage is None:
+                for name in results:
+                    results[name] = results[name].tolist()
+        for spec, (channel, summary, _) in zip(self.outputs, self.specs):
+            if summary == "mean":
+                results[spec] = self.values[spec] / self.duration if self.duration > 0 else self.values[spec]
+            elif summary is not None:
+                results[spec] = self.values[spec]
+        results["process_volume"] = process_volume
+        if storage is not None:
+            from results import SimulationResult
+            return SimulationResult.from_dict(results, storage, compositions)
+        return results
+
+    def record(self, setup, backend="auto", storage=None):
+        """
+        Exécute une simulation préparée en ne conservant que les sorties demandées
+
+        Args:
+            setup: SimulationSetup (voir SimulationModel.prepare)
+            backend: Noyau de calcul : "python", "numba" ou "auto"
+            storage: None ou mode de stockage d'un SimulationResult
+
+        Returns:
+            Voir results
+        """
+        self.reset()
+        step = setup.time_step
+        for t0, t1, out_chunk in setup.iter_chunks(backend, _BLOCK):
+            times = np.minimum(np.arange(t0, t1 + 1) * step, setup.HRT)
+            self.update(times, out_chunk)
+        return self.results(setup.process_volume, storage, setup.compositions)
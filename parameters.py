@@ -0,0 +1,185 @@
+"""
+Constantes physiques et empiriques du modèle de bio-séchage.
+
+Les constantes autrefois écrites en dur dans la boucle de run_simulation sont
+regroupées dans un objet immuable et validé. Il peut être passé au moteur,
+balayé (conception du réacteur : isolation, altitude...), calibré ou utilisé
+comme clé de cache.
+"""
+import dataclasses
+from dataclasses import dataclass
+
+
+# Schémas d'intégration du bilan thermique et hydrique
+ENERGY_SOLVERS = ("explicit", "implicit")
+
+# Écart maximal mesuré des segments quasi isothermes au calcul pas à pas, sur
+# 5000 h (cas de démonstration, deux substrats, aération continue), arrondi par
+# excès : (schéma, segment_drift_limit) -> (température °C, humidité points de %,
+# eau kg, matière sèche kg). La température est extrapolée linéairement et
+# l'évaporation figée sur chaque segment : les écarts s'additionnent d'un
+# segment à l'autre et sont amplifiés par les montées en température.
+SEGMENT_ACCURACY = {
+    ("explicit", 0.01): (0.016, 0.011, 0.44, 0.6),
+    ("explicit", 0.1): (0.44, 0.32, 13, 13),
+    ("explicit", 0.5): (3.1, 2.1, 76, 120),
+    ("explicit", 2.0): (8.9, 6.5, 220, 310),
+    ("implicit", 0.01): (0.18, 0.035, 0.97, 2.2),
+    ("implicit", 0.1): (1.3, 0.28, 7.1, 16),
+    ("implicit", 0.5): (1.6, 0.42, 11, 20),
+    ("implicit", 2.0): (5.8, 1.7, 50, 96),
+}
+
+
+@dataclass(frozen=True)
+class ModelParameters:
+    """
+    Jeu de paramètres du modèle (immuable)
+
+    Attributes:
+        insulation_factor: Facteur d'isolation (0-1), 0 = parfaitement isolé
+        heat_loss_coefficient: Coefficient de pertes thermiques du réacteur non isolé (kJ/h/°C)
+        aeration_loss_coefficient: Pertes supplémentaires par m³/h d'air insufflé (kJ/h/°C par m³/h)
+        inertia_factor: Facteur d'inertie thermique (0-1), schéma explicite uniquement
+        cooling_inertia_multiplier: Multiplicateur de l'inertie lors du refroidissement
+                                    (schéma explicite uniquement)
+        moisture_optimum: Humidité optimale pour l'activité biologique (%)
+        moisture_tolerance: Écart d'humidité (%) annulant le facteur d'humidité
+        heat_factor_phases: Table ((fin de phase en fraction de HRT, facteur de chaleur), ...)
+        theta_growth: Coefficient de température de la croissance (1.066)
+        theta_inhibition: Coefficient de température de l'inhibition (1.21)
+        VPO2: Fraction volumique d'O2 dans l'air du tas (%)
+        altitude: Altitude du site (m)
+        substrate_density: Masse volumique du substrat (kg/m³)
+        water_density: Masse volumique de l'eau (kg/m³)
+        energy_solver: Schéma du bilan thermique et hydrique : "explicit" (amorti par
+                       l'inertie, pas horaire) ou "implicit" (Euler implicite,
+                       stable à pas de plusieurs heures, sans inertie empirique)
+        time_step: Pas de temps du noyau (heures), > 1 avec le schéma implicite
+        segment_drift_limit: Dérive extrapolée maximale de température (°C) et
+                             d'humidité (points de %) sur un segment quasi isotherme
+                             calculé en forme fermée. Désactivé par défaut (0 = pas
+                             à pas partout) : limite par segment et non borne de
+                             l'écart au calcul pas à pas (voir SEGMENT_ACCURACY)
+    """
+    insulation_factor: float = 0.6
+    heat_loss_coefficient: float = 15.0
+    aeration_loss_coefficient: float = 0.06
+    inertia_factor: float = 0.85
+    cooling_inertia_multiplier: float = 1.1
+    moisture_optimum: float = 50.0
+    moisture_tolerance: float = 70.0
+    heat_factor_phases: tuple = (
+        (0.1, 0.8),    # Phase mésophile (démarrage)
+        (0.2, 1.5),    # Phase thermophile ascendante
+        (0.35, 1.2),   # Plateau thermophile
+        (0.65, 0.7),   # Refroidissement
+        (0.85, 0.5),   # Maturation
+        (1.0, 0.3),    # Phase terminale
+    )
+    theta_growth: float = 1.066
+    theta_inhibition: float = 1.21
+    VPO2: float = 21.0
+    altitude: float = 0.0
+    substrate_density: float = 1000.0
+    water_density: float = 1000.0
+    energy_solver: str = "explicit"
+    time_step: int = 1
+    segment_drift_limit: float = 0.0
+
+    def __post_init__(self):
+        # Conversion des types (valeurs provenant de l'interface ou d'un fichier)
+        for field in dataclasses.fields(self):
+            if field.name == "heat_factor_phases":
+                phases = tuple((float(bound), float(factor)) for bound, factor in self.heat_factor_phases)
+                object.__setattr__(self, field.name, phases)
+            elif field.name == "energy_solver":
+                object.__setattr__(self, field.name, str(self.energy_solver))
+            elif field.name == "time_step":
+                object.__setattr__(self, field.name, int(float(self.time_step)))
+            else:
+                object.__setattr__(self, field.name, float(getattr(self, field.name)))
+        self.validate()
+
+    def validate(self):
+        """Vérifie la cohérence physique des paramètres (ValueError sinon)"""
+        if not 0 <= self.insulation_factor <= 1:
+            raise ValueError("insulation_factor doit être compris entre 0 et 1")
+        if self.heat_loss_coefficient < 0:
+            raise ValueError("heat_loss_coefficient doit être positif")
+        if self.aeration_loss_coefficient < 0:
+            raise ValueError("aeration_loss_coefficient doit être positif")
+        if not 0 <= self.inertia_factor < 1:
+            raise ValueError("inertia_factor doit être compris entre 0 et 1 (exclu)")
+        if self.cooling_inertia_multiplier <= 0 or self.inertia_factor * self.cooling_inertia_multiplier >= 1:
+            raise ValueError("inertia_factor × cooling_inertia_multiplier doit être compris entre 0 et 1 (exclu)")
+        if not 0 <= self.moisture_optimum <= 100:
+            raise ValueError("moisture_optimum doit être compris entre 0 et 100 %")
+        if self.moisture_tolerance <= 0:
+            raise ValueError("moisture_tolerance doit être strictement positif")
+        if not self.heat_factor_phases:
+            raise ValueError("heat_factor_phases ne peut pas être vide")
+        previous = 0.0
+        for bound, factor in self.heat_factor_phases:
+            if not previous < bound <= 1:
+                raise ValueError("Les bornes de heat_factor_phases doivent être croissantes dans ]0, 1]")
+            if factor < 0:
+                raise ValueError("Les facteurs de heat_factor_phases doivent être positifs")
+            previous = bound
+        if self.theta_growth <= 0 or self.theta_inhibition <= 0:
+            raise ValueError("Les coefficients de température doivent être strictement positifs")
+        if not 0 <= self.VPO2 <= 100:
+            raise ValueError("VPO2 doit être compris entre 0 et 100 %")
+        if not -500 <= self.altitude <= 9000:
+            raise ValueError("altitude doit être comprise entre -500 et 9000 m")
+        if self.substrate_density <= 0 or self.water_density <= 0:
+            raise ValueError("Les masses volumiques doivent être strictement positives")
+        if self.energy_solver not in ENERGY_SOLVERS:
+            raise ValueError("energy_solver doit valoir {}".format(" ou ".join(ENERGY_SOLVERS)))
+        if self.time_step < 1:
+            raise ValueError("time_step doit être un nombre entier d'heures positif")
+        if self.segment_drift_limit < 0:
+            raise ValueError("segment_drift_limit doit être positive")
+        if self.time_step > 1 and self.energy_solver == "explicit":
+            raise ValueError("Le schéma explicite n'est stable qu'au pas horaire (time_step > 1 "
+                             "nécessite energy_solver='implicit')")
+
+    def heat_factor(self, progress):
+        """
+        Facteur de chaleur de la phase de compostage
+
+        Args:
+            progress: Avancement normalisé du procédé (t / HRT, de 0 à 1)
+        """
+        for bound, factor in self.heat_factor_phases:
+            if progress < bound:
+                return factor
+        return self.heat_factor_phases[-1][1]
+
+    def replace(self, **changes):
+        """Copie modifiée (et revalidée) du jeu de paramètres"""
+        return dataclasses.replace(self, **changes)
+
+    def to_dict(self):
+        """Paramètres sous forme de dictionnaire (export, service JSON)"""
+        return dataclasses.asdict(self)
+
+    @classmethod
+    def names(cls):
+        """Noms des paramètres"""
+        return [field.name for field in dataclasses.fields(cls)]
+
+    @classmethod
+    def from_data(cls, data):
+        """
+        Construit le jeu de paramètres à partir d'un dictionnaire d'entrée
+
+        Les clés de data portant le nom d'un paramètre (ex. 'insulation_factor',
+        'altitude') remplacent la valeur par défaut, ce qui permet de balayer ou de
+        calibrer ces constantes avec les outils travaillant sur des dictionnaires.
+        """
+        overrides = {name: data[name] for name in cls.names() if name in data}
+        return cls(**overrides)
+
+
+DEFAULT_PARAMETERS = ModelParameters()
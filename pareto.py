@@ -0,0 +1,203 @@
+"""
+Recherche multi-objectif des paramètres d'aération et d'humidification.
+
+Un ensemble de combinaisons (débit d'air, temps ON/OFF, débit d'eau) est simulé
+en parallèle, puis les résultats sont classés par tri non dominé afin d'extraire
+le front de Pareto : les réglages pour lesquels aucun objectif ne peut être
+amélioré sans en dégrader un autre.
+"""
+import itertools
+
+import numpy as np
+
+from batch import make_variants, run_batch
+from kernel import S_QAIR
+from modelvic import SimulationModel
+
+
+def drying_rate(result, data):
+    """Vitesse moyenne de séchage (kg d'eau retirée par heure)"""
+    hours = result["Times"][-1]
+    if hours <= 0:
+        return 0.0
+    return (result["Moisture"][0] - result["Moisture"][-1]) / hours
+
+
+def aeration_energy(result, data):
+    """
+    Volume d'air total insufflé (m³), proxy de la consommation du ventilateur
+
+    Le débit horaire est celui de la simulation (SimulationModel.prepare : mêmes
+    conversions et valeurs par défaut), indépendamment du pas des résultats.
+    """
+    Qair = SimulationModel.prepare(data).series[S_QAIR]
+    return float(np.sum(Qair))
+
+
+def nh3_emitted(result, data):
+    """Masse cumulée de NH3 émise (kg)"""
+    return result["NH3"][-1]
+
+
+def final_moisture(result, data):
+    """Fraction d'humidité finale (%)"""
+    return result["MoistureFraction"][-1]
+
+
+def solids_degraded(result, data):
+    """Masse de matière sèche dégradée (kg)"""
+    return result["Solids"][0] - result["Solids"][-1]
+
+
+# Objectifs disponibles : nom -> (fonction, sens d'optimisation, libellé)
+OBJECTIVES = {
+    "drying_rate": (drying_rate, "max", "Vitesse de séchage (kg/h)"),
+    "energy": (aeration_energy, "min", "Volume d'air insufflé (m³)"),
+    "nh3": (nh3_emitted, "min", "NH₃ émis (kg)"),
+    "final_moisture": (final_moisture, "min", "Humidité finale (%)"),
+    "degradation": (solids_degraded, "max", "Matière sèche dégradée (kg)"),
+}
+
+
+def non_dominated_sort(F):
+    """
+    Tri non dominé rapide (type NSGA-II)
+
+    Args:
+        F: Array (n, m) des valeurs d'objectifs, tous à minimiser
+
+    Returns:
+        Liste de fronts, chaque front étant un array d'indices ; le premier
+        front est le front de Pareto
+    """
+    F = np.asarray(F, dtype=float)
+    n = len(F)
+    if n == 0:
+        return []
+
+    # Matrice de dominance : dom[i, j] vrai si i domine j
+    less_equal = np.all(F[:, None, :] <= F[None, :, :], axis=2)
+    strictly_less = np.any(F[:, None, :] < F[None, :, :], axis=2)
+    dom = less_equal & strictly_less
+
+    # Nombre de points qui dominent chaque point
+    domination_count = dom.sum(axis=0)
+    remaining = np.ones(n, dtype=bool)
+    fronts = []
+
+    while remaining.any():
+        front = np.where(remaining & (domination_count == 0))[0]
+        fronts.append(front)
+        remaining[front] = False
+        domination_count = domination_count - dom[front].sum(axis=0)
+
+    return fronts
+
+
+def crowding_distance(F):
+    """
+    Distance d'encombrement des points d'un même front (diversité du front)
+
+    Args:
+        F: Array (n, m) des valeurs d'objectifs du front
+
+    Returns:
+        Array (n,) des distances, infinies pour les points extrêmes
+    """
+    F = np.asarray(F, dtype=float)
+    n, m = F.shape
+    distance = np.zeros(n)
+    if n <= 2:
+        distance[:] = np.inf
+        return distance
+
+    for k in range(m):
+        order = np.argsort(F[:, k])
+        span = F[order[-1], k] - F[order[0], k]
+        distance[order[0]] = distance[order[-1]] = np.inf
+        if span > 0:
+            distance[order[1:-1]] += (F[order[2:], k] - F[order[:-2], k]) / span
+
+    return distance
+
+
+def build_candidates(grid):
+    """
+    Produit cartésien des valeurs de paramètres à explorer
+
+    Args:
+        grid: Dictionnaire {nom du paramètre: liste de valeurs}, par exemple
+              {"air_flow": [5, 10, 20], "water_flow": [0, 0.5]}
+
+    Returns:
+        Liste de dictionnaires de paramètres
+    """
+    names = list(grid.keys())
+    candidates = []
+    for values in itertools.product(*(grid[name] for name in names)):
+        candidate = dict(zip(names, values))
+        # Les temps ON/OFF n'ont de sens qu'avec l'alternance activée
+        if "air_on_time" in candidate or "air_off_time" in candidate:
+            candidate.setdefault("air_alternance", True)
+        candidates.append(candidate)
+    return candidates
+
+
+def pareto_search(base_data, grid, objectives=("drying_rate", "energy", "nh3"),
+                  workers=None, executor=None, progress=None, pool=None):
+    """
+    Recherche le front de Pareto des réglages d'aération et d'humidification
+
+    Args:
+        base_data: Dictionnaire de paramètres de référence (format de run_simulation)
+        grid: Dictionnaire {paramètre: valeurs} à explorer (air_flow, air_on_time,
+              air_off_time, water_flow...)
+        objectives: Noms des objectifs à considérer (clés de OBJECTIVES)
+        workers: Nombre de processus pour les simulations
+        executor: Executor existant à réutiliser
+        progress: Fonction optionnelle appelée avec (nombre terminé, total)
+        pool: WorkerPool existant à réutiliser (remplace workers et executor) ; un
+              pool rendu inutilisable par l'arrêt brutal d'un processus est
+              alors remplacé à la recherche suivante
+
+    Returns:
+        Dictionnaire contenant :
+            - "candidates" : liste des réglages simulés
+            - "values" : array (n, m) des objectifs dans leur unité d'origine
+            - "objectives" : noms des objectifs
+            - "fronts" : liste des fronts (indices), le premier étant le front de Pareto
+            - "pareto" : indices du front de Pareto, triés par distance d'encombrement
+    """
+    for name in objectives:
+        if name not in OBJECTIVES:
+            raise ValueError(f"Objectif inconnu : {name}")
+
+    candidates = build_candidates(grid)
+    datas = make_variants(base_data, candidates)
+    if pool is not None:
+        results = pool.run_batch(datas, progress=progress)
+    else:
+        results = run_batch(datas, workers=workers, executor=executor, progress=progress)
+
+    values = np.array([
+        [OBJECTIVES[name][0](result, data) for name in objectives]
+        for result, data in zip(results, datas)
+    ], dtype=float).reshape(len(candidates), len(objectives))
+
+    # Tous les objectifs sont ramenés à une minimisation pour le tri
+    signs = np.array([-1.0 if OBJECTIVES[name][1] == "max" else 1.0 for name in objectives])
+    fronts = non_dominated_sort(values * signs)
+
+    pareto = np.array([], dtype=int)
+    if fronts:
+        pareto = fronts[0]
+        distance = crowding_distance(values[pareto] * signs)
+        pareto = pareto[np.argsort(-distance, kind="stable")]
+
+    return {
+        "candidates": candidates,
+        "values": values,
+        "objectives": list(objectives),
+        "fronts": fronts,
+        "pareto": pareto,
+    }
@@ -0,0 +1,212 @@
+"""
+Simulation d'une plateforme de plusieurs réacteurs (casiers) alimentés en air par
+des soufflantes communes.
+
+Chaque casier garde son propre substrat et son propre programme d'aération (la
+demande). À chaque pas de temps, le débit total disponible est réparti entre les
+casiers par une politique d'allocation interchangeable, puis tous les casiers
+avancent ensemble en un seul pas vectorisé (ensemble.ensemble_step).
+"""
+import numpy as np
+
+from modelvic import SimulationModel, OUTPUT_CHANNELS
+from ensemble import EnsembleState, ensemble_step
+from psychrometrics import dry_air_flow, vapour_flow
+from kernel import S_QAIR, S_TAIR, S_PV, S_P, S_MWAD, S_PHASE, O_T, O_MOIST, O_MFRAC, O_RH, O_SOLIDS
+
+
+def proportional_allocation(demand, capacity, state):
+    """Réduction proportionnelle de toutes les demandes lorsque la capacité est dépassée"""
+    total = demand.sum()
+    if total <= capacity or total <= 0:
+        return demand
+    return demand * (capacity / total)
+
+
+def equal_allocation(demand, capacity, state):
+    """Partage équitable (max-min) : les petites demandes sont servies en entier,
+    le reste de la capacité est partagé à parts égales entre les autres casiers"""
+    if demand.sum() <= capacity:
+        return demand
+    allocated = np.zeros_like(demand)
+    remaining = capacity
+    pending = np.flatnonzero(demand > 0)
+    while len(pending) and remaining > 0:
+        share = remaining / len(pending)
+        served = demand[pending] <= share
+        if not served.any():
+            allocated[pending] = share
+            break
+        allocated[pending[served]] = demand[pending[served]]
+        remaining -= demand[pending[served]].sum()
+        pending = pending[~served]
+    return allocated
+
+
+def temperature_allocation(demand, capacity, state):
+    """Priorité aux casiers les plus chauds (besoin de refroidissement et de séchage) :
+    la capacité est répartie au prorata de demande × (T - 20 °C)"""
+    if demand.sum() <= capacity:
+        return demand
+    weights = demand * np.maximum(state.T - 20.0, 1.0)
+    allocated = np.zeros_like(demand)
+    remaining = capacity
+    pending = demand > 0
+    # Les casiers dont la part dépasse la demande sont plafonnés, le surplus est redistribué
+    while pending.any() and remaining > 1e-12:
+        share = remaining * weights * pending / (weights * pending).sum()
+        capped = pending & (allocated + share >= demand)
+        if not capped.any():
+            allocated += share
+            break
+        remaining -= (demand - allocated)[capped].sum()
+        allocated[capped] = demand[capped]
+        pending &= ~capped
+    return allocated
+
+
+def blower_power(airflow, pressure_drop=2000.0, blower_efficiency=0.6):
+    """
+    Puissance électrique des soufflantes : Q × Δp / η
+
+    Args:
+        airflow: Débit d'air (m³/h, scalaire ou array)
+        pressure_drop: Perte de charge (Pa)
+        blower_efficiency: Rendement global (0-1)
+
+    Returns:
+        Puissance (kW) ; sur un pas d'une heure, égale à l'énergie en kWh
+    """
+    return np.asarray(airflow) / 3600 * pressure_drop / blower_efficiency / 1000
+
+
+# Politiques d'allocation disponibles : fonction(demande, capacité, état) -> débits alloués
+ALLOCATION_POLICIES = {
+    "proportional": proportional_allocation,
+    "equal": equal_allocation,
+    "temperature": temperature_allocation,
+}
+
+
+class PlantModel:
+    """
+    Simulation simultanée de N casiers partageant une capacité de soufflage
+    """
+
+    @staticmethod
+    def run_simulation(datas, blower_capacity, policy="proportional", params=None,
+                       pressure_drop=2000.0, blower_efficiency=0.6):
+        """
+        Exécute la simulation de la plateforme
+
+        Args:
+            datas: Liste de dictionnaires de paramètres, un par casier (format de
+                   SimulationModel.run_simulation, même nombre de substrats) ;
+                   'air_flow' et le cycle ON/OFF de chaque casier définissent sa demande ;
+                   sans params, chaque casier garde ses propres constantes du modèle
+                   (ModelParameters.from_data)
+            blower_capacity: Débit total disponible (m³/h)
+            policy: Nom d'une politique de ALLOCATION_POLICIES ou fonction
+                    (demande, capacité, état) -> débits alloués (arrays (N,))
+            params: Constantes du modèle communes aux casiers (ModelParameters) ;
+                    schéma explicite au pas horaire uniquement (voir ensemble.check_solver)
+            pressure_drop: Perte de charge du réseau d'aération et du tas (Pa)
+            blower_efficiency: Rendement global des soufflantes (0-1)
+
+        Returns:
+            Dictionnaire :
+                'Times': liste des heures
+                'Bays': liste des résultats par casier (mêmes séries que
+                        run_simulation, plus 'AirFlow' (m³/h) et 'Energy' (kWh))
+                'Plant': {'AirFlow', 'Demand', 'Power' (kW) : séries horaires,
+                          'AirVolume' (m³), 'Energy' (kWh)}
+        """
+        if isinstance(policy, str):
+            if policy not in ALLOCATION_POLICIES:
+                raise ValueError("Politique d'allocation inconnue : {} (choix : {})".format(
+                    policy, ", ".join(ALLOCATION_POLICIES)))
+            policy = ALLOCATION_POLICIES[policy]
+        if blower_capacity < 0:
+            raise ValueError("blower_capacity doit être positive")
+        if not 0 < blower_efficiency <= 1:
+            raise ValueError("blower_efficiency doit être compris entre 0 et 1")
+
+        setups = [SimulationModel.prepare(data, params) for data in datas]
+        if not setups:
+            raise ValueError("La plateforme doit comporter au moins un casier")
+        if len({setup.fBVS.shape for setup in setups}) > 1:
+            raise ValueError("Tous les casiers doivent avoir le même nombre de substrats")
+
+        n_bays = len(setups)
+        duration = max(setup.HRT for setup in setups)
+        # Constantes propres à chaque casier (ModelParameters.from_data)
+        consts = np.array([setup.consts for setup in setups])
+        state = EnsembleState.from_setups(setups)
+
+        # Séries des casiers sur la durée commune (un casier vidé ne demande plus d'air)
+        series = np.zeros((n_bays, setups[0].series.shape[0], duration))
+        active = np.zeros((n_bays, duration), dtype=bool)
+        for i, setup in enumerate(setups):
+            series[i, :, :setup.HRT] = setup.series
+            series[i, :, setup.HRT:] = setup.series[:, -1:]
+            active[i, :setup.HRT] = True
+        series[:, S_QAIR] *= active
+
+        # Masses d'air sec et de vapeur par m³ d'air entrant (kg/m³)
+        Tair = series[:, S_TAIR]
+        PV = series[:, S_PV]
+        P = series[:, S_P]
+        dry_air_density = dry_air_flow(1.0, P, PV, Tair)
+        vapour_density = vapour_flow(1.0, PV, Tair)
+
+        out = np.zeros((len(OUTPUT_CHANNELS), n_bays, duration + 1))
+        out[O_T, :, 0] = state.T
+        out[O_MOIST, :, 0] = [setup.H_tot_in for setup in setups]
+        out[O_MFRAC, :, 0] = [setup.FH_tot_in for setup in setups]
+        out[O_RH, :, 0] = 60
+        out[O_SOLIDS, :, 0] = [setup.S_tot_in for setup in setups]
+        airflow = np.zeros((n_bays, duration + 1))
+        demand_total = np.zeros(duration + 1)
+
+        for t in range(duration):
+            demand = series[:, S_QAIR, t]
+            Qair = np.minimum(np.asarray(policy(demand, blower_capacity, state), dtype=float), demand)
+
+            step = ensemble_step(
+                state, consts, Qair, Tair[:, t], PV[:, t], P[:, t],
+                dry_air_density[:, t] * Qair, vapour_density[:, t] * Qair,
+                series[:, S_MWAD, t], series[:, S_PHASE, t],
+            )
+
+            # Un casier vidé garde ses dernières valeurs (step suit l'ordre de OUTPUT_CHANNELS)
+            bays = active[:, t]
+            for k, name in enumerate(("T", "mws", "FH", "mgasout", "Vgases", "RH", "Solids", "NH3")):
+                out[k, :, t + 1] = np.where(bays, step[name], out[k, :, t])
+            airflow[:, t + 1] = Qair
+            demand_total[t + 1] = demand.sum()
+
+        power = blower_power(airflow, pressure_drop, blower_efficiency)
+        times = list(range(duration + 1))
+        bays = []
+        for i, setup in enumerate(setups):
+            result = {"Times": times}
+            for k, name in enumerate(OUTPUT_CHANNELS):
+                result[name] = out[k, i].tolist()
+            result["AirFlow"] = airflow[i].tolist()
+            result["Energy"] = float(power[i].sum())
+            result["process_volume"] = setup.process_volume
+            bays.append(result)
+
+        plant_airflow = airflow.sum(axis=0)
+        plant_power = power.sum(axis=0)
+        return {
+            "Times": times,
+            "Bays": bays,
+            "Plant": {
+                "AirFlow": plant_airflow.tolist(),
+                "Demand": demand_total.tolist(),
+                "Power": plant_power.tolist(),
+                "AirVolume": float(plant_airflow.sum()),
+                "Energy": float(plant_power.sum()),
+            },
+        }
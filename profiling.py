@@ -0,0 +1,165 @@
+"""
+Mesure du temps passé dans chaque étape de la simulation.
+
+L'instrumentation est optionnelle : run_simulation(..., profiler=StageProfiler())
+exécute une copie instrumentée du noyau Python, construite à partir de son code
+source en remplaçant les marqueurs « # stage: <nom> » par des appels au
+profileur. Sans profileur, le noyau habituel est utilisé (aucun surcoût).
+
+    profiler = StageProfiler()
+    SimulationModel.run_simulation(data, profiler=profiler)
+    print(profiler.report())
+    profiler.dump_stats("simulation.prof")   # lisible par pstats / snakeviz
+"""
+import inspect
+import marshal
+import re
+import time
+
+import kernel
+
+
+_STAGE_MARKER = re.compile(r"^(\s*)# stage: (\w+)\s*$")
+
+# Étapes du noyau, chacune marquée une seule fois dans kernel.hourly_kernel
+KERNEL_STAGES = ("biology", "degradation", "mass_balance", "energy_balance", "gas", "history", "segment")
+
+_KERNEL_SIGNATURE = "consts, out):"
+
+_instrumented_kernel = None
+_stage_lines = {}
+
+
+class StageProfiler:
+    """
+    Cumul du temps et du nombre de passages par étape
+
+    Un même profileur peut être réutilisé sur plusieurs simulations : les mesures
+    s'additionnent.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.totals = {}
+        self.counts = {}
+        self._current = None
+        self._start = 0.0
+
+    def enter(self, stage):
+        """Termine l'étape en cours et démarre la suivante"""
+        now = self.clock()
+        current = self._current
+        if current is not None:
+            self.totals[current] = self.totals.get(current, 0.0) + (now - self._start)
+            self.counts[current] = self.counts.get(current, 0) + 1
+        self._current = stage
+        self._start = now
+
+    def stop(self):
+        """Termine l'étape en cours"""
+        self.enter(None)
+
+    def stage(self, name):
+        """Gestionnaire de contexte pour chronométrer un bloc (étapes hors noyau)"""
+        profiler = self
+
+        class _Stage:
+            def __enter__(self):
+                profiler.enter(name)
+
+            def __exit__(self, *exc):
+                profiler.stop()
+
+        return _Stage()
+
+    @property
+    def total(self):
+        """Temps total mesuré (s)"""
+        return sum(self.totals.values())
+
+    def to_dict(self):
+        """Mesures par étape : {étape: {'time', 'calls', 'share'}}"""
+        total = self.total or 1.0
+        return {
+            name: {"time": seconds, "calls": self.counts[name], "share": seconds / total}
+            for name, seconds in sorted(self.totals.items(), key=lambda item: -item[1])
+        }
+
+    def report(self):
+        """Tableau texte des mesures, de l'étape la plus coûteuse à la moins coûteuse"""
+        lines = ["{:<16s} {:>10s} {:>7s} {:>10s} {:>10s}".format("Étape", "Temps (ms)", "%", "Appels", "µs/appel")]
+        for name, measure in self.to_dict().items():
+            lines.append("{:<16s} {:>10.2f} {:>7.1f} {:>10d} {:>10.3f}".format(
+                name, measure["time"] * 1000, measure["share"] * 100, measure["calls"],
+                measure["time"] / measure["calls"] * 1e6))
+        lines.append("{:<16s} {:>10.2f}".format("Total", self.total * 1000))
+        return "\n".join(lines)
+
+    def stats(self):
+        """
+        Mesures au format des statistiques de cProfile (dictionnaire de pstats.Stats)
+
+        Chaque étape est présentée comme une fonction du fichier du noyau, à la
+        ligne de son premier marqueur, appelée par run_simulation.
+        """
+        caller = ("modelvic.py", 0, "run_simulation")
+        filename = inspect.getsourcefile(kernel)
+        stats = {}
+        for name, seconds in self.totals.items():
+            calls = self.counts[name]
+            key = (filename, _stage_lines.get(name, 0), name)
+            stats[key] = (calls, calls, seconds, seconds, {caller: (calls, calls, seconds, seconds)})
+        total = self.total
+        stats[caller] = (1, 1, 0.0, total, {})
+        return stats
+
+    def dump_stats(self, path):
+        """Enregistre les mesures dans un fichier lisible par pstats.Stats(path)"""
+        with open(path, "wb") as f:
+            marshal.dump(self.stats(), f)
+
+
+def instrumented_kernel():
+    """
+    Version instrumentée du noyau Python
+
+    Returns:
+        Fonction de même signature que kernel.hourly_kernel, avec un argument
+        supplémentaire final : le StageProfiler
+
+    Raises:
+        RuntimeError: si les marqueurs du noyau ne correspondent pas à
+                      KERNEL_STAGES ou si le code réécrit ne compile pas
+    """
+    global _instrumented_kernel
+    if _instrumented_kernel is not None:
+        return _instrumented_kernel
+
+    lines, first_line = inspect.getsourcelines(kernel.hourly_kernel)
+    source = []
+    markers = []
+    for offset, line in enumerate(lines):
+        match = _STAGE_MARKER.match(line)
+        if match:
+            indent, name = match.groups()
+            markers.append(name)
+            _stage_lines.setdefault(name, first_line + offset)
+            source.append("{}_profiler.enter({!r})\n".format(indent, name))
+        else:
+            source.append(line)
+    if sorted(markers) != sorted(KERNEL_STAGES):
+        raise RuntimeError("Marqueurs d'étape du noyau inattendus : {} (attendus : {})".format(
+            ", ".join(markers), ", ".join(KERNEL_STAGES)))
+    # Lignes vides en tête : les numéros de ligne restent ceux de kernel.py
+    source = "\n" * (first_line - 1) + "".join(source)
+    if source.count(_KERNEL_SIGNATURE) != 1:
+        raise RuntimeError("Signature du noyau non reconnue : impossible d'ajouter le profileur")
+    source = source.replace(_KERNEL_SIGNATURE, "consts, out, _profiler):", 1)
+
+    namespace = dict(vars(kernel))
+    try:
+        exec(compile(source, inspect.getsourcefile(kernel), "exec"), namespace)
+    except SyntaxError as e:
+        raise RuntimeError("Le noyau instrumenté ne compile pas : {}".format(e)) from e
+    _instrumented_kernel = namespace["hourly_kernel"]
+    return _instrumented_kernel
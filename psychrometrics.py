@@ -0,0 +1,96 @@
+"""
+Psychrométrie de l'air et du procédé (fonctions vectorisées).
+
+Regroupe les corrélations utilisées par le moteur : pression de vapeur
+saturante, chaleur latente de vaporisation, pression atmosphérique selon
+l'altitude, pression de vapeur de l'air humide et débits massiques d'air sec et
+de vapeur. Toutes les fonctions acceptent des scalaires ou des arrays NumPy :
+une seule exponentielle vectorisée remplace les évaluations élément par élément
+(préparation des séries horaires, pas d'ensemble, post-traitements).
+
+Une table d'interpolation de la pression saturante n'apporte rien ici :
+np.exp sur un array est 2 à 3 fois plus rapide qu'une lecture interpolée, et le
+noyau horaire (scalaire, compilé par numba) garde math.exp avec les mêmes
+coefficients.
+"""
+import numpy as np
+
+
+P0 = 101325.0            # Pression atmosphérique au niveau de la mer (Pa)
+R = 8.314                # Constante des gaz parfaits (J/mol/K)
+GRAVITY = 9.81           # Accélération de la pesanteur (m/s²)
+M_AIR = 28.96 / 1000     # Masse molaire de l'air sec (kg/mol)
+M_WATER = 18.015 / 1000  # Masse molaire de l'eau (kg/mol)
+
+# Coefficients de la pression de vapeur saturante du procédé (repris par le noyau)
+PVSO_A = 1.19 * 10
+PVSO_B = 3.99 * 10**3
+PVSO_C = 2.34 * 10**2
+PVSO_SCALE = 10**5
+
+
+def saturation_pressure(T):
+    """
+    Pression de vapeur saturante (Pa)
+
+    Args:
+        T: Température (°C)
+    """
+    return np.exp(PVSO_A - PVSO_B / (PVSO_C + T)) * PVSO_SCALE
+
+
+def latent_heat(T):
+    """
+    Chaleur latente de vaporisation de l'eau (kJ/kg)
+
+    Args:
+        T: Température (°C)
+    """
+    return (1033.7 - 0.5683 * T) * 2.326
+
+
+def barometric_pressure(altitude, T=20.0):
+    """
+    Pression atmosphérique (Pa) selon l'altitude (formule barométrique isotherme)
+
+    Args:
+        altitude: Altitude du site (m)
+        T: Température de l'air (°C)
+    """
+    return P0 * np.exp(-M_AIR * GRAVITY * altitude / (R * (T + 273)))
+
+
+def vapour_pressure(T, relative_humidity):
+    """
+    Pression de vapeur de l'air humide (Pa)
+
+    Args:
+        T: Température de l'air (°C)
+        relative_humidity: Humidité relative (%)
+    """
+    return saturation_pressure(T) * relative_humidity / 100
+
+
+def dry_air_flow(Qair, P, PV, T):
+    """
+    Débit massique d'air sec (kg/h)
+
+    Args:
+        Qair: Débit volumique d'air (m³/h)
+        P: Pression totale (Pa)
+        PV: Pression de vapeur (Pa)
+        T: Température de l'air (°C)
+    """
+    return (M_AIR * (P - PV) * Qair) / (R * (T + 273))
+
+
+def vapour_flow(Qair, PV, T):
+    """
+    Débit massique de vapeur d'eau (kg/h)
+
+    Args:
+        Qair: Débit volumique d'air (m³/h)
+        PV: Pression de vapeur (Pa)
+        T: Température de l'air (°C)
+    """
+    return (M_WATER * PV * Qair) / (R * (T + 273))
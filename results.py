@@ -0,0 +1,362 @@
+"""
+Résultats de simulation stockés dans des arrays NumPy.
+
+Pour les balayages et les archives Monte Carlo, run_simulation(..., storage=...)
+renvoie un SimulationResult au lieu de listes Python de flottants (un objet de
+24 octets et un pointeur de 8 octets par valeur) :
+    - "float64" : séries en double précision (8 octets par valeur) ;
+    - "float32" : séries en simple précision (4 octets, 7 chiffres significatifs) ;
+    - "compact" : float32, et entiers int16 mis à l'échelle pour les séries bornées
+      (MoistureFraction et RelativeHumidity, de 0 à 100 % par pas de 0,0015 %).
+Le calcul reste en double précision ; seule la conservation des séries change.
+
+Les grandeurs dérivées (émissions cumulées de gaz, rapport C/N, bornes des
+phases du compostage) sont calculées au premier accès puis conservées. Une
+fenêtre de temps (result.window(t0, t1) ou result[t0:t1]) partage les séries de
+la simulation, sans copie.
+
+    result = SimulationModel.run_simulation(data, storage="compact")
+    result["MoistureFraction"]     # array float64 décodé
+    result.nbytes                  # mémoire occupée par les séries
+    result.gas_emissions["CO2"]    # calculé une fois, puis mis en cache
+    result[24:168].phases          # phases sur la première semaine
+"""
+import numpy as np
+
+
+# Modes de stockage des séries
+STORAGE_MODES = ("float64", "float32", "compact")
+
+# Bornes des séries stockées en entiers mis à l'échelle (mode "compact")
+BOUNDED_CHANNELS = {
+    "MoistureFraction": (0.0, 100.0),
+    "RelativeHumidity": (0.0, 100.0),
+}
+
+# Codes int16 utilisés : -32767 à 32767
+_INT16_LEVELS = 65534
+
+# Facteurs stœchiométriques approximatifs de la dégradation aérobie (kg / kg de
+# matière organique dégradée, composition typique C₂₇H₃₈O₁₆N)
+GAS_FACTORS = {"CO2": 1.5, "O2": 1.2, "NH3": 0.05}
+
+# Seuil de la phase thermophile (°C)
+THERMOPHILIC_THRESHOLD = 45.0
+
+# Masses atomiques du carbone et de l'azote (g/mol)
+_C_ATOMIC_MASS = 12.011
+_N_ATOMIC_MASS = 14.007
+
+
+def encode(values, storage, bounds=None):
+    """
+    Convertit une série au format de stockage
+
+    Args:
+        values: Valeurs de la série
+        storage: Mode de stockage (STORAGE_MODES)
+        bounds: (min, max) pour un stockage en entiers mis à l'échelle (mode
+                "compact"), None sinon
+
+    Returns:
+        (array stocké, (échelle, décalage) ou None)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if storage == "float64":
+        # Vue : rendre la série stockée non modifiable ne touche pas l'original
+        return values.view(), None
+    if storage == "compact" and bounds is not None:
+        low, high = bounds
+        scale = (high - low) / _INT16_LEVELS
+        offset = (high + low) / 2
+        codes = np.rint((np.clip(values, low, high) - offset) / scale)
+        return codes.astype(np.int16), (scale, offset)
+    return values.astype(np.float32), None
+
+
+def decode(stored, scaling=None):
+    """
+    Valeurs float64 d'une série stockée (voir encode)
+
+    Une série déjà en float64 est renvoyée sans copie.
+    """
+    if scaling is None:
+        if stored.dtype == np.float64:
+            return stored
+        return stored.astype(np.float64)
+    scale, offset = scaling
+    return stored * scale + offset
+
+
+def gas_emissions(solids):
+    """
+    Émissions cumulées de CO2, NH3 et consommation cumulée d'O2 (kg)
+
+    Args:
+        solids: Série de la matière sèche (kg)
+
+    Returns:
+        {'CO2': array, 'O2': array, 'NH3': array}, de même longueur que solids
+    """
+    solids = np.asarray(solids, dtype=np.float64)
+    degraded = np.maximum(solids[:-1] - solids[1:], 0.0)
+    cumulated = np.concatenate(([0.0], np.cumsum(degraded)))
+    return {gas: cumulated * factor for gas, factor in GAS_FACTORS.items()}
+
+
+def cn_ratios(solids, compositions):
+    """
+    Rapport C/N au cours du procédé
+
+    Le carbone des substrats est consommé au rythme de la dégradation de la
+    matière sèche, l'azote environ 30 fois plus lentement.
+
+    Args:
+        solids: Série de la matière sèche (kg)
+        compositions: Composition [C, H, O, N] (atomes) de chaque substrat
+
+    Returns:
+        Array du rapport C/N, de même longueur que solids
+    """
+    solids = np.asarray(solids, dtype=np.float64)
+    initial_c = 0.0
+    initial_n = 0.0
+    for composition in compositions:
+        c_mass = composition[0] * _C_ATOMIC_MASS
+        n_mass = composition[3] * _N_ATOMIC_MASS
+        total_mass = c_mass + n_mass
+        if total_mass > 0:
+            initial_c += solids[0] * c_mass / total_mass
+            initial_n += solids[0] * n_mass / total_mass
+    # Éviter la division par zéro
+    if initial_n == 0:
+        initial_n = 0.001
+
+    if solids[0] > 0:
+        degradation = (solids[0] - solids) / solids[0]
+    else:
+        degradation = np.zeros_like(solids)
+    remaining_c = initial_c * (1 - degradation)
+    remaining_n = initial_n * (1 - 0.03 * degradation)
+    remaining_n[remaining_n <= 0] = 0.001
+    return remaining_c / remaining_n
+
+
+def phase_boundaries(temperatures, threshold=THERMOPHILIC_THRESHOLD):
+    """
+    Indices des bornes des phases du compostage, d'après la courbe de température
+
+    Args:
+        temperatures: Série des températures (°C)
+        threshold: Seuil de la phase thermophile (°C)
+
+    Returns:
+        {'peak', 'thermophilic_start', 'cooling_start', 'maturation_start'} :
+        indice du maximum de température, du premier passage au-dessus du seuil
+        (à défaut, la moitié de la montée), du retour sous le seuil après le
+        maximum (à défaut, le maximum) et du début de la maturation (milieu de
+        la fin du procédé)
+    """
+    temperatures = np.asarray(temperatures, dtype=np.float64)
+    n = len(temperatures)
+    peak = int(np.argmax(temperatures))
+
+    above = np.flatnonzero(temperatures >= threshold)
+    thermophilic_start = int(above[0]) if len(above) else peak // 2
+
+    below = np.flatnonzero(temperatures[peak:] < threshold)
+    cooling_start = peak + int(below[0]) if len(below) else peak
+
+    return {
+        "peak": peak,
+        "thermophilic_start": thermophilic_start,
+        "cooling_start": cooling_start,
+        "maturation_start": (cooling_start + n) // 2,
+    }
+
+
+class SimulationResult:
+    """
+    Séries d'une simulation dans des arrays NumPy, au format de stockage choisi
+
+    L'accès par clé reprend celui du dictionnaire de run_simulation : "Times",
+    le nom d'une série, un résumé (voir outputs.py) ou "process_volume" ; get,
+    keys, items et values sont disponibles. Les séries stockées ne sont pas
+    modifiables.
+    """
+
+    __slots__ = ("storage", "process_volume", "summaries", "times", "channels", "scalings",
+                 "compositions", "_cache", "_memory")
+
+    def __init__(self, times, channels, process_volume=None, storage="float64", summaries=None,
+                 compositions=None):
+        if storage not in STORAGE_MODES:
+            raise ValueError(f"Stockage inconnu : {storage} (choix : {', '.join(STORAGE_MODES)})")
+        self.storage = storage
+        self.process_volume = process_volume
+        self.summaries = dict(summaries or {})
+        self.compositions = compositions
+        self._cache = {}
+        # Poignée du bloc de mémoire partagée des séries (voir shared_results.py)
+        self._memory = None
+        self.times, _ = encode(times, storage)
+        self.times.flags.writeable = False
+        self.channels = {}
+        self.scalings = {}
+        for name, values in channels.items():
+            self.channels[name], self.scalings[name] = encode(values, storage, BOUNDED_CHANNELS.get(name))
+            self.channels[name].flags.writeable = False
+
+    @classmethod
+    def from_dict(cls, results, storage="float64", compositions=None):
+        """
+        Construit un SimulationResult à partir d'un dictionnaire de run_simulation
+
+        Args:
+            results: Dictionnaire de résultats ("Times", séries, résumés,
+                     "process_volume")
+            storage: Mode de stockage (STORAGE_MODES)
+            compositions: Composition [C, H, O, N] des substrats (rapport C/N)
+        """
+        times = results.get("Times", [])
+        channels = {}
+        summaries = {}
+        for name, value in results.items():
+            if name in ("Times", "process_volume"):
+                continue
+            if np.ndim(value) == 0:
+                summaries[name] = value
+            else:
+                channels[name] = value
+        return cls(times, channels, results.get("process_volume"), storage, summaries, compositions)
+
+    def channel(self, name):
+        """Série décodée en float64"""
+        return decode(self.channels[name], self.scalings[name])
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if key.step is not None:
+                raise ValueError("Une fenêtre de temps ne prend pas de pas : result[t0:t1]")
+            return self.window(key.start, key.stop)
+        if key == "Times":
+            return decode(self.times)
+        if key == "process_volume":
+            return self.process_volume
+        if key in self.channels:
+            return self.channel(key)
+        return self.summaries[key]
+
+    def __contains__(self, key):
+        return key in ("Times", "process_volume") or key in self.channels or key in self.summaries
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def keys(self):
+        """Clés dans l'ordre du dictionnaire de run_simulation"""
+        return ["Times"] + list(self.channels) + list(self.summaries) + ["process_volume"]
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def window(self, start=None, end=None):
+        """
+        Vue sur les instants compris entre start et end (bornes incluses)
+
+        Les séries de la vue partagent la mémoire de la simulation ; les résumés,
+        calculés sur toute la durée, ne sont pas repris.
+
+        Args:
+            start, end: Bornes de la fenêtre (heures), None pour le début ou la fin
+        """
+        first = 0 if start is None else int(np.searchsorted(self.times, start, side="left"))
+        last = len(self.times) if end is None else int(np.searchsorted(self.times, end, side="right"))
+        view = SimulationResult.__new__(SimulationResult)
+        view.storage = self.storage
+        view.process_volume = self.process_volume
+        view.summaries = {}
+        view.compositions = self.compositions
+        view._cache = {}
+        view._memory = None
+        view.times = self.times[first:last]
+        view.channels = {name: values[first:last] for name, values in self.channels.items()}
+        view.scalings = self.scalings
+        return view
+
+    def _cached(self, name, compute):
+        """Valeur d'une grandeur dérivée, calculée au premier accès"""
+        if name not in self._cache:
+            self._cache[name] = compute()
+        return self._cache[name]
+
+    @property
+    def gas_emissions(self):
+        """Émissions cumulées {'CO2', 'O2', 'NH3'} (kg, voir gas_emissions)"""
+        return self._cached("gas_emissions", lambda: gas_emissions(self.channel("Solids")))
+
+    @property
+    def cn_ratio(self):
+        """Rapport C/N au cours du procédé (None sans composition des substrats)"""
+        if not self.compositions:
+            return None
+        return self._cached("cn_ratio", lambda: cn_ratios(self.channel("Solids"), self.compositions))
+
+    @property
+    def phases(self):
+        """Indices des bornes des phases du compostage (voir phase_boundaries)"""
+        return self._cached("phases", lambda: phase_boundaries(self.channel("Temperatures")))
+
+    @property
+    def nbytes(self):
+        """Mémoire occupée par les instants et les séries (octets)"""
+        return self.times.nbytes + sum(values.nbytes for values in self.channels.values())
+
+    def to_dict(self):
+        """Dictionnaire au format de run_simulation (listes de flottants)"""
+        results = {"Times": self["Times"].tolist()}
+        for name in self.channels:
+            results[name] = self.channel(name).tolist()
+        results.update(self.summaries)
+        results["process_volume"] = self.process_volume
+        return results
+
+    @property
+    def shared(self):
+        """Vrai si les séries sont des vues sur un bloc de mémoire partagée"""
+        return self._memory is not None
+
+    def release(self):
+        """
+        Libère le bloc de mémoire partagée des séries (sans effet sinon)
+
+        Les séries du résultat sont vidées ; les vues encore détenues ailleurs
+        (fenêtres, tracés) gardent la mémoire projetée jusqu'à leur destruction.
+        """
+        if self._memory is None:
+            return
+        handle = self._memory
+        self._memory = None
+        self.times = np.empty(0, dtype=self.times.dtype)
+        self.channels = {}
+        self._cache = {}
+        handle.release()
+
+    def __getstate__(self):
+        # Les séries partagées sont copiées dans l'état sérialisé
+        return {name: getattr(self, name) for name in self.__slots__ if name not in ("_cache", "_memory")}
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._cache = {}
+        self._memory = None
@@ -0,0 +1,441 @@
+"""
+Service HTTP/JSON local d'exécution des simulations.
+
+Un seul processus garde le modèle chargé et un pool de processus de calcul
+démarré ; les tableaux de bord et scripts de la même machine lui envoient leurs
+dictionnaires de paramètres au lieu d'importer et d'exécuter le modèle eux-mêmes.
+
+    python service.py --port 8765 --workers 4
+
+Points d'accès :
+    GET  /health            état du service (pool, file d'attente, cache)
+    POST /simulate          corps : dictionnaire data ; réponse : résultats JSON
+    POST /simulate?stream=1 réponse en flux NDJSON publiée pendant le calcul, une
+                            tranche de chunk pas par ligne (&chunk=K, défaut 24)
+    POST /batch             corps : liste de dictionnaires (ou {"datas": [...]}) ;
+                            réponse en flux NDJSON, une ligne par simulation terminée
+
+Les requêtes identiques (même empreinte des entrées) sont regroupées : une
+simulation déjà en cours est partagée, une simulation récente est servie depuis
+le cache. La file d'attente est bornée : au-delà, le service répond 503 ; un lot
+plus grand que la place libre attend qu'elle se libère en publiant les résultats
+déjà reçus. Une entrée invalide est signalée par 400, une défaillance du service
+(processus de calcul arrêté...) par 500 ; un pool défaillant est remplacé.
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from queue import Empty
+from urllib.parse import urlparse, parse_qs
+
+import numpy as np
+
+from batch import WorkerPool, _run_one
+from modelvic import SimulationModel, OUTPUT_CHANNELS
+
+
+class QueueFullError(RuntimeError):
+    """La file d'attente du service est pleine"""
+
+
+# Erreurs dues aux entrées d'une simulation (réponse 400 ; les autres donnent 500)
+INPUT_ERRORS = (ValueError, TypeError, KeyError, IndexError)
+
+
+def error_status(error):
+    """Code HTTP correspondant à l'échec d'une simulation"""
+    if isinstance(error, QueueFullError):
+        return 503
+    if isinstance(error, INPUT_ERRORS):
+        return 400
+    return 500
+
+
+def _stream_one(data, chunk_size, queue, cancelled):
+    """
+    Exécute une simulation par tranches dans un processus du pool, chaque tranche
+    étant publiée dans queue dès qu'elle est calculée
+
+    Returns:
+        False si le calcul a été interrompu (cancelled), True sinon
+    """
+    for chunk in SimulationModel.iter_simulation(data, chunk_size=chunk_size):
+        if cancelled.is_set():
+            return False
+        queue.put(chunk)
+    return True
+
+
+def _json_default(value):
+    """Conversion des types NumPy pour json.dumps"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError("Type non sérialisable : {}".format(type(value).__name__))
+
+
+def input_key(data):
+    """
+    Empreinte des entrées d'une simulation (clé de cache et de regroupement)
+
+    Args:
+        data: Dictionnaire de paramètres
+
+    Returns:
+        Empreinte SHA-256 (hexadécimale) du JSON canonique de data
+    """
+    canonical = json.dumps(data, sort_keys=True, separators=(",", ":"), default=_json_default)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class SimulationService:
+    """
+    Pool de calcul avec file d'attente bornée, regroupement des requêtes
+    identiques et cache des résultats récents
+    """
+
+    def __init__(self, workers=None, max_queue=64, cache_size=256, pool=None):
+        """
+        Args:
+            workers: Nombre de processus de calcul (défaut : nombre de coeurs)
+            max_queue: Nombre maximal de simulations distinctes en attente ou en cours
+            cache_size: Nombre de résultats conservés en cache (0 = pas de cache)
+            pool: WorkerPool existant à utiliser (non arrêté par shutdown)
+        """
+        if max_queue < 1:
+            raise ValueError("max_queue doit être un entier positif")
+        self._own_pool = pool is None
+        self.pool = pool or WorkerPool(workers)
+        self.workers = self.pool.workers
+        self.max_queue = max_queue
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        # Signalé à chaque place libérée dans la file
+        self._capacity = threading.Condition(self._lock)
+        self._inflight = {}
+        self._streams = 0
+        self._manager = None
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.coalesced = 0
+        self.runs = 0
+
+    def _queued(self):
+        """Nombre de simulations distinctes en attente ou en cours (verrou tenu)"""
+        return len(self._inflight) + self._streams
+
+    def submit(self, data, wait=False):
+        """
+        Soumet une simulation
+
+        Args:
+            data: Dictionnaire de paramètres (format de run_simulation)
+            wait: Attendre qu'une place se libère lorsque la file est pleine
+
+        Returns:
+            Future dont le résultat est le dictionnaire de résultats
+
+        Raises:
+            QueueFullError: Trop de simulations en attente (sans wait)
+        """
+        key = input_key(data)
+        with self._lock:
+            while True:
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    future = Future()
+                    future.set_result(self._cache[key])
+                    return future
+                if key in self._inflight:
+                    self.coalesced += 1
+                    return self._inflight[key]
+                if self._queued() < self.max_queue:
+                    break
+                if not wait:
+                    raise QueueFullError("File d'attente pleine ({} simulations)".format(self.max_queue))
+                self._capacity.wait()
+            future = self.pool.submit(_run_one, data)
+            self._inflight[key] = future
+            self.runs += 1
+        future.add_done_callback(lambda done, key=key: self._finish(key, done))
+        return future
+
+    def _finish(self, key, future):
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._capacity.notify_all()
+            if self.cache_size > 0 and not future.cancelled() and future.exception() is None:
+                self._cache[key] = future.result()
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+    def stream(self, data, chunk_size=24):
+        """
+        Exécute une simulation en publiant ses résultats pendant le calcul
+
+        Le calcul se fait dans un processus du pool ; ses tranches parviennent par
+        une file partagée. Fermer le générateur interrompt le calcul à la fin de
+        la tranche en cours. Un résultat en cache est publié en une seule tranche.
+
+        Args:
+            data: Dictionnaire de paramètres (format de run_simulation)
+            chunk_size: Nombre de pas par tranche
+
+        Yields:
+            Tranches {'Times': [...], 'Temperatures': [...], ...} (voir
+            SimulationSetup.iter_results)
+
+        Raises:
+            QueueFullError: Trop de simulations en attente
+        """
+        key = input_key(data)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+            elif self._queued() >= self.max_queue:
+                raise QueueFullError("File d'attente pleine ({} simulations)".format(self.max_queue))
+            else:
+                self._streams += 1
+                self.runs += 1
+                if self._manager is None:
+                    from multiprocessing import Manager
+                    self._manager = Manager()
+                queue = self._manager.Queue()
+                cancelled = self._manager.Event()
+        if cached is not None:
+            yield {name: cached[name] for name in ("Times",) + OUTPUT_CHANNELS}
+            return
+
+        try:
+            future = self.pool.submit(_stream_one, data, chunk_size, queue, cancelled)
+            while True:
+                try:
+                    yield queue.get(timeout=0.1)
+                except Empty:
+                    if future.done():
+                        break
+            # Le calcul est terminé : tranches restantes, puis son éventuelle erreur
+            while True:
+                try:
+                    yield queue.get_nowait()
+                except Empty:
+                    break
+            future.result()
+        finally:
+            cancelled.set()
+            with self._lock:
+                self._streams -= 1
+                self._capacity.notify_all()
+
+    def run(self, data):
+        """Exécute une simulation et attend son résultat"""
+        return self.submit(data).result()
+
+    def stats(self):
+        """État du service"""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queued": self._queued(),
+                "max_queue": self.max_queue,
+                "cached": len(self._cache),
+                "cache_size": self.cache_size,
+                "runs": self.runs,
+                "cache_hits": self.hits,
+                "coalesced": self.coalesced,
+            }
+
+    def shutdown(self):
+        """Arrête le pool de calcul"""
+        if self._own_pool:
+            self.pool.shutdown(wait=False)
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+
+def make_handler(service):
+    """Classe de gestionnaire HTTP liée à un SimulationService"""
+
+    class SimulationRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload, default=_json_default).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _start_stream(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+        def _send_line(self, payload):
+            line = (json.dumps(payload, default=_json_default) + "\n").encode("utf-8")
+            self.wfile.write(b"%X\r\n%s\r\n" % (len(line), line))
+            self.wfile.flush()
+
+        def _end_stream(self):
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+
+        def _read_json(self):
+            length = int(self.headers.get("Content-Length", 0))
+            return json.loads(self.rfile.read(length) or b"null")
+
+        def do_GET(self):
+            if urlparse(self.path).path == "/health":
+                self._send_json(200, dict(service.stats(), status="ok"))
+            else:
+                self._send_json(404, {"error": "Ressource inconnue"})
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            try:
+                payload = self._read_json()
+            except ValueError as e:
+                self._send_json(400, {"error": "JSON invalide : {}".format(e)})
+                return
+
+            try:
+                if url.path == "/simulate":
+                    if not isinstance(payload, dict):
+                        raise ValueError("Le corps doit être un dictionnaire de paramètres")
+                    query = parse_qs(url.query)
+                    stream = query.get("stream", ["0"])[0] not in ("0", "false", "")
+                    chunk_size = int(query.get("chunk", ["24"])[0])
+                    if chunk_size < 1:
+                        raise ValueError("chunk doit être un entier positif")
+                    if stream:
+                        self._stream(payload, chunk_size)
+                    else:
+                        self._simulate(payload)
+                elif url.path == "/batch":
+                    datas = payload.get("datas") if isinstance(payload, dict) else payload
+                    if not isinstance(datas, list):
+                        raise ValueError("Le corps doit être une liste de dictionnaires de paramètres")
+                    self._batch(datas)
+                else:
+                    self._send_json(404, {"error": "Ressource inconnue"})
+            except QueueFullError as e:
+                self._send_json(503, {"error": str(e)})
+            except (ValueError, TypeError, KeyError) as e:
+                self._send_json(400, {"error": str(e)})
+
+        def _simulate(self, data):
+            future = service.submit(data)
+            try:
+                results = future.result()
+            except Exception as e:
+                self._send_json(error_status(e), {"error": str(e)})
+                return
+            self._send_json(200, results)
+
+        def _stream(self, data, chunk_size):
+            # La réponse ne commence qu'avec la première tranche : une entrée
+            # invalide ou une file pleine reçoit encore son code d'erreur
+            chunks = service.stream(data, chunk_size)
+            try:
+                first = next(chunks)
+            except Exception as e:
+                self._send_json(error_status(e), {"error": str(e)})
+                return
+            self._start_stream()
+            try:
+                self._send_line(first)
+                for chunk in chunks:
+                    self._send_line(chunk)
+            except (BrokenPipeError, ConnectionResetError):
+                # Client parti : arrêt du calcul
+                chunks.close()
+                return
+            except Exception as e:
+                self._send_line({"error": str(e), "status": error_status(e)})
+            self._end_stream()
+
+        def _batch_lines(self, future, indices):
+            try:
+                result = future.result()
+                return [{"index": i, "result": result} for i in indices]
+            except Exception as e:
+                return [{"index": i, "error": str(e), "status": error_status(e)} for i in indices]
+
+        def _batch(self, datas):
+            # Des entrées identiques partagent le même Future : une ligne par indice.
+            # Lorsque la file est pleine, les résultats reçus sont publiés en
+            # attendant qu'elle se libère, si bien qu'un lot de toute taille aboutit.
+            futures = {}
+            pending = set()
+            self._start_stream()
+            i = 0
+            while i < len(datas) or pending:
+                while i < len(datas):
+                    try:
+                        future = service.submit(datas[i], wait=not pending)
+                    except QueueFullError:
+                        break
+                    if future in futures and future not in pending:
+                        # Doublon d'une simulation déjà publiée
+                        for line in self._batch_lines(future, [i]):
+                            self._send_line(line)
+                    else:
+                        futures.setdefault(future, []).append(i)
+                        pending.add(future)
+                    i += 1
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    for line in self._batch_lines(future, futures[future]):
+                        self._send_line(line)
+            self._end_stream()
+
+    return SimulationRequestHandler
+
+
+def serve(host="127.0.0.1", port=8765, workers=None, max_queue=64, cache_size=256):
+    """
+    Démarre le service (bloquant jusqu'à Ctrl+C)
+
+    Args:
+        host: Adresse d'écoute (locale par défaut)
+        port: Port d'écoute
+        workers: Nombre de processus de calcul
+        max_queue: Taille maximale de la file d'attente
+        cache_size: Nombre de résultats conservés en cache
+    """
+    service = SimulationService(workers, max_queue, cache_size)
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    print("Service de simulation sur http://{}:{} ({} processus)".format(host, port, service.workers))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Service HTTP local de simulation du bio-séchage")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-queue", type=int, default=64)
+    parser.add_argument("--cache-size", type=int, default=256)
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.max_queue, args.cache_size)
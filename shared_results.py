@@ -0,0 +1,197 @@
+"""
+Transfert des résultats des processus de calcul par mémoire partagée.
+
+Un SimulationResult calculé dans un processus du pool est recopié une seule fois
+dans un bloc de mémoire partagée (multiprocessing.shared_memory) ; le processus
+principal ne reçoit qu'une poignée de quelques centaines d'octets
+(SharedResultHandle) au lieu des séries sérialisées. attach() projette le bloc
+(/dev/shm/<nom>) avec np.memmap et reconstruit un SimulationResult dont les
+séries sont des vues sur cette projection, sans copie.
+
+Le processus principal devient propriétaire du bloc : result.release() (appelé
+par l'interface lorsqu'une simulation est effacée) le libère. Sous Windows, où
+un bloc disparaît avec le dernier processus qui l'a ouvert, et sur les systèmes
+sans /dev/shm, un fichier temporaire projeté en mémoire remplace le bloc partagé.
+
+    handle = share_result(result)      # processus de calcul
+    result = handle.attach()           # processus principal
+    result.release()                   # libération du bloc
+"""
+import atexit
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from results import SimulationResult
+
+
+# Répertoire des blocs partagés POSIX
+_SHM_DIRECTORY = "/dev/shm"
+
+# Fichiers projetés en mémoire plutôt que blocs partagés (Windows, systèmes sans /dev/shm)
+USE_FILES = os.name == "nt" or not os.path.isdir(_SHM_DIRECTORY)
+
+# Alignement des séries dans le bloc (octets)
+_ALIGNMENT = 8
+
+# Fichiers encore projetés lors de leur libération (Windows), supprimés à la sortie
+_pending_files = []
+
+
+def _create_block(size):
+    """
+    Crée un bloc partagé non suivi par le processus qui l'a créé
+
+    Sans cela, le resource_tracker détruirait le bloc à la fin du processus de
+    calcul, avant que le processus principal ne l'ait lu. Python 3.13 permet de
+    ne pas l'enregistrer (track=False) ; auparavant, il est retiré du suivi sous
+    son nom POSIX ("/" + nom, les blocs partagés n'étant utilisés que sous POSIX).
+    """
+    from multiprocessing import shared_memory
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(create=True, size=size, track=False)
+    memory = shared_memory.SharedMemory(create=True, size=size)
+    from multiprocessing import resource_tracker
+    resource_tracker.unregister("/" + memory.name, "shared_memory")
+    return memory
+
+
+def _remove_file(path):
+    """Supprime un fichier de résultats, ou le reporte à la sortie s'il est encore projeté"""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError:
+        if not _pending_files:
+            atexit.register(_remove_pending_files)
+        _pending_files.append(path)
+
+
+def _remove_pending_files():
+    for path in _pending_files:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+class SharedResultHandle:
+    """
+    Poignée sérialisable vers un SimulationResult placé en mémoire partagée
+
+    Contient le nom du bloc (ou le chemin du fichier), la position de chaque
+    série et les métadonnées du résultat (stockage, résumés, volume du procédé,
+    composition des substrats).
+    """
+
+    def __init__(self, name, kind, layout, scalings, storage, process_volume, summaries, compositions):
+        self.name = name
+        self.kind = kind
+        self.layout = layout
+        self.scalings = scalings
+        self.storage = storage
+        self.process_volume = process_volume
+        self.summaries = summaries
+        self.compositions = compositions
+
+    def attach(self):
+        """
+        SimulationResult dont les séries sont des vues sur le bloc partagé
+
+        Le résultat est propriétaire du bloc : release() le libère. Seules les
+        vues NumPy retiennent la projection : elle reste lisible tant qu'une vue
+        existe (fenêtre, courbe tracée), même après release(), et disparaît avec
+        la dernière.
+        """
+        if self.kind == "file":
+            path = self.name
+        else:
+            path = os.path.join(_SHM_DIRECTORY, self.name)
+        buffer = np.memmap(path, dtype=np.uint8, mode="r")
+
+        arrays = {}
+        for key, dtype, offset, length in self.layout:
+            array = buffer[offset:offset + np.dtype(dtype).itemsize * length].view(dtype)
+            array.flags.writeable = False
+            arrays[key] = array
+        del buffer
+
+        result = SimulationResult.__new__(SimulationResult)
+        result.storage = self.storage
+        result.process_volume = self.process_volume
+        result.summaries = dict(self.summaries)
+        result.compositions = self.compositions
+        result._cache = {}
+        result.times = arrays.pop("Times")
+        result.channels = arrays
+        result.scalings = dict(self.scalings)
+        result._memory = self
+        return result
+
+    def release(self):
+        """Libère le bloc (appelé par SimulationResult.release, ou pour un résultat abandonné)"""
+        if self.kind == "file":
+            _remove_file(self.name)
+            return
+        from multiprocessing import shared_memory
+        try:
+            memory = shared_memory.SharedMemory(name=self.name)
+        except FileNotFoundError:
+            return
+        memory.close()
+        memory.unlink()
+
+
+def share_result(result, use_files=None):
+    """
+    Recopie un résultat dans un bloc de mémoire partagée
+
+    Args:
+        result: SimulationResult, ou dictionnaire de run_simulation (converti en
+                SimulationResult float64)
+        use_files: True pour un fichier projeté en mémoire, False pour un bloc
+                   partagé, None pour le choix par défaut (USE_FILES)
+
+    Returns:
+        SharedResultHandle à transmettre au processus principal
+    """
+    if not isinstance(result, SimulationResult):
+        result = SimulationResult.from_dict(result)
+    if use_files is None:
+        use_files = USE_FILES
+
+    arrays = {"Times": result.times}
+    arrays.update(result.channels)
+    layout = []
+    size = 0
+    for key, array in arrays.items():
+        layout.append((key, array.dtype.str, size, len(array)))
+        size += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+    size = max(size, 1)
+
+    if use_files:
+        descriptor, name = tempfile.mkstemp(prefix="biosim_", suffix=".bin")
+        os.close(descriptor)
+        memory = np.memmap(name, dtype=np.uint8, mode="w+", shape=(size,))
+        buffer = memory
+    else:
+        memory = _create_block(size)
+        name = memory.name
+        buffer = memory.buf
+
+    for key, dtype, offset, length in layout:
+        np.frombuffer(buffer, dtype=dtype, count=length, offset=offset)[:] = arrays[key]
+
+    if use_files:
+        memory.flush()
+        del memory, buffer
+    else:
+        del buffer
+        memory.close()
+
+    return SharedResultHandle(name, "file" if use_files else "shm", layout, dict(result.scalings),
+                              result.storage, result.process_volume, dict(result.summaries),
+                              result.compositions)
@@ -0,0 +1,25 @@
+"""
+Configuration des tests : les modules du modèle sont à la racine du dépôt.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+# Cas de démonstration : deux substrats, aération continue
+DEMO_DATA = {
+    "NS": 2,
+    "CCS": [[53.19/12, 7.48/1, 35.46/16, 3.88/14], [40.0/12, 6.0/1, 40.0/16, 1.0/14]],
+    "FR": [5000, 2000], "FS": [40, 80], "FVS": [90, 80], "FBVS": [80, 60], "FfBVS": [70, 50],
+    "fKT20": [0.05, 0.03], "sKT20": [0.005, 0.003], "Cp": [0.9, 1.34], "T": [20, 20],
+    "HRT": 1080, "air_flow": 15.0,
+}
+
+
+@pytest.fixture
+def demo_data():
+    """Copie du cas de démonstration"""
+    return dict(DEMO_DATA)
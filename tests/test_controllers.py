@@ -0,0 +1,25 @@
+"""
+Régulation de l'aération en boucle fermée.
+"""
+import numpy as np
+
+from controllers import AIR_OXYGEN, OxygenController, PIDController, run_controlled
+
+
+def test_batches_keep_their_own_constants(demo_data):
+    """Un lot simulé avec d'autres lots donne le même résultat que seul"""
+    tuned = dict(demo_data, theta_growth=1.08, moisture_optimum=50, inertia_factor=0.7)
+    controller = PIDController(setpoint=60.0)
+    together = run_controlled([demo_data, tuned], controller)
+    alone = run_controlled([tuned], controller)
+    for channel in ("Temperatures", "MoistureFraction", "AirFlow", "VPO2"):
+        np.testing.assert_allclose(together[channel][1], alone[channel][0], rtol=1e-12, err_msg=channel)
+
+
+def test_oxygen_controller_settles(demo_data):
+    """Avec ses gains par défaut, la régulation d'O2 se stabilise autour de la consigne"""
+    results = run_controlled(demo_data, OxygenController(setpoint=15.0))
+    oxygen = results["VPO2"][0]
+    assert np.all((oxygen >= 0) & (oxygen <= AIR_OXYGEN))
+    np.testing.assert_allclose(oxygen[600:], 15.0, atol=0.5)
+    assert np.max(np.abs(np.diff(results["AirFlow"][0, 600:]))) < 0.5
@@ -0,0 +1,36 @@
+"""
+Noyau horaire : équivalence des versions Python et compilée (numba), précision
+des segments quasi isothermes.
+"""
+import numpy as np
+import pytest
+
+from kernel import check_backends
+from modelvic import SimulationModel
+from parameters import ModelParameters, SEGMENT_ACCURACY
+
+
+@pytest.mark.parametrize("variant", [
+    {},
+    {"air_alternance": True, "air_on_time": 2, "air_off_time": 1, "water_flow": 0.2},
+    {"energy_solver": "implicit", "time_step": 6},
+    {"segment_drift_limit": 0.5},
+])
+def test_backends_match(demo_data, variant):
+    """Le noyau compilé reproduit le noyau Python sur toutes les séries"""
+    pytest.importorskip("numba")
+    deviations = check_backends(dict(demo_data, **variant), rtol=1e-9)
+    assert max(deviations.values()) <= 1e-9
+
+
+@pytest.mark.parametrize("solver, limit", sorted(SEGMENT_ACCURACY))
+def test_segment_accuracy_table(demo_data, solver, limit):
+    """Les écarts des segments quasi isothermes restent ceux documentés"""
+    data = dict(demo_data, HRT=5000)
+    reference = SimulationModel.run_simulation(data, params=ModelParameters(energy_solver=solver))
+    results = SimulationModel.run_simulation(
+        data, params=ModelParameters(energy_solver=solver, segment_drift_limit=limit))
+    for channel, documented in zip(("Temperatures", "MoistureFraction", "Moisture", "Solids"),
+                                   SEGMENT_ACCURACY[solver, limit]):
+        deviation = np.max(np.abs(np.asarray(results[channel]) - reference[channel]))
+        assert deviation <= 1.05 * documented, channel
@@ -0,0 +1,24 @@
+"""
+Modèle multicouche : une seule couche redonne le modèle homogène.
+"""
+import numpy as np
+
+from layered import LayeredPileModel
+from modelvic import OUTPUT_CHANNELS, SimulationModel
+
+
+def test_single_layer_matches_lumped_model(demo_data):
+    """Avec une couche, les séries globales sont celles de SimulationModel"""
+    data = dict(demo_data, water_flow=0.3)
+    lumped = SimulationModel.run_simulation(data)
+    layered = LayeredPileModel.run_simulation(data, n_layers=1)
+    np.testing.assert_allclose(layered["Times"], lumped["Times"])
+    for channel in OUTPUT_CHANNELS:
+        np.testing.assert_allclose(layered[channel], lumped[channel], rtol=1e-10, atol=1e-9,
+                                   err_msg=channel)
+
+
+def test_single_layer_exhaust_is_pile_temperature(demo_data):
+    """L'air sort à la température de l'unique couche, à chaque pas"""
+    layered = LayeredPileModel.run_simulation(demo_data, n_layers=1)
+    np.testing.assert_allclose(layered["ExhaustTemperature"][1:], layered["Temperatures"][1:])
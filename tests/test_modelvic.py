@@ -0,0 +1,33 @@
+"""
+Non-régression de run_simulation par rapport à la boucle horaire d'origine.
+
+tests/data/baseline_hourly.json contient, pour deux cas (aération continue ;
+aération alternée avec ajout d'eau), les séries de la boucle horaire initiale de
+run_simulation, échantillonnées toutes les 12 heures sur 360 heures.
+"""
+import json
+import os
+
+import numpy as np
+import pytest
+
+from modelvic import SimulationModel
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "data", "baseline_hourly.json")
+
+with open(BASELINE_PATH, encoding="utf-8") as f:
+    BASELINE = json.load(f)
+
+# Pas d'échantillonnage des séries de référence (heures)
+SAMPLE_STEP = 12
+
+
+@pytest.mark.parametrize("backend", ["python", "auto"])
+@pytest.mark.parametrize("case", sorted(BASELINE))
+def test_run_simulation_matches_hourly_loop(case, backend):
+    """Le noyau horaire reproduit la boucle d'origine sur toutes ses séries"""
+    reference = BASELINE[case]
+    results = SimulationModel.run_simulation(reference["data"], backend=backend)
+    for channel, expected in reference["samples"].items():
+        simulated = np.asarray(results[channel])[::SAMPLE_STEP]
+        np.testing.assert_allclose(simulated, expected, rtol=1e-10, atol=1e-9, err_msg=channel)
@@ -0,0 +1,20 @@
+"""
+Plateforme multi-casiers : sans limite de soufflante, chaque casier suit le
+modèle homogène avec ses propres constantes.
+"""
+import numpy as np
+
+from modelvic import OUTPUT_CHANNELS, SimulationModel
+from plant import PlantModel
+
+
+def test_bays_keep_their_own_constants(demo_data):
+    """Un casier dont les données modifient les constantes du modèle les applique"""
+    tuned = dict(demo_data, theta_growth=1.08, moisture_optimum=50, inertia_factor=0.7,
+                 aeration_loss_coefficient=0.2)
+    plant = PlantModel.run_simulation([demo_data, tuned], blower_capacity=1e6)
+    for bay, data in zip(plant["Bays"], [demo_data, tuned]):
+        reference = SimulationModel.run_simulation(data)
+        for channel in OUTPUT_CHANNELS:
+            np.testing.assert_allclose(bay[channel], reference[channel], rtol=1e-10, atol=1e-9,
+                                       err_msg=channel)